@@ -1,9 +1,9 @@
 import json
 import logging
-import datetime
+import time
 from typing import List, Dict, Optional
 
-from notification_manager import NotificationManager, APPRISE_AVAILABLE
+from notification_manager import NotificationManager, APPRISE_AVAILABLE, notify_urls
 
 # Import database factory for cross-database compatibility
 from db_factory import get_database, USE_POSTGRES
@@ -245,7 +245,7 @@ class AlertEngine:
         cooldown_key = f"{rule_id}_{target_type}_{target_id}"
         
         # Check cooldown
-        now = datetime.datetime.utcnow().timestamp()
+        now = time.time()
         last_triggered = self.cooldowns.get(cooldown_key, 0)
         cooldown_seconds = (rule.get('cooldown_minutes', 5) or 5) * 60
         
@@ -331,40 +331,30 @@ class AlertEngine:
             logger.warning("Apprise not available, cannot send notifications")
             return
         
-        import apprise
-        
         # Get channels from db_factory
         all_channels = self.db.get_notification_channels(tenant_id)
         channels = [c for c in all_channels if c['id'] in channel_ids]
         
-        for channel in channels:
-            try:
-                ap = apprise.Apprise()
-                ap.add(channel['url'])
-                success = await ap.async_notify(title=title, body=body)
-                
-                # Record in history using db_factory
-                self.db.add_notification_history(
-                    channel_id=channel['id'],
-                    event_type=f"alert:{rule_name}",
-                    title=title,
-                    body=body,
-                    status='sent' if success else 'failed',
-                    error=None if success else 'Send failed'
-                )
-                
+        # Send to every channel concurrently
+        results = await notify_urls([c['url'] for c in channels], title, body)
+        
+        for channel, result in zip(channels, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to send to channel {channel['id']}: {result}")
+                success, error = False, str(result)
+            else:
+                success, error = result, None if result else 'Send failed'
                 logger.info(f"Notification {'sent' if success else 'FAILED'} to channel '{channel['name']}'")
-                
-            except Exception as ex:
-                logger.error(f"Failed to send to channel {channel['id']}: {ex}")
-                self.db.add_notification_history(
-                    channel_id=channel['id'],
-                    event_type=f"alert:{rule_name}",
-                    title=title,
-                    body=body,
-                    status='failed',
-                    error=str(ex)
-                )
+            
+            # Record in history using db_factory
+            self.db.add_notification_history(
+                channel_id=channel['id'],
+                event_type=f"alert:{rule_name}",
+                title=title,
+                body=body,
+                status='sent' if success else 'failed',
+                error=error
+            )
 
 
 # Singleton instance for use across the application
@@ -16,6 +16,15 @@ from typing import Dict, Optional
 from dataclasses import dataclass
 from urllib.parse import urlparse
 
+from response_cache import get_response_cache
+
+
+# Response cache namespace for the dashboard's bookmark tree/summary polls
+BOOKMARKS_CACHE_NAMESPACE = "bookmarks"
+
+# Bookmark edits within this window are folded into one monitor sync
+SYNC_DEBOUNCE_SECONDS = 0.25
+
 
 @dataclass
 class CheckResult:
@@ -38,6 +47,8 @@ class BookmarkMonitor:
         self.check_tasks: Dict[str, asyncio.Task] = {}
         self._cleanup_task: Optional[asyncio.Task] = None
         self._refresh_task: Optional[asyncio.Task] = None
+        self._sync_task: Optional[asyncio.Task] = None
+        self._sync_requested = asyncio.Event()
         self._http_session: Optional[aiohttp.ClientSession] = None
     
     async def start(self):
@@ -51,6 +62,9 @@ class BookmarkMonitor:
         # Start the bookmark refresh loop (checks for new/updated bookmarks)
         self._refresh_task = asyncio.create_task(self._refresh_loop())
         
+        # Start the debounced sync loop (runs syncs requested by bookmark edits)
+        self._sync_task = asyncio.create_task(self._sync_request_loop())
+        
         # Start the daily cleanup task
         self._cleanup_task = asyncio.create_task(self._cleanup_loop())
         
@@ -71,9 +85,11 @@ class BookmarkMonitor:
         for task in self.check_tasks.values():
             task.cancel()
         
-        # Cancel refresh and cleanup tasks
+        # Cancel refresh, sync and cleanup tasks
         if self._refresh_task:
             self._refresh_task.cancel()
+        if self._sync_task:
+            self._sync_task.cancel()
         if self._cleanup_task:
             self._cleanup_task.cancel()
         
@@ -81,6 +97,8 @@ class BookmarkMonitor:
         all_tasks = list(self.check_tasks.values())
         if self._refresh_task:
             all_tasks.append(self._refresh_task)
+        if self._sync_task:
+            all_tasks.append(self._sync_task)
         if self._cleanup_task:
             all_tasks.append(self._cleanup_task)
         
@@ -99,6 +117,10 @@ class BookmarkMonitor:
         """Public method to trigger a sync of bookmarks"""
         await self._sync_monitors()
     
+    def request_sync(self):
+        """Schedule a sync of bookmarks without waiting for it (bursts are coalesced)"""
+        self._sync_requested.set()
+    
     async def perform_check(self, bookmark: dict) -> CheckResult:
         """Public method to perform a single check (for manual triggers)"""
         return await self._perform_check(bookmark)
@@ -114,6 +136,19 @@ class BookmarkMonitor:
             except Exception as e:
                 print(f"📡 Error in refresh loop: {e}")
     
+    async def _sync_request_loop(self):
+        """Run one sync per burst of request_sync() calls"""
+        while self.running:
+            try:
+                await self._sync_requested.wait()
+                await asyncio.sleep(SYNC_DEBOUNCE_SECONDS)
+                self._sync_requested.clear()
+                await self._sync_monitors()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"📡 Error in sync loop: {e}")
+    
     async def _cleanup_loop(self):
         """Daily cleanup of old check records"""
         while self.running:
@@ -202,6 +237,7 @@ class BookmarkMonitor:
                             tenant_id=tenant_id
                         )
                 
+                status_changed = result.status != last_status
                 last_status = result.status
                 
                 # Record the result
@@ -212,6 +248,11 @@ class BookmarkMonitor:
                     message=result.message
                 )
                 
+                # Cached tree/summary responses only need dropping when up/down
+                # changes; latency in the tree may lag by the cache TTL
+                if status_changed:
+                    get_response_cache().clear(BOOKMARKS_CACHE_NAMESPACE)
+                
                 # Wait for next check
                 await asyncio.sleep(interval)
                 
@@ -18,25 +18,37 @@ Configuration:
 - MAX_TOTAL_CONNECTIONS: Max total WebSocket connections (default: 500)
 - SLOW_HANDLER_THRESHOLD_MS: Log warning if handler exceeds this (default: 100)
 - AGENT_TIMEOUT_SECONDS: Mark agent offline after this timeout (default: 120)
+- AGENT_SEND_TIMEOUT_SECONDS: Max time to wait on a command send to an agent (default: 2)
+- CLIENT_SEND_TIMEOUT_SECONDS: Max time to wait on a broadcast send to one UI client (default: 2)
+- AGENT_LOG_UPLOADS_PER_MINUTE: Max raw log uploads per agent per sliding minute (default: 120)
+- AGENT_LOG_UPLOAD_TRACKED_AGENTS: Max agent ids tracked by the upload rate limit,
+  least recently seen evicted first (default: 10000)
 """
 
 import asyncio
+import logging
 import time
 import os
-from typing import Dict, List, Optional, Set, Any
+from typing import Dict, List, Optional, Set, Any, Union
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque
 from fastapi import WebSocket, WebSocketDisconnect
-import json
+import orjson
 
 
+logger = logging.getLogger("librarian.connections")
+
 # Configuration
 MAX_CONNECTIONS_PER_IP = int(os.getenv("MAX_CONNECTIONS_PER_IP", "10"))
 MAX_TOTAL_CONNECTIONS = int(os.getenv("MAX_TOTAL_CONNECTIONS", "500"))
 MAX_UI_CLIENTS_PER_AGENT = int(os.getenv("MAX_UI_CLIENTS_PER_AGENT", "20"))
 SLOW_HANDLER_THRESHOLD_MS = float(os.getenv("SLOW_HANDLER_THRESHOLD_MS", "100"))
 AGENT_TIMEOUT_SECONDS = int(os.getenv("AGENT_TIMEOUT_SECONDS", "120"))
+AGENT_SEND_TIMEOUT_SECONDS = float(os.getenv("AGENT_SEND_TIMEOUT_SECONDS", "2"))
+CLIENT_SEND_TIMEOUT_SECONDS = float(os.getenv("CLIENT_SEND_TIMEOUT_SECONDS", "2"))
+AGENT_LOG_UPLOADS_PER_MINUTE = int(os.getenv("AGENT_LOG_UPLOADS_PER_MINUTE", "120"))
+AGENT_LOG_UPLOAD_TRACKED_AGENTS = int(os.getenv("AGENT_LOG_UPLOAD_TRACKED_AGENTS", "10000"))
 CONNECTION_STATS_WINDOW_SECONDS = int(os.getenv("CONNECTION_STATS_WINDOW", "300"))
 
 
@@ -54,6 +66,8 @@ class ConnectionInfo:
     bytes_received: int = 0
     bytes_sent: int = 0
     slow_handlers: int = 0
+    # Serializes sends so concurrent commands don't interleave frames
+    send_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
     
     def update_activity(self):
         """Update last activity timestamp"""
@@ -73,6 +87,7 @@ class ConnectionStats:
     total_bytes_received: int = 0
     total_bytes_sent: int = 0
     slow_handlers_logged: int = 0
+    log_uploads_rate_limited: int = 0
     peak_connections: int = 0
     
     # Rolling window tracking
@@ -133,6 +148,7 @@ class ConnectionStats:
             "total_bytes_received": self.total_bytes_received,
             "total_bytes_sent": self.total_bytes_sent,
             "slow_handlers_logged": self.slow_handlers_logged,
+            "log_uploads_rate_limited": self.log_uploads_rate_limited,
             "peak_connections": self.peak_connections,
             "connections_per_minute": round(self.connections_per_minute(), 2),
             "rejections_per_minute": round(self.rejections_per_minute(), 2)
@@ -160,6 +176,10 @@ class OptimizedConnectionManager:
         # Agent last heartbeat: {agent_id: datetime} - lightweight tracking
         self._agent_heartbeats: Dict[str, datetime] = {}
         
+        # Raw log upload times per agent: {agent_id: deque of monotonic timestamps}.
+        # Keyed by the unauthenticated path agent_id, so kept as a bounded LRU
+        self._log_upload_times: "OrderedDict[str, deque]" = OrderedDict()
+        
         # Statistics
         self.stats = ConnectionStats()
         
@@ -269,8 +289,8 @@ class OptimizedConnectionManager:
             if self.total_connections > self.stats.peak_connections:
                 self.stats.peak_connections = self.total_connections
             
-            print(f"Agent connected: {agent_id} from {ip_address} "
-                  f"(total: {len(self.agents)} agents, {self.total_connections} total)")
+            logger.info("Agent connected: %s from %s (total: %d agents, %d total)",
+                        agent_id, ip_address, len(self.agents), self.total_connections)
         
         return True, None, None
     
@@ -285,8 +305,7 @@ class OptimizedConnectionManager:
             del self.agents[agent_id]
             self.stats.total_agents_connected = len(self.agents)
             
-            print(f"Agent disconnected: {agent_id} "
-                  f"(remaining: {len(self.agents)} agents)")
+            logger.info("Agent disconnected: %s (remaining: %d agents)", agent_id, len(self.agents))
     
     async def connect_client(
         self, 
@@ -333,15 +352,11 @@ class OptimizedConnectionManager:
             if self.total_connections > self.stats.peak_connections:
                 self.stats.peak_connections = self.total_connections
             
-            print(f"UI client connected for agent: {agent_id} from {ip_address}")
+            logger.info("UI client connected for agent: %s from %s", agent_id, ip_address)
         
         # Send start_stream command to agent
-        if agent_id in self.agents:
-            try:
-                await self.agents[agent_id].websocket.send_json({"command": "start_stream"})
-                print(f"📡 Sent start_stream to agent {agent_id}")
-            except Exception as e:
-                print(f"Failed to send start_stream to agent {agent_id}: {e}")
+        if await self.try_send(agent_id, {"command": "start_stream"}):
+            logger.debug("Sent start_stream to agent %s", agent_id)
         
         return True, None, None
     
@@ -358,59 +373,103 @@ class OptimizedConnectionManager:
                     del self._connections_per_ip[conn_info.ip_address]
                 
                 self.clients[agent_id].remove(conn_info)
-                print(f"UI client disconnected from agent: {agent_id}")
+                logger.info("UI client disconnected from agent: %s", agent_id)
                 break
         
         self.stats.total_clients_connected = self.client_count
         
         # If no more clients watching, send stop_stream to agent
         remaining = len(self.clients.get(agent_id, []))
-        print(f"[DEBUG] After disconnect: {remaining} clients still watching {agent_id}")
+        logger.debug("After disconnect: %d clients still watching %s", remaining, agent_id)
         if remaining == 0:
             if agent_id in self.clients:
                 del self.clients[agent_id]
             if agent_id in self.agents:
-                print(f"📴 No more UI clients watching {agent_id}, sending stop_stream")
+                logger.debug("No more UI clients watching %s, sending stop_stream", agent_id)
                 asyncio.create_task(self._send_stop_stream(agent_id))
     
     async def _send_stop_stream(self, agent_id: str):
         """Send stop_stream command to agent"""
-        try:
-            if agent_id in self.agents:
-                await self.agents[agent_id].websocket.send_json({"command": "stop_stream"})
-                print(f"✅ Sent stop_stream to agent {agent_id}")
-        except Exception as e:
-            print(f"Failed to send stop_stream to agent {agent_id}: {e}")
+        if await self.try_send(agent_id, {"command": "stop_stream"}):
+            logger.debug("Sent stop_stream to agent %s", agent_id)
     
-    async def broadcast_to_clients(self, agent_id: str, message: dict):
-        """Broadcast a message to all UI clients watching an agent"""
-        if agent_id not in self.clients:
+    async def try_send(self, agent_id: str, payload: dict,
+                       timeout: float = AGENT_SEND_TIMEOUT_SECONDS) -> bool:
+        """
+        Send a JSON command to a connected agent.
+        
+        Returns False if the agent is not connected or the socket is dead /
+        too slow (bounded by timeout so callers can't hang). Payload
+        serialization errors are not swallowed.
+        """
+        conn_info = self.agents.get(agent_id)
+        if conn_info is None:
+            return False
+        
+        message_json = orjson.dumps(payload).decode()
+        try:
+            async with conn_info.send_lock:
+                await asyncio.wait_for(conn_info.websocket.send_text(message_json), timeout)
+        except (asyncio.TimeoutError, WebSocketDisconnect, RuntimeError, ConnectionError) as e:
+            logger.warning("Failed to send %s to agent %s: %r", payload.get('command', 'message'), agent_id, e)
+            return False
+        
+        conn_info.messages_sent += 1
+        conn_info.bytes_sent += len(message_json)
+        self.stats.total_bytes_sent += len(message_json)
+        return True
+    
+    def has_clients(self, agent_id: str) -> bool:
+        """True if at least one UI client is watching an agent"""
+        return bool(self.clients.get(agent_id))
+    
+    async def broadcast_to_clients(self, agent_id: str, message: Union[dict, str]):
+        """
+        Broadcast a message to all UI clients watching an agent.
+        
+        The message is encoded once (or passed pre-encoded as a JSON string)
+        and the same frame is sent to every watcher concurrently, so one slow
+        client does not delay the others.
+        """
+        watchers = list(self.clients.get(agent_id, ()))
+        if not watchers:
             return
         
         start_time = time.time()
-        message_json = json.dumps(message)
-        message_bytes = len(message_json.encode())
-        
-        disconnected = []
-        for conn_info in self.clients[agent_id]:
+        # Sent as a text frame: the dashboard JSON.parse()s event.data as a string
+        if isinstance(message, str):
+            message_json = message
+            message_bytes = len(message.encode())
+        else:
+            encoded = orjson.dumps(message)
+            message_json = encoded.decode()
+            message_bytes = len(encoded)
+        
+        async def send(conn_info: ConnectionInfo) -> bool:
             try:
-                await conn_info.websocket.send_text(message_json)
-                conn_info.messages_sent += 1
-                conn_info.bytes_sent += message_bytes
-                self.stats.total_bytes_sent += message_bytes
+                async with conn_info.send_lock:
+                    await asyncio.wait_for(conn_info.websocket.send_text(message_json),
+                                           CLIENT_SEND_TIMEOUT_SECONDS)
             except Exception:
-                disconnected.append(conn_info.websocket)
+                return False
+            conn_info.messages_sent += 1
+            conn_info.bytes_sent += message_bytes
+            self.stats.total_bytes_sent += message_bytes
+            return True
         
-        # Remove disconnected clients
-        for ws in disconnected:
-            self.disconnect_client(agent_id, ws)
+        results = await asyncio.gather(*(send(conn_info) for conn_info in watchers))
+        
+        # Remove disconnected (or stalled) clients
+        for conn_info, sent in zip(watchers, results):
+            if not sent:
+                self.disconnect_client(agent_id, conn_info.websocket)
         
         # Log slow broadcast
         duration_ms = (time.time() - start_time) * 1000
         if duration_ms > SLOW_HANDLER_THRESHOLD_MS:
             self.stats.slow_handlers_logged += 1
-            print(f"⚠️ Slow broadcast to {len(self.clients.get(agent_id, []))} clients "
-                  f"for agent {agent_id}: {duration_ms:.1f}ms")
+            logger.warning("Slow broadcast to %d clients for agent %s: %.1fms",
+                           len(self.clients.get(agent_id, [])), agent_id, duration_ms)
     
     def update_heartbeat(self, agent_id: str):
         """Update agent heartbeat timestamp"""
@@ -426,12 +485,47 @@ class OptimizedConnectionManager:
         self.stats.total_messages_processed += 1
         self.stats.total_bytes_received += bytes_received
     
+    def check_log_upload_rate(self, agent_id: str) -> Optional[int]:
+        """
+        Sliding-window limit on raw log uploads from one agent.
+        
+        Returns:
+            None if the upload is allowed (and records it), otherwise the
+            retry_after_seconds until the oldest upload leaves the window
+        """
+        now = time.monotonic()
+        cutoff = now - 60
+        # Least recently seen first: drop agents with no upload left in the window
+        while self._log_upload_times:
+            stale_id = next(iter(self._log_upload_times))
+            stale_times = self._log_upload_times[stale_id]
+            if stale_times and stale_times[-1] > cutoff:
+                break
+            del self._log_upload_times[stale_id]
+        
+        times = self._log_upload_times.get(agent_id)
+        if times is None:
+            times = self._log_upload_times[agent_id] = deque()
+            while len(self._log_upload_times) > AGENT_LOG_UPLOAD_TRACKED_AGENTS:
+                self._log_upload_times.popitem(last=False)
+        else:
+            self._log_upload_times.move_to_end(agent_id)
+        while times and times[0] <= cutoff:
+            times.popleft()
+        
+        if len(times) >= AGENT_LOG_UPLOADS_PER_MINUTE:
+            self.stats.log_uploads_rate_limited += 1
+            return max(1, int(times[0] - cutoff) + 1)
+        
+        times.append(now)
+        return None
+    
     def record_slow_handler(self, agent_id: str, duration_ms: float, handler_name: str = ""):
         """Record a slow handler for statistics"""
         if agent_id in self.agents:
             self.agents[agent_id].slow_handlers += 1
         self.stats.slow_handlers_logged += 1
-        print(f"⚠️ Slow handler {handler_name} for agent {agent_id}: {duration_ms:.1f}ms")
+        logger.warning("Slow handler %s for agent %s: %.1fms", handler_name, agent_id, duration_ms)
     
     async def queue_status_update(self, agent_id: str, status: str, last_seen: datetime):
         """Queue a status update for bulk processing"""
@@ -460,7 +554,7 @@ class OptimizedConnectionManager:
             count = await self._bulk_update_statuses(db_manager, updates)
             return count
         except Exception as e:
-            print(f"Error in bulk status update: {e}")
+            logger.error("Error in bulk status update: %s", e)
             return 0
     
     async def _bulk_update_statuses(self, db_manager, updates: Dict[str, dict]) -> int:
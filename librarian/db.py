@@ -1,10 +1,12 @@
+import functools
 import json
 import sqlite3
 import os
 import shutil
 import secrets
 import hashlib
-from typing import List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -13,6 +15,7 @@ from qdrant_client.models import Distance, VectorParams, PointStruct
 from sentence_transformers import SentenceTransformer
 
 from models import LogEntry
+from sqlite_pool import get_sqlite_pool
 
 
 # Configuration
@@ -26,6 +29,64 @@ SQLITE_DB_PATH = "./loglibrarian.db"
 # Report storage configuration
 REPORT_STORAGE_ROOT = os.getenv("REPORT_STORAGE_ROOT", "/storage/reports/profiles")
 
+# The trigram FTS index only helps LIKE patterns with at least 3 characters
+RAW_LOG_FTS_MIN_SEARCH = 3
+
+# Rows deleted per reaper transaction (keeps each WAL write and lock hold short)
+RAW_LOG_REAP_BATCH_SIZE = 5000
+
+# Threads used to compute several agents' uptime at once (WAL readers don't block each other)
+UPTIME_BULK_WORKERS = int(os.getenv("UPTIME_BULK_WORKERS", "8"))
+
+
+@functools.lru_cache(maxsize=256)
+def _raw_logs_where_sql(agent_count: int, severity_count: int, source: bool,
+                        start_time: bool, end_time: bool, search: Optional[str]) -> str:
+    """
+    WHERE clause for get_raw_logs, keyed by which filters are active.
+
+    The same filter combination always produces the same SQL text, so
+    sqlite3's per-connection statement cache reuses the prepared statement.
+    search is None, "fts" (trigram index) or "like" (plain scan).
+    """
+    clauses = []
+    if agent_count == 1:
+        clauses.append("agent_id = ?")
+    elif agent_count > 1:
+        clauses.append(f"agent_id IN ({','.join('?' * agent_count)})")
+    if severity_count:
+        # Severities are stored upper-cased by ingest_raw_logs
+        clauses.append(f"severity IN ({','.join('?' * severity_count)})")
+    if source:
+        clauses.append("UPPER(source) = UPPER(?)")
+    if start_time:
+        clauses.append("datetime(timestamp) >= datetime(?)")
+    if end_time:
+        clauses.append("datetime(timestamp) <= datetime(?)")
+    if search == "fts":
+        clauses.append("id IN (SELECT rowid FROM raw_logs_fts WHERE message LIKE ?)")
+    elif search == "like":
+        clauses.append("message LIKE ?")
+    return ("WHERE " + " AND ".join(clauses)) if clauses else ""
+
+
+def _has_tag_sql(tags_column: str) -> str:
+    """
+    Condition that a comma-separated tags column contains the bound tag.
+
+    Tags are stored as free text ("a, b, c"), so the list is split on commas
+    and every element trimmed of whitespace before the exact comparison.
+    """
+    return f"""EXISTS (
+        WITH RECURSIVE tag_split(tag, rest) AS (
+            SELECT NULL, COALESCE({tags_column}, '') || ','
+            UNION ALL
+            SELECT substr(rest, 1, instr(rest, ',') - 1), substr(rest, instr(rest, ',') + 1)
+            FROM tag_split WHERE rest <> ''
+        )
+        SELECT 1 FROM tag_split WHERE trim(tag, ' ' || char(9, 10, 13)) = ?
+    )"""
+
 
 class DatabaseManager:
     def __init__(self):
@@ -44,9 +105,20 @@ class DatabaseManager:
         # Initialize SQLite database
         self._init_sqlite_db()
         
+        # Shared connections for frequently polled queries
+        self._sqlite_pool = get_sqlite_pool(SQLITE_DB_PATH)
+        
         # Cache for template_ids already in Qdrant
         self.template_cache = set()
     
+    def _connect(self):
+        """Get a pooled SQLite connection (close() returns it to the pool)"""
+        return self._sqlite_pool.acquire()
+    
+    def close(self):
+        """Close pooled SQLite connections"""
+        self._sqlite_pool.close_all()
+    
     def _init_qdrant_collection(self):
         """Initialize Qdrant collection if it doesn't exist"""
         try:
@@ -162,6 +234,11 @@ class DatabaseManager:
         except:
             pass  # Column already exists
         
+        # Agent list is served newest-first (and paginated) by last_seen
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_agents_last_seen ON agents(last_seen DESC)
+        """)
+        
         # Create agent_heartbeats table for historical uptime tracking
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS agent_heartbeats (
@@ -314,6 +391,48 @@ class DatabaseManager:
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_raw_logs_cleanup ON raw_logs(agent_id, timestamp)
         """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_raw_logs_agent_severity_time ON raw_logs(agent_id, severity, timestamp)
+        """)
+        # Covers the reports' period scans (severity/source counts since created_at)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_raw_logs_created_severity_source ON raw_logs(created_at, severity, source)
+        """)
+        
+        # Trigram full-text index over raw_logs.message for the log search box:
+        # substring LIKE patterns of 3+ characters are answered from the index
+        # instead of scanning every message (needs SQLite 3.34+)
+        try:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'raw_logs_fts'")
+            fts_existed = cursor.fetchone() is not None
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS raw_logs_fts USING fts5(
+                    message, content='raw_logs', content_rowid='id', tokenize='trigram'
+                )
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS raw_logs_fts_insert AFTER INSERT ON raw_logs BEGIN
+                    INSERT INTO raw_logs_fts(rowid, message) VALUES (new.id, new.message);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS raw_logs_fts_delete AFTER DELETE ON raw_logs BEGIN
+                    INSERT INTO raw_logs_fts(raw_logs_fts, rowid, message) VALUES ('delete', old.id, old.message);
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS raw_logs_fts_update AFTER UPDATE OF message ON raw_logs BEGIN
+                    INSERT INTO raw_logs_fts(raw_logs_fts, rowid, message) VALUES ('delete', old.id, old.message);
+                    INSERT INTO raw_logs_fts(rowid, message) VALUES (new.id, new.message);
+                END
+            """)
+            if not fts_existed:
+                # Index logs stored before the search index existed
+                cursor.execute("INSERT INTO raw_logs_fts(raw_logs_fts) VALUES ('rebuild')")
+            self._raw_logs_fts = True
+        except sqlite3.OperationalError as e:
+            print(f"⚠ Raw log search index unavailable (SQLite {sqlite3.sqlite_version}): {e}")
+            self._raw_logs_fts = False
         
         # Create system_settings table for global configuration
         cursor.execute("""
@@ -507,6 +626,54 @@ class DatabaseManager:
             ON bookmark_checks(bookmark_id, created_at DESC)
         """)
         
+        # Daily rollup of bookmark checks, kept current by a trigger, so reports
+        # read one row per monitor per day instead of every check. Rows outlive
+        # the check history cleanup (checks are only ever added to the rollup)
+        cursor.execute("""
+            SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'bookmark_daily_stats'
+        """)
+        daily_stats_exists = cursor.fetchone() is not None
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS bookmark_daily_stats (
+                bookmark_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                up_count INTEGER NOT NULL DEFAULT 0,
+                up_latency_sum INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (bookmark_id, day)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS bookmark_checks_daily_stats
+            AFTER INSERT ON bookmark_checks
+            BEGIN
+                INSERT INTO bookmark_daily_stats (bookmark_id, day, total, up_count, up_latency_sum)
+                VALUES (NEW.bookmark_id, date(NEW.created_at), 1, NEW.status = 1,
+                        CASE WHEN NEW.status = 1 THEN COALESCE(NEW.latency_ms, 0) ELSE 0 END)
+                ON CONFLICT (bookmark_id, day) DO UPDATE SET
+                    total = total + 1,
+                    up_count = up_count + excluded.up_count,
+                    up_latency_sum = up_latency_sum + excluded.up_latency_sum;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS bookmarks_daily_stats_delete
+            AFTER DELETE ON bookmarks
+            BEGIN
+                DELETE FROM bookmark_daily_stats WHERE bookmark_id = OLD.id;
+            END
+        """)
+        if not daily_stats_exists:
+            # First run: roll up the existing check history
+            cursor.execute("""
+                INSERT INTO bookmark_daily_stats (bookmark_id, day, total, up_count, up_latency_sum)
+                SELECT bookmark_id, date(created_at), COUNT(*),
+                       SUM(CASE WHEN status = 1 THEN 1 ELSE 0 END),
+                       SUM(CASE WHEN status = 1 THEN COALESCE(latency_ms, 0) ELSE 0 END)
+                FROM bookmark_checks
+                GROUP BY bookmark_id, date(created_at)
+            """)
+        
         # =====================================
         # Notification & Alert System Tables
         # =====================================
@@ -1116,6 +1283,38 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def bulk_touch_agents(self, updates: List[Tuple[str, datetime, str]]) -> int:
+        """Update last_seen/status for many known agents in one transaction.
+        
+        An offline -> online transition still resets uptime tracking, matching upsert_agent.
+        """
+        if not updates:
+            return 0
+        
+        conn = sqlite3.connect(SQLITE_DB_PATH)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.executemany("""
+                UPDATE agents SET
+                    last_seen = ?,
+                    status = ?,
+                    created_at = CASE WHEN status = 'offline' AND ? = 'online' THEN datetime('now') ELSE created_at END,
+                    uptime_seconds = CASE WHEN status = 'offline' AND ? = 'online' THEN 0 ELSE uptime_seconds END
+                WHERE agent_id = ?
+            """, [
+                (last_seen, status, status, status, agent_id)
+                for agent_id, last_seen, status in updates
+            ])
+            conn.commit()
+            return cursor.rowcount
+        except Exception as e:
+            conn.rollback()
+            print(f"Error bulk touching agents: {e}")
+            raise
+        finally:
+            conn.close()
+    
     def generate_agent_token(self, agent_id: str) -> str:
         """
         Generate a new authentication token for an agent.
@@ -1443,8 +1642,19 @@ class DatabaseManager:
         
         return results
     
-    def get_all_agents(self) -> List[dict]:
-        """Get all registered agents with uptime data"""
+    def get_all_agents(self, limit: int = None, offset: int = 0, search: str = None,
+                       tag: str = None, scope_ids: List[str] = None,
+                       scope_tags: List[str] = None) -> List[dict]:
+        """
+        Get registered agents with uptime data.
+        
+        Args:
+            limit: Max agents to return (None = all)
+            offset: Pagination offset
+            search: Case-insensitive match on hostname, display name or tags
+            tag: Only agents carrying this tag
+            scope_ids / scope_tags: Profile scope - agent must match an ID or a tag
+        """
         conn = sqlite3.connect(SQLITE_DB_PATH)
         cursor = conn.cursor()
         
@@ -1476,13 +1686,41 @@ class DatabaseManager:
         except:
             pass  # Column already exists
         
-        cursor.execute("""
+        has_tag_sql = _has_tag_sql("tags")
+        
+        conditions = []
+        params = []
+        if scope_ids or scope_tags:
+            scope_conditions = []
+            if scope_ids:
+                scope_conditions.append(f"agent_id IN ({', '.join('?' for _ in scope_ids)})")
+                params.extend(scope_ids)
+            for scope_tag in scope_tags or []:
+                scope_conditions.append(has_tag_sql)
+                params.append(scope_tag)
+            conditions.append(f"({' OR '.join(scope_conditions)})")
+        if tag:
+            conditions.append(has_tag_sql)
+            params.append(tag)
+        if search:
+            pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            conditions.append(
+                "(hostname LIKE ? ESCAPE '\\' OR display_name LIKE ? ESCAPE '\\' OR tags LIKE ? ESCAPE '\\')"
+            )
+            params.extend([pattern, pattern, pattern])
+        
+        where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.extend([limit if limit is not None else -1, offset or 0])
+        
+        cursor.execute(f"""
             SELECT agent_id, hostname, status, public_ip, first_seen, last_seen, 
                    enabled, display_name, connection_address, system_info, os,
                    uptime_seconds, created_at, tags, uptime_window
             FROM agents
+            {where_sql}
             ORDER BY last_seen DESC
-        """)
+            LIMIT ? OFFSET ?
+        """, params)
         
         rows = cursor.fetchall()
         
@@ -1693,18 +1931,21 @@ class DatabaseManager:
         finally:
             conn.close()
     
-    def get_agents_for_user(self, user: dict) -> List[dict]:
+    def get_agents_for_user(self, user: dict, limit: int = None, offset: int = 0,
+                            search: str = None, tag: str = None) -> List[dict]:
         """Get agents filtered by user's role and assigned profile.
         
         - Admin role: Returns ALL agents
         - User role: Returns only agents matching their assigned profile's scope
         - User with no profile: Returns empty list
+        
+        Scope, search and pagination are applied in SQL.
         """
-        all_agents = self.get_all_agents()
+        filters = {"limit": limit, "offset": offset, "search": search, "tag": tag}
         
         # Admin users see everything
         if user.get("role") == "admin" or user.get("is_admin"):
-            return all_agents
+            return self.get_all_agents(**filters)
         
         # User with no assigned profile sees nothing
         profile_id = user.get("assigned_profile_id")
@@ -1716,49 +1957,24 @@ class DatabaseManager:
         if not profile:
             return []
         
-        return self._filter_agents_by_profile(all_agents, profile)
-    
-    def _filter_agents_by_profile(self, agents: List[dict], profile: dict) -> List[dict]:
-        """Filter agents based on profile scope settings."""
-        scribe_scope_ids = profile.get("scribe_scope_ids") or []
-        scribe_scope_tags = profile.get("scribe_scope_tags") or []
-        
-        # If no scope defined, include all agents
-        if not scribe_scope_ids and not scribe_scope_tags:
-            return agents
-        
-        filtered = []
-        for agent in agents:
-            # Check if agent ID is in scope
-            if agent["agent_id"] in scribe_scope_ids:
-                filtered.append(agent)
-                continue
-            
-            # Check if any agent tag matches scope tags
-            agent_tags = []
-            if agent.get("tags"):
-                if isinstance(agent["tags"], list):
-                    agent_tags = agent["tags"]
-                elif isinstance(agent["tags"], str):
-                    agent_tags = [t.strip() for t in agent["tags"].split(",") if t.strip()]
-            
-            for tag in agent_tags:
-                if tag in scribe_scope_tags:
-                    filtered.append(agent)
-                    break
-        
-        return filtered
+        return self.get_all_agents(
+            scope_ids=profile.get("scribe_scope_ids") or [],
+            scope_tags=profile.get("scribe_scope_tags") or [],
+            **filters
+        )
     
-    def get_bookmarks_for_user(self, user: dict) -> List[dict]:
+    def get_bookmarks_for_user(self, user: dict, group_id: str = None) -> List[dict]:
         """Get bookmarks filtered by user's role and assigned profile.
         
         - Admin role: Returns ALL bookmarks (ignores tenant_id)
         - User role: Returns only bookmarks matching their assigned profile's scope
         - User with no profile: Returns empty list
+        
+        group_id, if given, is applied in SQL before any profile filtering.
         """
         # Admin users see everything - fetch all bookmarks ignoring tenant
         if user.get("role") == "admin" or user.get("is_admin"):
-            return self._get_all_bookmarks_no_tenant()
+            return self._get_all_bookmarks_no_tenant(group_id)
         
         # User with no assigned profile sees nothing
         profile_id = user.get("assigned_profile_id")
@@ -1771,11 +1987,11 @@ class DatabaseManager:
             return []
         
         # Get all bookmarks and filter
-        all_bookmarks = self._get_all_bookmarks_no_tenant()
+        all_bookmarks = self._get_all_bookmarks_no_tenant(group_id)
         return self._filter_bookmarks_by_profile(all_bookmarks, profile)
     
-    def _get_all_bookmarks_no_tenant(self) -> List[dict]:
-        """Get ALL bookmarks regardless of tenant_id"""
+    def _get_all_bookmarks_no_tenant(self, group_id: str = None) -> List[dict]:
+        """Get ALL bookmarks regardless of tenant_id (optionally only one group)"""
         conn = sqlite3.connect(SQLITE_DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
@@ -1793,8 +2009,9 @@ class DatabaseManager:
                         WHERE bookmark_id = b.id 
                         ORDER BY created_at DESC LIMIT 1) as last_check_at
                 FROM bookmarks b
+                WHERE ? IS NULL OR b.group_id = ?
                 ORDER BY b.name ASC
-            """)
+            """, (group_id or None, group_id))
             
             bookmarks = []
             for row in cursor.fetchall():
@@ -2162,6 +2379,20 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def calculate_agents_uptime_bulk(self, agent_ids: List[str], start_date: datetime,
+                                     end_date: datetime = None,
+                                     heartbeat_ttl_seconds: int = 120) -> Dict[str, dict]:
+        """calculate_agent_uptime for several agents (run concurrently), keyed by agent_id"""
+        if not agent_ids:
+            return {}
+        
+        def uptime(agent_id):
+            return self.calculate_agent_uptime(agent_id, start_date, end_date, heartbeat_ttl_seconds)
+        
+        # Each call opens its own connection, so the per-agent heartbeat scans can overlap
+        with ThreadPoolExecutor(max_workers=min(UPTIME_BULK_WORKERS, len(agent_ids))) as executor:
+            return dict(zip(agent_ids, executor.map(uptime, agent_ids)))
+    
     def cleanup_old_heartbeats(self, days_to_keep: int = 30) -> int:
         """Remove heartbeats older than the specified number of days"""
         conn = sqlite3.connect(SQLITE_DB_PATH)
@@ -2251,6 +2482,113 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def get_all_tags(self, tenant_id: str = "default") -> List[str]:
+        """
+        Get all unique tags from agents, bookmarks and report profiles.
+        
+        Comma-separated tag strings are split with a recursive CTE and the
+        JSON tag arrays are expanded with json_each, so only distinct tags
+        leave the DB.
+        """
+        conn = sqlite3.connect(SQLITE_DB_PATH)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                WITH RECURSIVE tag_strings(rest) AS (
+                    SELECT tags || ',' FROM agents WHERE tags IS NOT NULL AND tags != ''
+                    UNION ALL
+                    SELECT tags || ',' FROM bookmarks WHERE tenant_id = ? AND tags IS NOT NULL AND tags != ''
+                ),
+                split(tag, rest) AS (
+                    SELECT '', rest FROM tag_strings
+                    UNION ALL
+                    SELECT substr(rest, 1, instr(rest, ',') - 1), substr(rest, instr(rest, ',') + 1)
+                    FROM split WHERE rest != ''
+                ),
+                all_tags(tag) AS (
+                    SELECT trim(tag) FROM split
+                    UNION
+                    SELECT trim(j.value) FROM report_profiles,
+                        json_each(CASE WHEN json_valid(monitor_scope_tags) THEN monitor_scope_tags ELSE '[]' END) j
+                    WHERE tenant_id = ? AND j.type = 'text'
+                    UNION
+                    SELECT trim(j.value) FROM report_profiles,
+                        json_each(CASE WHEN json_valid(scribe_scope_tags) THEN scribe_scope_tags ELSE '[]' END) j
+                    WHERE tenant_id = ? AND j.type = 'text'
+                )
+                SELECT tag FROM all_tags WHERE tag != '' ORDER BY tag
+            """, (tenant_id, tenant_id, tenant_id))
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            conn.close()
+    
+    def delete_tag(self, tenant_id: str, tag: str) -> dict:
+        """
+        Remove a tag from all agents, bookmarks and report profiles.
+        
+        Uses one set-based UPDATE per table inside a single transaction.
+        
+        Returns:
+            Dict with the number of agents, bookmarks and profiles changed
+        """
+        def strip_csv_tag(tags):
+            parts = [t.strip() for t in (tags or "").split(",") if t.strip()]
+            if tag not in parts:
+                return tags
+            return ", ".join(t for t in parts if t != tag)
+        
+        def strip_json_tag(tags_json):
+            try:
+                parts = json.loads(tags_json) if tags_json else []
+            except (TypeError, ValueError):
+                return tags_json
+            if not isinstance(parts, list) or tag not in parts:
+                return tags_json
+            return json.dumps([t for t in parts if t != tag])
+        
+        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn.create_function("strip_csv_tag", 1, strip_csv_tag, deterministic=True)
+        conn.create_function("strip_json_tag", 1, strip_json_tag, deterministic=True)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                UPDATE agents SET tags = strip_csv_tag(tags)
+                WHERE tags IS NOT NULL AND tags != '' AND strip_csv_tag(tags) != tags
+            """)
+            agents_updated = cursor.rowcount
+            
+            cursor.execute("""
+                UPDATE bookmarks SET tags = strip_csv_tag(tags), updated_at = CURRENT_TIMESTAMP
+                WHERE tenant_id = ? AND tags IS NOT NULL AND tags != '' AND strip_csv_tag(tags) != tags
+            """, (tenant_id,))
+            bookmarks_updated = cursor.rowcount
+            
+            cursor.execute("""
+                UPDATE report_profiles
+                SET monitor_scope_tags = strip_json_tag(monitor_scope_tags),
+                    scribe_scope_tags = strip_json_tag(scribe_scope_tags),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE tenant_id = ?
+                  AND (strip_json_tag(monitor_scope_tags) IS NOT monitor_scope_tags
+                       OR strip_json_tag(scribe_scope_tags) IS NOT scribe_scope_tags)
+            """, (tenant_id,))
+            profiles_updated = cursor.rowcount
+            
+            conn.commit()
+            return {
+                "agents": agents_updated,
+                "bookmarks": bookmarks_updated,
+                "profiles": profiles_updated
+            }
+        except Exception as e:
+            conn.rollback()
+            print(f"Error deleting tag '{tag}': {e}")
+            raise
+        finally:
+            conn.close()
+    
     def update_agent_display_name(self, agent_id: str, display_name: str) -> None:
         """Update the display name of an agent"""
         conn = sqlite3.connect(SQLITE_DB_PATH)
@@ -2283,6 +2621,28 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def bulk_update_agent_system_info(self, updates: List[Tuple[str, dict]]) -> int:
+        """Update the system info JSON for many agents in one transaction"""
+        if not updates:
+            return 0
+        
+        conn = sqlite3.connect(SQLITE_DB_PATH)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.executemany(
+                "UPDATE agents SET system_info = ? WHERE agent_id = ?",
+                [(json.dumps(system_info, default=str), agent_id) for agent_id, system_info in updates]
+            )
+            conn.commit()
+            return cursor.rowcount
+        except Exception as e:
+            conn.rollback()
+            print(f"Error bulk updating agent system info: {e}")
+            raise
+        finally:
+            conn.close()
+    
     def get_agent_system_info(self, agent_id: str) -> dict:
         """Get system info for an agent"""
         conn = sqlite3.connect(SQLITE_DB_PATH)
@@ -2323,6 +2683,40 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def bulk_insert_process_snapshots(self, snapshots: List[Tuple[str, datetime, object]]) -> int:
+        """Insert process snapshots for many agents in one transaction.
+        
+        processes may be a list of dicts or pre-serialized JSON (str/bytes).
+        """
+        if not snapshots:
+            return 0
+        
+        conn = sqlite3.connect(SQLITE_DB_PATH)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.executemany("""
+                INSERT INTO process_snapshots (agent_id, timestamp, json_data)
+                VALUES (?, ?, ?)
+            """, [
+                (
+                    agent_id,
+                    timestamp,
+                    processes.decode("utf-8") if isinstance(processes, bytes)
+                    else processes if isinstance(processes, str)
+                    else json.dumps(processes)
+                )
+                for agent_id, timestamp, processes in snapshots
+            ])
+            conn.commit()
+            return len(snapshots)
+        except Exception as e:
+            conn.rollback()
+            print(f"Error bulk inserting process snapshots: {e}")
+            raise
+        finally:
+            conn.close()
+    
     def get_latest_process_snapshot(self, agent_id: str) -> dict:
         """Get the latest process snapshot for an agent"""
         conn = sqlite3.connect(SQLITE_DB_PATH)
@@ -3076,9 +3470,24 @@ class DatabaseManager:
     # Notification Channels (Apprise-based)
     # ==========================================
     
+    def _notification_channel_from_row(self, row) -> dict:
+        """Convert a notification_channels row (sqlite3.Row) to an API dict"""
+        return {
+            "id": row["id"],
+            "tenant_id": row["tenant_id"],
+            "name": row["name"],
+            "channel_type": row["channel_type"],
+            "url": row["url"],
+            "url_masked": self._mask_url(row["url"]),
+            "events": json.loads(row["events"]) if row["events"] else [],
+            "enabled": bool(row["enabled"]),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"]
+        }
+    
     def get_notification_channels(self, tenant_id: str = "default") -> list:
         """Get all notification channels for a tenant"""
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -3091,21 +3500,7 @@ class DatabaseManager:
             """, (tenant_id,))
             
             rows = cursor.fetchall()
-            return [
-                {
-                    "id": row["id"],
-                    "tenant_id": row["tenant_id"],
-                    "name": row["name"],
-                    "channel_type": row["channel_type"],
-                    "url": row["url"],
-                    "url_masked": self._mask_url(row["url"]),
-                    "events": json.loads(row["events"]) if row["events"] else [],
-                    "enabled": bool(row["enabled"]),
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"]
-                }
-                for row in rows
-            ]
+            return [self._notification_channel_from_row(row) for row in rows]
         except Exception as e:
             print(f"Error fetching notification channels: {e}")
             return []
@@ -3129,7 +3524,7 @@ class DatabaseManager:
     def create_notification_channel(self, name: str, channel_type: str, url: str, 
                                     events: list = None, tenant_id: str = "default") -> dict:
         """Create a new notification channel"""
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -3159,7 +3554,7 @@ class DatabaseManager:
     
     def update_notification_channel(self, channel_id: int, updates: dict, tenant_id: str = "default") -> dict:
         """Update a notification channel"""
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -3210,7 +3605,7 @@ class DatabaseManager:
     
     def delete_notification_channel(self, channel_id: int, tenant_id: str = "default") -> bool:
         """Delete a notification channel"""
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -3229,7 +3624,7 @@ class DatabaseManager:
     
     def get_notification_channel_by_id(self, channel_id: int, tenant_id: str = "default") -> dict:
         """Get a single notification channel by ID"""
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -3244,28 +3639,40 @@ class DatabaseManager:
             if not row:
                 return None
             
-            return {
-                "id": row["id"],
-                "tenant_id": row["tenant_id"],
-                "name": row["name"],
-                "channel_type": row["channel_type"],
-                "url": row["url"],
-                "url_masked": self._mask_url(row["url"]),
-                "events": json.loads(row["events"]) if row["events"] else [],
-                "enabled": bool(row["enabled"]),
-                "created_at": row["created_at"],
-                "updated_at": row["updated_at"]
-            }
+            return self._notification_channel_from_row(row)
         except Exception as e:
             print(f"Error fetching notification channel: {e}")
             return None
         finally:
             conn.close()
     
+    def get_notification_channels_by_ids(self, channel_ids: List[int], tenant_id: str = "default") -> list:
+        """Get several notification channels by ID in one query"""
+        if not channel_ids:
+            return []
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        try:
+            placeholders = ",".join("?" * len(channel_ids))
+            cursor.execute(f"""
+                SELECT id, tenant_id, name, channel_type, url, events, enabled, created_at, updated_at
+                FROM notification_channels
+                WHERE tenant_id = ? AND id IN ({placeholders})
+            """, (tenant_id, *channel_ids))
+            
+            return [self._notification_channel_from_row(row) for row in cursor.fetchall()]
+        except Exception as e:
+            print(f"Error fetching notification channels: {e}")
+            return []
+        finally:
+            conn.close()
+    
     def add_notification_history(self, channel_id: int, event_type: str, title: str, 
                                  body: str, status: str, error: str = None) -> int:
         """Record a notification attempt"""
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -3283,9 +3690,35 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def bulk_add_notification_history(self, entries: List[Tuple[int, str, str, str, str, Optional[str]]]) -> int:
+        """
+        Record several notification attempts in one transaction.
+        
+        Args:
+            entries: (channel_id, event_type, title, body, status, error) tuples
+        """
+        if not entries:
+            return 0
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.executemany("""
+                INSERT INTO notification_history (channel_id, event_type, title, body, status, error)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, entries)
+            
+            conn.commit()
+            return len(entries)
+        except Exception as e:
+            print(f"Error recording notification history: {e}")
+            return 0
+        finally:
+            conn.close()
+    
     def get_notification_history(self, tenant_id: str = "default", limit: int = 100) -> list:
         """Get notification history for a tenant"""
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -3307,23 +3740,82 @@ class DatabaseManager:
             return []
         finally:
             conn.close()
+    
+    def iter_notification_history(self, tenant_id: str = "default", limit: int = 100,
+                                  batch_size: int = 500):
+        """
+        Yield notification history newest-first in batches (lists of dicts).
+        
+        Rows are pulled from the cursor batch_size at a time, so memory stays
+        flat however large limit is. Closing the generator early releases
+        the connection.
+        """
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT h.id, h.channel_id, c.name as channel_name, h.event_type, 
+                       h.title, h.body, h.status, h.error, h.created_at
+                FROM notification_history h
+                JOIN notification_channels c ON h.channel_id = c.id
+                WHERE c.tenant_id = ?
+                ORDER BY h.created_at DESC
+                LIMIT ?
+            """, (tenant_id, limit))
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows]
+        finally:
+            conn.close()
 
     # ==========================================
     # Unified Alert Rules (V2 - Global/Agent/Bookmark)
     # ==========================================
     
+    _ALERT_RULE_V2_COLUMNS = """
+        id, tenant_id, name, description, scope, target_id, metric, 
+        operator, threshold, channels, cooldown_minutes, enabled, 
+        created_at, updated_at, profile_id, profile_agents, profile_bookmarks
+    """
+    
+    @staticmethod
+    def _alert_rule_v2_from_row(row) -> dict:
+        """Convert an alert_rules_v2 row (sqlite3.Row) to an API dict"""
+        return {
+            "id": row["id"],
+            "tenant_id": row["tenant_id"],
+            "name": row["name"],
+            "description": row["description"],
+            "scope": row["scope"],
+            "target_id": row["target_id"],
+            "metric": row["metric"],
+            "operator": row["operator"],
+            "threshold": row["threshold"],
+            "channels": json.loads(row["channels"]) if row["channels"] else [],
+            "cooldown_minutes": row["cooldown_minutes"],
+            "enabled": bool(row["enabled"]),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "profile_id": row["profile_id"],
+            "profile_agents": json.loads(row["profile_agents"]) if row["profile_agents"] else [],
+            "profile_bookmarks": json.loads(row["profile_bookmarks"]) if row["profile_bookmarks"] else []
+        }
+    
     def get_alert_rules_v2(self, tenant_id: str = "default", scope: str = None, 
                            target_id: str = None) -> list:
         """Get alert rules, optionally filtered by scope and target"""
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         try:
-            query = """
-                SELECT id, tenant_id, name, description, scope, target_id, metric, 
-                       operator, threshold, channels, cooldown_minutes, enabled, 
-                       created_at, updated_at, profile_id, profile_agents, profile_bookmarks
+            query = f"""
+                SELECT {self._ALERT_RULE_V2_COLUMNS}
                 FROM alert_rules_v2
                 WHERE tenant_id = ?
             """
@@ -3342,34 +3834,34 @@ class DatabaseManager:
             cursor.execute(query, params)
             rows = cursor.fetchall()
             
-            return [
-                {
-                    "id": row["id"],
-                    "tenant_id": row["tenant_id"],
-                    "name": row["name"],
-                    "description": row["description"],
-                    "scope": row["scope"],
-                    "target_id": row["target_id"],
-                    "metric": row["metric"],
-                    "operator": row["operator"],
-                    "threshold": row["threshold"],
-                    "channels": json.loads(row["channels"]) if row["channels"] else [],
-                    "cooldown_minutes": row["cooldown_minutes"],
-                    "enabled": bool(row["enabled"]),
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                    "profile_id": row["profile_id"],
-                    "profile_agents": json.loads(row["profile_agents"]) if row["profile_agents"] else [],
-                    "profile_bookmarks": json.loads(row["profile_bookmarks"]) if row["profile_bookmarks"] else []
-                }
-                for row in rows
-            ]
+            return [self._alert_rule_v2_from_row(row) for row in rows]
         except Exception as e:
             print(f"Error fetching alert rules: {e}")
             return []
         finally:
             conn.close()
     
+    def get_alert_rule_v2_by_id(self, rule_id: int, tenant_id: str = "default") -> Optional[dict]:
+        """Get a single alert rule by ID (primary-key lookup)"""
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(f"""
+                SELECT {self._ALERT_RULE_V2_COLUMNS}
+                FROM alert_rules_v2
+                WHERE id = ? AND tenant_id = ?
+                LIMIT 1
+            """, (rule_id, tenant_id))
+            row = cursor.fetchone()
+            return self._alert_rule_v2_from_row(row) if row else None
+        except Exception as e:
+            print(f"Error fetching alert rule {rule_id}: {e}")
+            return None
+        finally:
+            conn.close()
+    
     def get_global_alert_rules(self, tenant_id: str = "default") -> list:
         """Get all global alert rules"""
         return self.get_alert_rules_v2(tenant_id, scope="global")
@@ -3381,7 +3873,7 @@ class DatabaseManager:
                              profile_bookmarks: list = None,
                              tenant_id: str = "default") -> dict:
         """Create a new alert rule"""
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -3424,7 +3916,7 @@ class DatabaseManager:
     
     def update_alert_rule_v2(self, rule_id: int, updates: dict, tenant_id: str = "default") -> dict:
         """Update an alert rule"""
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -3472,8 +3964,7 @@ class DatabaseManager:
                 return None
             
             # Fetch updated rule
-            rules = self.get_alert_rules_v2(tenant_id)
-            return next((r for r in rules if r["id"] == rule_id), None)
+            return self.get_alert_rule_v2_by_id(rule_id, tenant_id)
         except Exception as e:
             print(f"Error updating alert rule: {e}")
             raise
@@ -3482,7 +3973,7 @@ class DatabaseManager:
     
     def delete_alert_rule_v2(self, rule_id: int, tenant_id: str = "default") -> bool:
         """Delete an alert rule"""
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -3505,75 +3996,96 @@ class DatabaseManager:
         Get all effective alert rules for a target (agent or bookmark),
         including global rules with any overrides applied.
         """
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        return self.get_effective_rules_and_overrides(target_type, target_id, tenant_id)[0]
+    
+    def get_effective_rules_and_overrides(self, target_type: str, target_id: str,
+                                          tenant_id: str = "default") -> Tuple[list, list]:
+        """
+        Get a target's effective rules and its rule overrides in one query.
+        
+        Returns:
+            (effective_rules, overrides) - effective_rules as from
+            get_effective_rules_for_target, overrides as from
+            get_rule_overrides_for_target
+        """
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         try:
-            # Get global rules
+            # Enabled global + target-specific rules, plus any rule this target
+            # has an override for (overrides are listed even on disabled rules)
             cursor.execute("""
-                SELECT r.*, o.override_type, o.modified_threshold, o.modified_channels
+                SELECT r.*, o.id AS override_id, o.override_type,
+                       o.modified_threshold, o.modified_channels
                 FROM alert_rules_v2 r
                 LEFT JOIN alert_rule_overrides o 
                     ON r.id = o.rule_id 
                     AND o.target_type = ? 
                     AND o.target_id = ?
-                WHERE r.tenant_id = ? AND r.scope = 'global' AND r.enabled = 1
-            """, (target_type, target_id, tenant_id))
-            
-            global_rules = cursor.fetchall()
-            
-            # Get target-specific rules
-            cursor.execute("""
-                SELECT * FROM alert_rules_v2
-                WHERE tenant_id = ? AND scope = ? AND target_id = ? AND enabled = 1
-            """, (tenant_id, target_type, target_id))
-            
-            specific_rules = cursor.fetchall()
+                WHERE o.id IS NOT NULL
+                   OR (r.tenant_id = ? AND r.enabled = 1
+                       AND (r.scope = 'global' OR (r.scope = ? AND r.target_id = ?)))
+            """, (target_type, target_id, tenant_id, target_type, target_id))
             
-            effective = []
+            rows = cursor.fetchall()
             
-            # Process global rules with overrides
-            for row in global_rules:
-                if row["override_type"] == "disable":
-                    continue  # Skip disabled rules
+            global_rules = []
+            specific_rules = []
+            overrides = []
+            
+            for row in rows:
+                if row["override_id"] is not None:
+                    overrides.append({
+                        "id": row["override_id"],
+                        "rule_id": row["id"],
+                        "rule_name": row["name"],
+                        "metric": row["metric"],
+                        "original_threshold": row["threshold"],
+                        "override_type": row["override_type"],
+                        "modified_threshold": row["modified_threshold"],
+                        "modified_channels": json.loads(row["modified_channels"]) if row["modified_channels"] else None
+                    })
                 
-                rule = {
-                    "id": row["id"],
-                    "name": row["name"],
-                    "description": row["description"],
-                    "scope": "global",
-                    "metric": row["metric"],
-                    "operator": row["operator"],
-                    "threshold": row["modified_threshold"] if row["override_type"] == "modify" else row["threshold"],
-                    "channels": json.loads(row["modified_channels"]) if row["modified_channels"] else json.loads(row["channels"]),
-                    "cooldown_minutes": row["cooldown_minutes"],
-                    "is_overridden": row["override_type"] is not None,
-                    "override_type": row["override_type"]
-                }
-                effective.append(rule)
-            
-            # Add target-specific rules
-            for row in specific_rules:
-                rule = {
-                    "id": row["id"],
-                    "name": row["name"],
-                    "description": row["description"],
-                    "scope": row["scope"],
-                    "metric": row["metric"],
-                    "operator": row["operator"],
-                    "threshold": row["threshold"],
-                    "channels": json.loads(row["channels"]) if row["channels"] else [],
-                    "cooldown_minutes": row["cooldown_minutes"],
-                    "is_overridden": False,
-                    "override_type": None
-                }
-                effective.append(rule)
-            
-            return effective
+                if row["tenant_id"] != tenant_id or not row["enabled"]:
+                    continue
+                
+                if row["scope"] == "global":
+                    if row["override_type"] == "disable":
+                        continue  # Skip disabled rules
+                    
+                    global_rules.append({
+                        "id": row["id"],
+                        "name": row["name"],
+                        "description": row["description"],
+                        "scope": "global",
+                        "metric": row["metric"],
+                        "operator": row["operator"],
+                        "threshold": row["modified_threshold"] if row["override_type"] == "modify" else row["threshold"],
+                        "channels": json.loads(row["modified_channels"]) if row["modified_channels"] else json.loads(row["channels"]),
+                        "cooldown_minutes": row["cooldown_minutes"],
+                        "is_overridden": row["override_type"] is not None,
+                        "override_type": row["override_type"]
+                    })
+                elif row["scope"] == target_type and row["target_id"] == target_id:
+                    specific_rules.append({
+                        "id": row["id"],
+                        "name": row["name"],
+                        "description": row["description"],
+                        "scope": row["scope"],
+                        "metric": row["metric"],
+                        "operator": row["operator"],
+                        "threshold": row["threshold"],
+                        "channels": json.loads(row["channels"]) if row["channels"] else [],
+                        "cooldown_minutes": row["cooldown_minutes"],
+                        "is_overridden": False,
+                        "override_type": None
+                    })
+            
+            return global_rules + specific_rules, overrides
         except Exception as e:
             print(f"Error getting effective rules: {e}")
-            return []
+            return [], []
         finally:
             conn.close()
     
@@ -3581,7 +4093,7 @@ class DatabaseManager:
                           override_type: str, modified_threshold: str = None,
                           modified_channels: list = None) -> bool:
         """Set an override for a global rule on a specific target"""
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -3607,7 +4119,7 @@ class DatabaseManager:
     
     def remove_rule_override(self, rule_id: int, target_type: str, target_id: str) -> bool:
         """Remove an override for a rule"""
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -3626,7 +4138,7 @@ class DatabaseManager:
     
     def get_rule_overrides_for_target(self, target_type: str, target_id: str) -> list:
         """Get all rule overrides for a specific target"""
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn = self._connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -3776,101 +4288,101 @@ class DatabaseManager:
         if not settings.get("logging_enabled", True):
             return {"inserted": 0, "agent_id": agent_id, "reason": "logging_disabled"}
         
-        conn = sqlite3.connect(SQLITE_DB_PATH)
-        cursor = conn.cursor()
-        
-        inserted = 0
         level_threshold = settings.get("log_level_threshold", "ERROR")
         level_priority = {"DEBUG": 0, "INFO": 1, "WARN": 2, "WARNING": 2, "ERROR": 3, "CRITICAL": 4, "FATAL": 4}
         threshold_priority = level_priority.get(level_threshold.upper(), 3)
+        filter_by_level = not settings.get("troubleshooting_mode")
+        now = datetime.now().isoformat()
         
+        rows = []
         for log_entry in logs:
             severity = log_entry.get("severity", "INFO").upper()
-            log_priority = level_priority.get(severity, 1)
             
             # Filter by level threshold (unless troubleshooting mode)
-            if not settings.get("troubleshooting_mode") and log_priority < threshold_priority:
+            if filter_by_level and level_priority.get(severity, 1) < threshold_priority:
                 continue
             
-            timestamp = log_entry.get("timestamp", datetime.now().isoformat())
-            source = log_entry.get("source", "System")
-            message = log_entry.get("message", "")
-            metadata = json.dumps(log_entry.get("metadata", {})) if log_entry.get("metadata") else None
-            
-            cursor.execute("""
-                INSERT INTO raw_logs (agent_id, timestamp, severity, source, message, metadata)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (agent_id, timestamp, severity, source, message, metadata))
-            inserted += 1
+            metadata = log_entry.get("metadata")
+            rows.append((
+                agent_id,
+                log_entry.get("timestamp", now),
+                severity,
+                log_entry.get("source", "System"),
+                log_entry.get("message", ""),
+                json.dumps(metadata) if metadata else None
+            ))
         
-        conn.commit()
-        conn.close()
+        inserted = len(rows)
+        if rows:
+            # One prepared statement and one transaction for the whole batch
+            conn = self._connect()
+            try:
+                conn.executemany("""
+                    INSERT INTO raw_logs (agent_id, timestamp, severity, source, message, metadata)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, rows)
+                conn.commit()
+            finally:
+                conn.close()
         
         if inserted > 0:
             print(f"📝 Ingested {inserted} logs for agent {agent_id}")
         
         return {"inserted": inserted, "agent_id": agent_id}
     
-    def get_raw_logs(self, agent_id: str = None, severity: str = None, source: str = None,
+    def get_raw_logs(self, agent_id: str = None, agent_ids: List[str] = None,
+                     severity: str = None, source: str = None,
                      start_time: str = None, end_time: str = None, 
                      search: str = None, limit: int = 100, offset: int = 0) -> dict:
-        """Query raw logs with filtering and pagination"""
-        conn = sqlite3.connect(SQLITE_DB_PATH)
-        cursor = conn.cursor()
-        
-        # Build query dynamically
-        where_clauses = []
+        """Query raw logs with filtering and pagination. Supports single agent_id or multiple agent_ids."""
+        # Parameters are bound in the same order _raw_logs_where_sql emits clauses
         params = []
         
-        if agent_id:
-            where_clauses.append("agent_id = ?")
-            params.append(agent_id)
+        agents = list(agent_ids) if agent_ids else ([agent_id] if agent_id else [])
+        params.extend(agents)
         
+        severities = []
         if severity:
             # Support comma-separated severities
             severities = [s.strip().upper() for s in severity.split(",")]
-            placeholders = ",".join(["?" for _ in severities])
-            where_clauses.append(f"UPPER(severity) IN ({placeholders})")
             params.extend(severities)
         
         if source:
-            where_clauses.append("UPPER(source) = UPPER(?)")
             params.append(source)
-        
         if start_time:
-            where_clauses.append("datetime(timestamp) >= datetime(?)")
             params.append(start_time)
-        
         if end_time:
-            where_clauses.append("datetime(timestamp) <= datetime(?)")
             params.append(end_time)
         
+        search_mode = None
         if search:
-            where_clauses.append("message LIKE ?")
+            use_fts = self._raw_logs_fts and len(search) >= RAW_LOG_FTS_MIN_SEARCH
+            search_mode = "fts" if use_fts else "like"
             params.append(f"%{search}%")
         
-        where_sql = ""
-        if where_clauses:
-            where_sql = "WHERE " + " AND ".join(where_clauses)
-        
-        # Count total
-        count_query = f"SELECT COUNT(*) FROM raw_logs {where_sql}"
-        cursor.execute(count_query, params)
-        total_count = cursor.fetchone()[0]
-        
-        # Fetch logs with pagination
-        query = f"""
-            SELECT id, agent_id, timestamp, severity, source, message, metadata, created_at
-            FROM raw_logs
-            {where_sql}
-            ORDER BY timestamp DESC
-            LIMIT ? OFFSET ?
-        """
-        params.extend([limit, offset])
+        where_sql = _raw_logs_where_sql(
+            len(agents), len(severities), bool(source), bool(start_time), bool(end_time), search_mode
+        )
         
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        conn.close()
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            
+            # Count total
+            cursor.execute(f"SELECT COUNT(*) FROM raw_logs {where_sql}", params)
+            total_count = cursor.fetchone()[0]
+            
+            # Fetch logs with pagination
+            cursor.execute(f"""
+                SELECT id, agent_id, timestamp, severity, source, message, metadata, created_at
+                FROM raw_logs
+                {where_sql}
+                ORDER BY timestamp DESC
+                LIMIT ? OFFSET ?
+            """, params + [limit, offset])
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
         
         logs = [
             {
@@ -3899,7 +4411,7 @@ class DatabaseManager:
         The Reaper: Clean up old logs based on per-agent retention settings.
         This should be called by a daily cron job.
         """
-        conn = sqlite3.connect(SQLITE_DB_PATH)
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Get all agents with their retention settings
@@ -3918,15 +4430,29 @@ class DatabaseManager:
         
         for agent_id, hostname, retention_days in agents:
             # Calculate cutoff timestamp
-            cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
-            
-            # Delete old logs for this agent
-            cursor.execute("""
-                DELETE FROM raw_logs 
-                WHERE agent_id = ? AND datetime(timestamp) < datetime(?)
-            """, (agent_id, cutoff))
+            cutoff_dt = datetime.now() - timedelta(days=retention_days)
+            cutoff = cutoff_dt.isoformat()
+            # Agent timestamps carry their own UTC offset, so a row's date prefix can
+            # be a day off its UTC date; rows dated two days past the cutoff are
+            # always newer. This bound lets idx_raw_logs_cleanup skip the retained
+            # range while datetime() decides the rows near the cutoff exactly
+            scan_bound = (cutoff_dt + timedelta(days=2)).date().isoformat()
+            
+            # Delete old logs for this agent in batches, committing each one
+            deleted = 0
+            while True:
+                cursor.execute("""
+                    DELETE FROM raw_logs WHERE id IN (
+                        SELECT id FROM raw_logs
+                        WHERE agent_id = ? AND timestamp < ? AND datetime(timestamp) < datetime(?)
+                        LIMIT ?
+                    )
+                """, (agent_id, scan_bound, cutoff, RAW_LOG_REAP_BATCH_SIZE))
+                conn.commit()
+                deleted += cursor.rowcount
+                if cursor.rowcount < RAW_LOG_REAP_BATCH_SIZE:
+                    break
             
-            deleted = cursor.rowcount
             total_deleted += deleted
             
             if deleted > 0:
@@ -5273,6 +5799,35 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def get_bookmarks_status_counts(self, tenant_id: str) -> dict:
+        """Count bookmarks by latest check status (up/down/unknown cover active ones only)"""
+        conn = self._connect()
+        try:
+            row = conn.execute("""
+                SELECT 
+                    COUNT(*),
+                    SUM(CASE WHEN active AND last_status = 1 THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN active AND last_status <> 1 THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN active AND last_status IS NULL THEN 1 ELSE 0 END)
+                FROM (
+                    SELECT b.active,
+                           (SELECT status FROM bookmark_checks 
+                            WHERE bookmark_id = b.id 
+                            ORDER BY created_at DESC LIMIT 1) as last_status
+                    FROM bookmarks b
+                    WHERE b.tenant_id = ?
+                )
+            """, (tenant_id,)).fetchone()
+        finally:
+            conn.close()
+        
+        return {
+            "total": row[0],
+            "up": row[1] or 0,
+            "down": row[2] or 0,
+            "unknown": row[3] or 0
+        }
+    
     def get_bookmark(self, tenant_id: str, bookmark_id: str) -> dict:
         """Get a bookmark by ID"""
         conn = sqlite3.connect(SQLITE_DB_PATH)
@@ -5346,6 +5901,48 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    def get_bookmarks_in_scope(self, tenant_id: str, scope_ids: List[str] = None,
+                               scope_tags: List[str] = None) -> List[dict]:
+        """
+        Get active bookmarks with their latest status, filtered in SQL.
+        
+        Args:
+            tenant_id: Tenant to read
+            scope_ids / scope_tags: Profile scope - bookmark must match an ID or a tag
+                (no scope = every active bookmark)
+        """
+        has_tag_sql = _has_tag_sql("b.tags")
+        
+        conditions = ["b.tenant_id = ?", "b.active = 1"]
+        params = [tenant_id]
+        if scope_ids or scope_tags:
+            scope_conditions = []
+            if scope_ids:
+                scope_conditions.append(f"b.id IN ({', '.join('?' for _ in scope_ids)})")
+                params.extend(scope_ids)
+            for scope_tag in scope_tags or []:
+                scope_conditions.append(has_tag_sql)
+                params.append(scope_tag)
+            conditions.append(f"({' OR '.join(scope_conditions)})")
+        
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(f"""
+                SELECT b.*, 
+                       (SELECT status FROM bookmark_checks 
+                        WHERE bookmark_id = b.id 
+                        ORDER BY created_at DESC LIMIT 1) as last_status
+                FROM bookmarks b
+                WHERE {' AND '.join(conditions)}
+                ORDER BY b.name ASC
+            """, params)
+            return [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+    
     def get_all_bookmarks(self, active_only: bool = False) -> List[dict]:
         """Get all bookmarks across all tenants (for monitor engine)"""
         conn = sqlite3.connect(SQLITE_DB_PATH)
@@ -5736,6 +6333,52 @@ class DatabaseManager:
         finally:
             conn.close()
 
+    
+    def get_bookmark_checks_range_with_stats(self, tenant_id: str, bookmark_id: str,
+                                             hours: int = 24) -> Tuple[List[dict], dict]:
+        """
+        Get bookmark checks within a time range plus their aggregates.
+        
+        Returns:
+            (checks, {"total_checks", "uptime_percent", "avg_latency_ms"})
+        """
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        try:
+            cutoff = (datetime.utcnow() - timedelta(hours=hours)).isoformat()
+            cursor.execute("""
+                SELECT bc.*,
+                       COUNT(*) OVER () as total_checks,
+                       SUM(CASE WHEN bc.status = 1 THEN 1 ELSE 0 END) OVER () as up_checks,
+                       SUM(CASE WHEN bc.status = 1 THEN bc.latency_ms END) OVER () as up_latency_sum
+                FROM bookmark_checks bc
+                JOIN bookmarks b ON bc.bookmark_id = b.id
+                WHERE bc.bookmark_id = ? AND b.tenant_id = ? AND bc.created_at >= ?
+                ORDER BY bc.created_at DESC
+            """, (bookmark_id, tenant_id, cutoff))
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
+        
+        aggregate_columns = ("total_checks", "up_checks", "up_latency_sum")
+        checks = [
+            {key: row[key] for key in row.keys() if key not in aggregate_columns}
+            for row in rows
+        ]
+        
+        if not rows:
+            return checks, {"total_checks": 0, "uptime_percent": None, "avg_latency_ms": None}
+        
+        total = rows[0]["total_checks"]
+        up_count = rows[0]["up_checks"]
+        return checks, {
+            "total_checks": total,
+            "uptime_percent": round(up_count / total * 100, 2),
+            "avg_latency_ms": round((rows[0]["up_latency_sum"] or 0) / max(up_count, 1), 2)
+        }
+
 
     # ==================== REPORT PROFILES ====================
     
@@ -5856,16 +6499,49 @@ class DatabaseManager:
         
         return reports
     
-    def get_profile_report_pdf(self, profile_id: str, report_id: str) -> bytes:
-        """Get PDF content for a specific report"""
+    def get_profile_report_pdf_path(self, profile_id: str, report_id: str) -> Optional[Path]:
+        """Get the stored PDF file for a specific report (served without reading it into memory)"""
         storage_path = self._get_profile_storage_path(profile_id)
         pdf_path = storage_path / f"{report_id}.pdf"
         
-        if pdf_path.exists():
-            with open(pdf_path, 'rb') as f:
-                return f.read()
+        if pdf_path.is_file():
+            return pdf_path
         return None
     
+    def _report_profile_name(self, tenant_id: str, profile_id: str) -> Optional[str]:
+        """Name of a tenant's report profile (None if it isn't theirs)"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("""
+                SELECT name FROM report_profiles 
+                WHERE id = ? AND tenant_id = ?
+            """, (profile_id, tenant_id))
+            row = cursor.fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+    
+    def get_profile_reports_if_owned(self, tenant_id: str, profile_id: str) -> Optional[List[dict]]:
+        """Get a profile's stored reports if the profile belongs to the tenant (None otherwise)"""
+        if self._report_profile_name(tenant_id, profile_id) is None:
+            return None
+        return self.get_profile_reports(profile_id)
+    
+    def get_profile_report_pdf_if_owned(self, tenant_id: str, profile_id: str,
+                                        report_id: str) -> Optional[Tuple[str, Optional[Path]]]:
+        """
+        Get (profile name, PDF path) for a report if the profile belongs to the tenant.
+        
+        Returns:
+            None if the tenant has no such profile; the path is None if the PDF is missing
+        """
+        profile_name = self._report_profile_name(tenant_id, profile_id)
+        if profile_name is None:
+            return None
+        return profile_name, self.get_profile_report_pdf_path(profile_id, report_id)
+    
     def create_report_profile(self, tenant_id: str, name: str, description: str = None,
                               frequency: str = "MONTHLY",
                               sla_target: float = 99.9,
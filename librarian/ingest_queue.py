@@ -0,0 +1,436 @@
+"""
+Heartbeat Ingest Queue Module
+
+Decouples the HTTP heartbeat handler from database writes. Heartbeats are
+pushed onto an in-process asyncio.Queue and a background worker drains them
+in batches, so many concurrent beats collapse into a few DB round-trips.
+
+Features:
+- Bounded queue (default 50,000 heartbeats)
+- Worker drains up to N items or T ms per batch
+- Metrics grouped per agent and handed to the metrics buffer in one call
+- Process snapshots and system info deduplicated per agent (latest wins)
+  and written with one bulk statement each
+- Steady-state agent touches (last_seen/status) coalesced into one bulk
+  UPDATE per batch; full upserts only when identity fields change
+- System info skipped entirely when its hash matches the last write
+  for that agent (scribes resend the same cached info every beat)
+- Process snapshots skipped when the (bucketed) process list is unchanged,
+  with a periodic snapshot still written every PROCESS_SNAPSHOT_MIN_INTERVAL
+- Inline fallback when the queue is full or not running (no data loss)
+
+Configuration:
+- INGEST_QUEUE_MAX_SIZE: Max queued heartbeats (default: 50000)
+- INGEST_BATCH_MAX_ITEMS: Max heartbeats per batch (default: 500)
+- INGEST_BATCH_MAX_WAIT_MS: Max time to wait while filling a batch (default: 100)
+- SYSINFO_HASH_CACHE_SIZE: Agents whose last system info hash is remembered (default: 50000)
+- AGENT_IDENTITY_CACHE_SIZE: Agents whose upserted identity is remembered (default: 50000)
+- PROCESS_SNAPSHOT_MIN_INTERVAL: Seconds between snapshots of an unchanged process list (default: 60)
+- PROCESS_SNAPSHOT_BUCKET_PERCENT: CPU/RAM % bucket width ignored as jitter (default: 5)
+- PROCESS_HASH_CACHE_SIZE: Agents whose last process list hash is remembered (default: 50000)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable
+from dataclasses import dataclass, field
+
+import orjson
+
+
+logger = logging.getLogger("librarian.ingest")
+
+# Configuration
+INGEST_QUEUE_MAX_SIZE = int(os.getenv("INGEST_QUEUE_MAX_SIZE", "50000"))
+INGEST_BATCH_MAX_ITEMS = int(os.getenv("INGEST_BATCH_MAX_ITEMS", "500"))
+INGEST_BATCH_MAX_WAIT_MS = float(os.getenv("INGEST_BATCH_MAX_WAIT_MS", "100"))
+SYSINFO_HASH_CACHE_SIZE = int(os.getenv("SYSINFO_HASH_CACHE_SIZE", "50000"))
+AGENT_IDENTITY_CACHE_SIZE = int(os.getenv("AGENT_IDENTITY_CACHE_SIZE", "50000"))
+PROCESS_SNAPSHOT_MIN_INTERVAL = float(os.getenv("PROCESS_SNAPSHOT_MIN_INTERVAL", "60"))
+PROCESS_SNAPSHOT_BUCKET_PERCENT = float(os.getenv("PROCESS_SNAPSHOT_BUCKET_PERCENT", "5"))
+PROCESS_HASH_CACHE_SIZE = int(os.getenv("PROCESS_HASH_CACHE_SIZE", "50000"))
+
+
+def _system_info_digest(system_info: dict) -> bytes:
+    """Stable, cheap fingerprint of a system info dict (non-cryptographic use)"""
+    return hashlib.blake2b(
+        orjson.dumps(system_info, option=orjson.OPT_SORT_KEYS),
+        digest_size=16
+    ).digest()
+
+
+def process_list_digest(processes) -> bytes:
+    """
+    Fingerprint of a process list that ignores CPU/RAM jitter.
+
+    Accepts ProcessInfo models or dicts. Usage is bucketed to
+    PROCESS_SNAPSHOT_BUCKET_PERCENT so small fluctuations hash the same.
+    """
+    bucket = PROCESS_SNAPSHOT_BUCKET_PERCENT or 1.0
+    rows = []
+    for proc in processes:
+        if isinstance(proc, dict):
+            pid, name, cpu, ram = proc["pid"], proc["name"], proc["cpu_percent"], proc["ram_percent"]
+        else:
+            pid, name, cpu, ram = proc.pid, proc.name, proc.cpu_percent, proc.ram_percent
+        rows.append((pid, name, int(cpu // bucket), int(ram // bucket)))
+    rows.sort()
+    return hashlib.blake2b(orjson.dumps(rows), digest_size=16).digest()
+
+
+@dataclass
+class IngestQueueStats:
+    """Statistics for heartbeat ingest queue monitoring"""
+    total_enqueued: int = 0
+    total_batches: int = 0
+    total_items_flushed: int = 0
+    inline_fallbacks: int = 0
+    flush_errors: int = 0
+    system_info_writes_skipped: int = 0
+    process_snapshots_skipped: int = 0
+    agent_upserts: int = 0
+    agent_touches: int = 0
+    last_batch_size: int = 0
+    last_batch_latency_ms: float = 0.0
+    max_queue_depth_seen: int = 0
+
+    # Rolling averages
+    _latency_samples: List[float] = field(default_factory=list)
+    _max_samples: int = 100
+
+    def record_batch(self, items: int, latency_ms: float):
+        """Record a flushed batch"""
+        self.total_batches += 1
+        self.total_items_flushed += items
+        self.last_batch_size = items
+        self.last_batch_latency_ms = latency_ms
+        self._latency_samples.append(latency_ms)
+        if len(self._latency_samples) > self._max_samples:
+            self._latency_samples.pop(0)
+
+    def to_dict(self) -> dict:
+        """Export stats as dictionary"""
+        avg_latency = (
+            sum(self._latency_samples) / len(self._latency_samples)
+            if self._latency_samples else 0.0
+        )
+        return {
+            "total_enqueued": self.total_enqueued,
+            "total_batches": self.total_batches,
+            "total_items_flushed": self.total_items_flushed,
+            "inline_fallbacks": self.inline_fallbacks,
+            "flush_errors": self.flush_errors,
+            "system_info_writes_skipped": self.system_info_writes_skipped,
+            "process_snapshots_skipped": self.process_snapshots_skipped,
+            "agent_upserts": self.agent_upserts,
+            "agent_touches": self.agent_touches,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_latency_ms": round(self.last_batch_latency_ms, 2),
+            "avg_batch_latency_ms": round(avg_latency, 2),
+            "max_queue_depth_seen": self.max_queue_depth_seen
+        }
+
+
+class HeartbeatIngestQueue:
+    """
+    Batched heartbeat ingestion.
+
+    Each queued item is a dict with keys:
+        agent_id, metrics, load_avg, processes (JSON bytes or list), system_info, ts
+    and optionally:
+        processes_digest: process_list_digest() of the processes (enables dedup)
+        touch: (last_seen, status) for an agent whose identity is already stored
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        metrics_callback: Optional[Callable] = None,
+        max_size: int = INGEST_QUEUE_MAX_SIZE,
+        batch_max_items: int = INGEST_BATCH_MAX_ITEMS,
+        batch_max_wait_ms: float = INGEST_BATCH_MAX_WAIT_MS
+    ):
+        """
+        Initialize the ingest queue.
+
+        Args:
+            db_manager: Database manager providing bulk snapshot/system-info writes
+            metrics_callback: async (agent_id, metrics, load_avg) -> int (e.g. MetricsBuffer.add_metrics)
+            max_size: Max queued heartbeats before falling back to inline writes
+            batch_max_items: Max heartbeats drained per batch
+            batch_max_wait_ms: Max time spent filling a batch after the first item
+        """
+        self.db_manager = db_manager
+        self.metrics_callback = metrics_callback
+        self.batch_max_items = batch_max_items
+        self.batch_max_wait = batch_max_wait_ms / 1000.0
+
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._running = False
+        self._worker_task: Optional[asyncio.Task] = None
+
+        # agent_id -> digest of the last system info written (LRU-bounded)
+        self._sysinfo_hash: "OrderedDict[str, bytes]" = OrderedDict()
+        # agent_id -> (hostname, public_ip, connection_address) last upserted (LRU-bounded)
+        self._agent_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        # agent_id -> (process list digest, monotonic time of last insert) (LRU-bounded)
+        self._proc_hash_and_ts: "OrderedDict[str, tuple]" = OrderedDict()
+
+        self.stats = IngestQueueStats()
+
+    @property
+    def depth(self) -> int:
+        """Current number of queued heartbeats"""
+        return self._queue.qsize()
+
+    async def start(self):
+        """Start the background worker"""
+        if self._running:
+            return
+
+        self._running = True
+        self._worker_task = asyncio.create_task(self._worker())
+        print(f"📥 Heartbeat ingest queue started (batch: {self.batch_max_items} items / {self.batch_max_wait * 1000:.0f}ms)")
+
+    async def stop(self):
+        """Stop the worker and drain anything still queued"""
+        self._running = False
+
+        if self._worker_task:
+            self._worker_task.cancel()
+            try:
+                await self._worker_task
+            except asyncio.CancelledError:
+                pass
+
+        # Drain remaining items so no heartbeat data is lost on shutdown
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        if remaining:
+            await self._flush_batch(remaining)
+
+        print(f"📥 Heartbeat ingest queue stopped. Final stats: {self.stats.to_dict()}")
+
+    def forget_agent(self, agent_id: str) -> None:
+        """Drop cached state for an agent (e.g. after it is deleted)"""
+        self._sysinfo_hash.pop(agent_id, None)
+        self._agent_cache.pop(agent_id, None)
+        self._proc_hash_and_ts.pop(agent_id, None)
+
+    def is_known_agent(self, agent_id: str, hostname: str, public_ip: str, connection_address: str) -> bool:
+        """True when the stored agent row already has these identity fields"""
+        cached = self._agent_cache.get(agent_id)
+        if cached is None or cached != (hostname, public_ip, connection_address):
+            return False
+        self._agent_cache.move_to_end(agent_id)
+        return True
+
+    def remember_agent(self, agent_id: str, hostname: str, public_ip: str, connection_address: str) -> None:
+        """Record identity fields after a full upsert, evicting least recently seen agents"""
+        self.stats.agent_upserts += 1
+        self._agent_cache[agent_id] = (hostname, public_ip, connection_address)
+        self._agent_cache.move_to_end(agent_id)
+        while len(self._agent_cache) > AGENT_IDENTITY_CACHE_SIZE:
+            self._agent_cache.popitem(last=False)
+
+    def _filter_changed_system_info(self, latest: Dict[str, dict]) -> Dict[str, tuple]:
+        """Return {agent_id: (system_info, digest)} for entries that differ from the last write"""
+        changed = {}
+        for agent_id, system_info in latest.items():
+            digest = _system_info_digest(system_info)
+            if self._sysinfo_hash.get(agent_id) == digest:
+                self._sysinfo_hash.move_to_end(agent_id)
+                self.stats.system_info_writes_skipped += 1
+                continue
+            changed[agent_id] = (system_info, digest)
+        return changed
+
+    def _filter_changed_processes(self, latest: Dict[str, tuple]) -> Dict[str, tuple]:
+        """
+        Drop snapshots whose process list matches the last insert for that
+        agent, unless PROCESS_SNAPSHOT_MIN_INTERVAL has elapsed since then.
+
+        latest maps agent_id -> (snapshot_tuple, digest); returns the same
+        shape for snapshots that should be written.
+        """
+        now = time.monotonic()
+        changed = {}
+        for agent_id, (snapshot, digest) in latest.items():
+            previous = self._proc_hash_and_ts.get(agent_id)
+            if (
+                digest is not None
+                and previous is not None
+                and previous[0] == digest
+                and now - previous[1] < PROCESS_SNAPSHOT_MIN_INTERVAL
+            ):
+                self._proc_hash_and_ts.move_to_end(agent_id)
+                self.stats.process_snapshots_skipped += 1
+                continue
+            changed[agent_id] = (snapshot, digest)
+        return changed
+
+    def _remember_processes(self, written: Dict[str, tuple]) -> None:
+        """Record digests and insert times of written snapshots, evicting least recently seen agents"""
+        now = time.monotonic()
+        for agent_id, (_, digest) in written.items():
+            if digest is None:
+                continue
+            self._proc_hash_and_ts[agent_id] = (digest, now)
+            self._proc_hash_and_ts.move_to_end(agent_id)
+        while len(self._proc_hash_and_ts) > PROCESS_HASH_CACHE_SIZE:
+            self._proc_hash_and_ts.popitem(last=False)
+
+    def _remember_system_info(self, changed: Dict[str, tuple]) -> None:
+        """Record digests of written system info, evicting least recently seen agents"""
+        for agent_id, (_, digest) in changed.items():
+            self._sysinfo_hash[agent_id] = digest
+            self._sysinfo_hash.move_to_end(agent_id)
+        while len(self._sysinfo_hash) > SYSINFO_HASH_CACHE_SIZE:
+            self._sysinfo_hash.popitem(last=False)
+
+    async def submit(self, item: Dict[str, Any]) -> None:
+        """
+        Queue a heartbeat for batched processing.
+
+        Falls back to processing the item inline when the worker is not
+        running or the queue is full, so correctness is preserved under
+        back-pressure.
+        """
+        if self._running:
+            try:
+                self._queue.put_nowait(item)
+                self.stats.total_enqueued += 1
+                depth = self._queue.qsize()
+                if depth > self.stats.max_queue_depth_seen:
+                    self.stats.max_queue_depth_seen = depth
+                return
+            except asyncio.QueueFull:
+                pass
+
+        self.stats.inline_fallbacks += 1
+        await self._flush_batch([item])
+
+    async def _worker(self):
+        """Background task that drains the queue in batches"""
+        loop = asyncio.get_running_loop()
+        while self._running:
+            try:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.batch_max_wait
+
+                while len(batch) < self.batch_max_items:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                await self._flush_batch(batch)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("Ingest worker error: %s", e)
+                self.stats.flush_errors += 1
+
+    async def _flush_batch(self, batch: List[Dict[str, Any]]):
+        """Group a batch by table and write each group in one call"""
+        start_time = time.time()
+
+        metrics_by_agent: Dict[str, List[dict]] = {}
+        load_avg_by_agent: Dict[str, float] = {}
+        latest_processes: Dict[str, tuple] = {}
+        latest_system_info: Dict[str, dict] = {}
+        latest_touch: Dict[str, tuple] = {}
+
+        for item in batch:
+            agent_id = item["agent_id"]
+            if item.get("touch"):
+                last_seen, status = item["touch"]
+                latest_touch[agent_id] = (agent_id, last_seen, status)
+            if item.get("metrics"):
+                metrics_by_agent.setdefault(agent_id, []).extend(item["metrics"])
+                load_avg_by_agent[agent_id] = item.get("load_avg", 0.0)
+            if item.get("processes"):
+                latest_processes[agent_id] = (
+                    (agent_id, item["ts"], item["processes"]),
+                    item.get("processes_digest")
+                )
+            if item.get("system_info"):
+                latest_system_info[agent_id] = item["system_info"]
+
+        loop = asyncio.get_running_loop()
+
+        try:
+            if latest_touch:
+                await loop.run_in_executor(
+                    None, self.db_manager.bulk_touch_agents, list(latest_touch.values())
+                )
+                self.stats.agent_touches += len(latest_touch)
+
+            if self.metrics_callback:
+                for agent_id, metrics in metrics_by_agent.items():
+                    await self.metrics_callback(
+                        agent_id=agent_id,
+                        metrics=metrics,
+                        load_avg=load_avg_by_agent.get(agent_id, 0.0)
+                    )
+
+            changed_processes = self._filter_changed_processes(latest_processes)
+            if changed_processes:
+                await loop.run_in_executor(
+                    None,
+                    self.db_manager.bulk_insert_process_snapshots,
+                    [snapshot for snapshot, _ in changed_processes.values()]
+                )
+                self._remember_processes(changed_processes)
+
+            changed_system_info = self._filter_changed_system_info(latest_system_info)
+            if changed_system_info:
+                await loop.run_in_executor(
+                    None,
+                    self.db_manager.bulk_update_agent_system_info,
+                    [(agent_id, info) for agent_id, (info, _) in changed_system_info.items()]
+                )
+                # Only remember digests once the write succeeded, so failures retry
+                self._remember_system_info(changed_system_info)
+
+            self.stats.record_batch(len(batch), (time.time() - start_time) * 1000)
+        except Exception as e:
+            logger.error("Ingest batch flush error (%d heartbeats): %s", len(batch), e)
+            self.stats.flush_errors += 1
+
+    def get_stats(self) -> dict:
+        """Get queue statistics"""
+        stats = self.stats.to_dict()
+        stats["current_depth"] = self.depth
+        stats["running"] = self._running
+        stats["system_info_hashes_cached"] = len(self._sysinfo_hash)
+        stats["agent_identities_cached"] = len(self._agent_cache)
+        stats["process_hashes_cached"] = len(self._proc_hash_and_ts)
+        return stats
+
+
+# Global queue instance (initialized in main.py)
+_ingest_queue: Optional[HeartbeatIngestQueue] = None
+
+
+def get_ingest_queue() -> Optional[HeartbeatIngestQueue]:
+    """Get the global heartbeat ingest queue instance"""
+    return _ingest_queue
+
+
+def init_ingest_queue(db_manager, metrics_callback: Optional[Callable] = None) -> HeartbeatIngestQueue:
+    """Initialize the global heartbeat ingest queue"""
+    global _ingest_queue
+    _ingest_queue = HeartbeatIngestQueue(
+        db_manager=db_manager,
+        metrics_callback=metrics_callback
+    )
+    return _ingest_queue
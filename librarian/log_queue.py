@@ -0,0 +1,59 @@
+"""
+Queued Logging Module
+
+Routes the "librarian" logger hierarchy through a QueueHandler so hot
+request paths (heartbeats, agent WebSockets, ingest worker) only enqueue
+a record; formatting and the stdout write happen on a QueueListener
+background thread.
+
+Usage:
+    logger = logging.getLogger("librarian")        # or "librarian.<area>"
+    logger.warning("Authentication failed for %s", agent_id)
+
+Configuration:
+- LOG_LEVEL: Level for the librarian loggers (default: INFO)
+"""
+
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+
+# Configuration
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+_log_listener: Optional[QueueListener] = None
+
+
+def init_log_queue() -> logging.Logger:
+    """Attach a QueueHandler to the librarian logger and start the listener thread"""
+    global _log_listener
+
+    logger = logging.getLogger("librarian")
+    if _log_listener is not None:
+        return logger
+
+    log_queue: queue.Queue = queue.Queue(-1)
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    logger.setLevel(LOG_LEVEL)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False
+
+    _log_listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _log_listener.start()
+    return logger
+
+
+def stop_log_queue() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
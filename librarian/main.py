@@ -1,19 +1,36 @@
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Request, Depends, Header, Response, Body
-from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Request, Depends, Header, Response, Body, Query, BackgroundTasks
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse, ORJSONResponse
+from fastapi.exceptions import RequestValidationError
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, validator
-from typing import Dict, List, Optional
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, validator
+from typing import Dict, List, Literal, Optional
 from datetime import datetime, timedelta
 import uvicorn
 import json
+import orjson
 import asyncio
-import gzip
+import functools
+import hashlib
+import itertools
+import logging
 import os
 import re
 import secrets
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
 
-from models import LogBatch, HeartbeatPayload, ReportProfileCreate, ReportProfileUpdate
+from models import LogBatch, HeartbeatPayload, MetricPoint, ProcessInfo, ReportProfileCreate, ReportProfileUpdate
 from metrics_buffer import MetricsBuffer, init_metrics_buffer, get_metrics_buffer
+from ingest_queue import HeartbeatIngestQueue, init_ingest_queue, process_list_digest
+from request_decompression import RequestDecompressionMiddleware, REQUEST_MAX_DECOMPRESSED_BYTES
+from raw_log_parser import LogParseError, iter_log_chunks
+from log_queue import init_log_queue, stop_log_queue
+from response_cache import get_response_cache, compute_etag, etag_matches
+from sqlite_pool import get_sqlite_pool
+from notification_manager import APPRISE_AVAILABLE, get_apprise_for_url, notify_urls
 from retention_manager import (
     RetentionManager, init_retention_manager, get_retention_manager,
     get_disk_space_info, check_disk_space_ok, MIN_FREE_SPACE_GB, MIN_FREE_SPACE_PERCENT
@@ -33,7 +50,7 @@ from ai_reports import (
 )
 from archivist import get_archivist, Archivist
 from bookmark_monitor import (
-    BookmarkMonitor, init_monitor, get_monitor
+    BookmarkMonitor, init_monitor, get_monitor, BOOKMARKS_CACHE_NAMESPACE
 )
 
 # Import AI chat router
@@ -52,6 +69,23 @@ else:
     print("📁 SQLite mode enabled")
     from db import db_manager
 
+# Dedicated worker threads for blocking db_manager calls made from async handlers,
+# kept apart from the loop's default executor (AI inference, file I/O) and from
+# anyio's threadpool (sync dependencies) so slow queries can't starve either.
+# PostgreSQL: sized to the connection pool so threads never queue on a connection.
+# SQLite: a few threads per core - more only adds write-lock contention.
+DB_EXECUTOR_MAX_WORKERS = int(os.getenv(
+    "DB_EXECUTOR_MAX_WORKERS",
+    os.getenv("DB_POOL_MAX", "50") if USE_POSTGRES else str(min(32, (os.cpu_count() or 4) * 2))
+))
+DB_EXECUTOR = ThreadPoolExecutor(max_workers=DB_EXECUTOR_MAX_WORKERS, thread_name_prefix="db")
+
+
+async def _db(func, *args, **kwargs):
+    """Run a synchronous db_manager call on DB_EXECUTOR so it doesn't block the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(DB_EXECUTOR, functools.partial(func, *args, **kwargs))
+
 # Instance API key for scribe authentication (loaded from database after setup)
 # All scribes must provide this key to connect
 _instance_api_key: Optional[str] = None
@@ -69,29 +103,64 @@ def get_instance_api_key() -> Optional[str]:
             _instance_api_key = config.get('instance_api_key')
     return _instance_api_key
 
+# Validation results keyed by SHA-256 of the provided key: digest -> (is_valid, reason, expires_at)
+# Repeat heartbeats from the same scribe resolve with a dict lookup instead of
+# re-reading the instance key and re-comparing.
+_API_KEY_CACHE: Dict[bytes, tuple[bool, str, float]] = {}
+_API_KEY_CACHE_TTL_SECONDS = 300
+_API_KEY_CACHE_MAX_ENTRIES = 10_000
+# The pre-setup state is cached only briefly: setup clears this worker's cache,
+# but other workers must notice the new key within a few seconds
+_API_KEY_UNCONFIGURED_TTL_SECONDS = 5
+
 def clear_instance_api_key_cache():
-    """Clear the cached API key (call after regeneration)"""
+    """Clear the cached API key and validation results (call after regeneration)"""
     global _instance_api_key
     _instance_api_key = None
+    _API_KEY_CACHE.clear()
 
-def validate_scribe_api_key(provided_key: Optional[str]) -> tuple[bool, str]:
-    """Validate a scribe's API key against the instance key"""
-    if not provided_key:
-        return False, "no_api_key"
-    
+def _validate_scribe_api_key_uncached(provided_key: str) -> tuple[bool, str]:
+    """Compare a scribe's API key against the instance key"""
     instance_key = get_instance_api_key()
     if not instance_key:
         # No instance key set yet (setup not complete) - reject all
         return False, "instance_not_configured"
     
-    if secrets.compare_digest(provided_key, instance_key):
+    # Compare bytes: compare_digest rejects str arguments with non-ASCII characters
+    if secrets.compare_digest(provided_key.encode(), instance_key.encode()):
         return True, "valid"
     
     return False, "invalid_api_key"
 
+def validate_scribe_api_key(provided_key: Optional[str]) -> tuple[bool, str]:
+    """Validate a scribe's API key against the instance key (TTL-cached)"""
+    if not provided_key:
+        return False, "no_api_key"
+    
+    key_digest = hashlib.sha256(provided_key.encode()).digest()
+    now = time.monotonic()
+    cached = _API_KEY_CACHE.get(key_digest)
+    if cached is not None and now < cached[2]:
+        return cached[0], cached[1]
+    
+    is_valid, reason = _validate_scribe_api_key_uncached(provided_key)
+    
+    if reason == "instance_not_configured":
+        ttl = _API_KEY_UNCONFIGURED_TTL_SECONDS
+    else:
+        ttl = _API_KEY_CACHE_TTL_SECONDS
+    if len(_API_KEY_CACHE) >= _API_KEY_CACHE_MAX_ENTRIES:
+        _API_KEY_CACHE.clear()
+    _API_KEY_CACHE[key_digest] = (is_valid, reason, now + ttl)
+    
+    return is_valid, reason
+
 # Global metrics buffer (initialized on startup)
 metrics_buffer: Optional[MetricsBuffer] = None
 
+# Global heartbeat ingest queue (initialized on startup)
+ingest_queue: Optional[HeartbeatIngestQueue] = None
+
 # Global retention manager (initialized on startup)
 retention_manager: Optional[RetentionManager] = None
 
@@ -111,9 +180,14 @@ bookmark_monitor: Optional[BookmarkMonitor] = None
 app = FastAPI(
     title="LogLibrarian - The Librarian",
     description="Central log ingestion and AI-powered troubleshooting service",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Hot-path logging is queued and written by a background listener thread
+init_log_queue()
+logger = logging.getLogger("librarian")
+
 # Include AI chat router
 app.include_router(ai_chat_router)
 
@@ -141,6 +215,15 @@ else:
         allow_headers=["*"],
     )
 
+# Inflate gzip/zstd request bodies before they reach handlers
+app.add_middleware(RequestDecompressionMiddleware)
+
+# Compress larger JSON responses (rule/channel/history lists) for clients that
+# send Accept-Encoding: gzip; small responses are passed through untouched
+RESPONSE_GZIP_MIN_SIZE = int(os.environ.get("RESPONSE_GZIP_MIN_SIZE", "1024"))
+RESPONSE_GZIP_LEVEL = int(os.environ.get("RESPONSE_GZIP_LEVEL", "5"))
+app.add_middleware(GZipMiddleware, minimum_size=RESPONSE_GZIP_MIN_SIZE, compresslevel=RESPONSE_GZIP_LEVEL)
+
 
 # Panic Switch: Check disk space before allowing data ingestion
 # Protected endpoints that write data to disk
@@ -178,17 +261,16 @@ async def panic_switch_middleware(request: Request, call_next):
                 print(f"🚨 Rejecting all data ingestion until disk space is freed!")
             
             # Return 507 Insufficient Storage
-            return Response(
-                content=json.dumps({
+            return ORJSONResponse(
+                {
                     "error": "Insufficient Storage",
                     "detail": message,
                     "panic_switch": True,
                     "triggered_at": _panic_switch_triggered_at,
                     "min_free_space_gb": MIN_FREE_SPACE_GB,
                     "min_free_space_percent": MIN_FREE_SPACE_PERCENT
-                }),
-                status_code=507,
-                media_type="application/json"
+                },
+                status_code=507
             )
         else:
             # Reset panic state if space is OK
@@ -305,19 +387,29 @@ def cleanup_expired_sessions():
         print(f"Cleaned up {deleted} expired sessions")
 
 async def get_current_user(request: Request) -> Optional[dict]:
-    """Dependency to get current user from session token"""
+    """
+    Dependency to get current user from session token.
+    
+    The result (including "not authenticated") is memoized on request.state,
+    so handlers that combine Depends(require_admin) with their own
+    get_current_user() call only resolve the session once per request.
+    """
+    if hasattr(request.state, "user_cache"):
+        return request.state.user_cache
+    
+    user = None
     # Check Authorization header
     auth_header = request.headers.get("Authorization")
     if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header[7:]
-        session = get_session(token)
-        if session:
-            return session
+        user = await _db(get_session, auth_header[7:])
     # Check cookie as fallback
-    token = request.cookies.get("session_token")
-    if token:
-        return get_session(token)
-    return None
+    if not user:
+        token = request.cookies.get("session_token")
+        if token:
+            user = await _db(get_session, token)
+    
+    request.state.user_cache = user
+    return user
 
 async def require_auth(request: Request) -> dict:
     """Dependency that requires authentication"""
@@ -402,7 +494,7 @@ async def log_reaper_task():
     while watchdog_running:
         try:
             print("🧹 Log Reaper running daily cleanup...")
-            result = db_manager.reap_old_logs()
+            result = await _db(db_manager.reap_old_logs)
             print(f"🧹 Log Reaper complete: {result['total_deleted']} logs deleted from {result['agents_processed']} agents")
             
             # Also clean up old heartbeats (keep 30 days)
@@ -463,7 +555,7 @@ async def archivist_indexer_task():
 @app.on_event("startup")
 async def startup_event():
     """Initialize databases on startup"""
-    global watchdog_running, metrics_buffer, retention_manager, redis_queue, connection_manager
+    global watchdog_running, metrics_buffer, ingest_queue, retention_manager, redis_queue, connection_manager
     print("Starting LogLibrarian backend...")
     
     # Initialize optimized connection manager
@@ -481,6 +573,13 @@ async def startup_event():
     
     print("Database initialization complete")
     
+    # Load the instance API key now so the first scribe to connect doesn't pay
+    # for the DB read inside its (event loop) auth check
+    try:
+        get_instance_api_key()
+    except Exception as e:
+        print(f"⚠️ Could not preload instance API key: {e}")
+    
     # Initialize metrics buffer for batch inserts
     metrics_buffer = init_metrics_buffer(
         db_insert_func=db_manager.bulk_insert_metrics,
@@ -488,10 +587,18 @@ async def startup_event():
     )
     await metrics_buffer.start()
     
+    # Initialize heartbeat ingest queue (batches snapshot/system-info writes off the request path)
+    ingest_queue = init_ingest_queue(
+        db_manager=db_manager,
+        metrics_callback=metrics_buffer.add_metrics
+    )
+    await ingest_queue.start()
+    
     # Initialize Redis queue (optional - falls back to direct writes if unavailable)
     redis_queue = init_redis_queue(
         metrics_buffer_callback=metrics_buffer.add_metrics if metrics_buffer else None,
-        fallback_callback=metrics_buffer.add_metrics if metrics_buffer else None
+        fallback_callback=metrics_buffer.add_metrics if metrics_buffer else None,
+        logs_callback=_store_queued_raw_logs
     )
     redis_available = await redis_queue.initialize()
     if redis_available:
@@ -586,6 +693,14 @@ async def shutdown_event():
         except Exception as e:
             print(f"Error stopping retention manager: {e}")
     
+    # Stop ingest queue (drains queued heartbeats into the metrics buffer)
+    if ingest_queue:
+        try:
+            await ingest_queue.stop()
+            print("✓ Heartbeat ingest queue stopped and drained")
+        except Exception as e:
+            print(f"Error stopping ingest queue: {e}")
+    
     # Stop metrics buffer (flushes remaining data)
     if metrics_buffer:
         try:
@@ -594,15 +709,16 @@ async def shutdown_event():
         except Exception as e:
             print(f"Error stopping metrics buffer: {e}")
     
-    # Close PostgreSQL connection pool if using that backend
-    if USE_POSTGRES:
-        try:
-            db_manager.close()  # Now synchronous
-            print("✓ PostgreSQL connection pool closed")
-        except Exception as e:
-            print(f"Error closing PostgreSQL pool: {e}")
+    # Let in-flight DB calls finish, then close the database connection pool
+    DB_EXECUTOR.shutdown(wait=True)
+    try:
+        db_manager.close()
+        print(f"✓ {'PostgreSQL' if USE_POSTGRES else 'SQLite'} connection pool closed")
+    except Exception as e:
+        print(f"Error closing database pool: {e}")
     
     print("LogLibrarian backend shutting down...")
+    stop_log_queue()
 
 
 @app.get("/api/health")
@@ -822,6 +938,9 @@ async def complete_setup_wizard(setup: SetupWizardRequest, response: Response):
     if not result.get("success"):
         raise HTTPException(status_code=400, detail=result.get("error", "Setup failed"))
     
+    # The instance key was just set - drop any cached validation results
+    clear_instance_api_key_cache()
+    
     # Create session for the new admin
     user = db_manager.authenticate_user(setup.admin_username, setup.admin_password)
     if user:
@@ -1113,6 +1232,22 @@ async def get_connection_stats():
     }
 
 
+@app.get("/api/debug/pool")
+async def get_db_pool_stats(user: dict = Depends(require_admin)):
+    """Get database connection pool statistics (admin only)"""
+    if USE_POSTGRES:
+        return {
+            "backend": "postgresql",
+            "pool": db_manager.get_connection_pool_stats(),
+            "executor_max_workers": DB_EXECUTOR_MAX_WORKERS
+        }
+    return {
+        "backend": "sqlite",
+        "pool": db_manager._sqlite_pool.get_stats(),
+        "executor_max_workers": DB_EXECUTOR_MAX_WORKERS
+    }
+
+
 @app.get("/api/redis/stats")
 async def get_redis_stats():
     """Get Redis queue statistics for monitoring"""
@@ -1138,7 +1273,8 @@ async def get_buffer_stats():
     if metrics_buffer:
         return {
             "status": "ok",
-            "buffer": metrics_buffer.get_stats()
+            "buffer": metrics_buffer.get_stats(),
+            "ingest_queue": ingest_queue.get_stats() if ingest_queue else None
         }
     return {
         "status": "ok",
@@ -2181,9 +2317,9 @@ async def generate_executive_summary_now(
     Optionally scope to a specific report profile.
     """
     try:
-        # Fetch the full executive summary data by calling the GET endpoint logic
-        # This ensures the stored report matches what would be displayed
-        exec_summary_response = await get_executive_summary(
+        # Build the full executive summary data with the GET endpoint's logic
+        # (fresh, not from its cache) so the stored report matches what would be displayed
+        exec_summary_response = await build_executive_summary(
             days=days,
             profile_id=profile_id,
             x_tenant_id=x_tenant_id
@@ -3232,8 +3368,22 @@ async def ingest_logs_endpoint(batch: LogBatch):
         raise HTTPException(status_code=500, detail=f"Ingestion failed: {str(e)}")
 
 
-@app.post("/api/heartbeat")
-async def heartbeat_endpoint(payload: HeartbeatPayload):
+# Compiled serializers for the fixed heartbeat shapes: each dumps a whole list
+# in one pydantic-core call instead of a Python-level .dict() per item
+_METRIC_LIST_ADAPTER = TypeAdapter(List[MetricPoint])
+_PROCESS_LIST_ADAPTER = TypeAdapter(List[ProcessInfo])
+
+
+@app.post(
+    "/api/heartbeat",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": HeartbeatPayload.model_json_schema()}}
+        }
+    }
+)
+async def heartbeat_endpoint(request: Request):
     """
     Receive heartbeat with buffered metrics from Scribe agents
     
@@ -3244,85 +3394,72 @@ async def heartbeat_endpoint(payload: HeartbeatPayload):
     - Scribe must provide the instance API key (set during setup)
     - Scribes without valid API key are rejected
     """
+    # Validate the raw body in one pass (Pydantic's JSON fast path) instead of
+    # letting FastAPI decode to dicts first and validate those
+    try:
+        payload = HeartbeatPayload.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    
     try:
         # Validate instance API key
-        provided_key = getattr(payload, 'auth_token', None) or getattr(payload, 'api_key', None)
+        provided_key = payload.auth_token
         is_valid, auth_reason = validate_scribe_api_key(provided_key)
         
         if not is_valid:
-            print(f"🔒 Authentication failed for agent {payload.agent_id}: {auth_reason}")
+            logger.warning("Authentication failed for agent %s: %s", payload.agent_id, auth_reason)
             raise HTTPException(
                 status_code=401, 
                 detail=f"Authentication failed: {auth_reason}. Check your API key configuration."
             )
         
-        # Upsert agent information with public IP
-        db_manager.upsert_agent(
-            agent_id=payload.agent_id,
-            hostname=payload.hostname,
-            status=payload.status,
-            last_seen=payload.last_seen_at,
-            public_ip=payload.public_ip,
-            connection_address=getattr(payload, 'connection_address', None)
-        )
-        
-        # Prepare metrics data
-        metrics_data = [
-            {
-                "timestamp": metric.timestamp,
-                "cpu_percent": metric.cpu_percent,
-                "ram_percent": metric.ram_percent,
-                "net_sent_bps": metric.net_sent_bps,
-                "net_recv_bps": metric.net_recv_bps,
-                "disk_read_bps": metric.disk_read_bps,
-                "disk_write_bps": metric.disk_write_bps,
-                "ping_latency_ms": metric.ping_latency_ms,
-                "cpu_temp": metric.cpu_temp,
-                "cpu_name": getattr(metric, 'cpu_name', ''),
-                "gpu_percent": getattr(metric, 'gpu_percent', 0.0),
-                "gpu_temp": getattr(metric, 'gpu_temp', 0.0),
-                "gpu_name": getattr(metric, 'gpu_name', ''),
-                "is_vm": getattr(metric, 'is_vm', False),
-                "disks": [disk.dict() for disk in metric.disks]
-            }
-            for metric in payload.metrics
-        ]
-        
-        # Add metrics to buffer for batched insertion
-        buffered_count = 0
-        if metrics_buffer and metrics_data:
-            buffered_count = await metrics_buffer.add_metrics(
-                agent_id=payload.agent_id,
-                metrics=metrics_data,
-                load_avg=payload.load_avg
-            )
-        
-        # Insert process snapshot if processes are provided
-        if payload.processes:
-            process_data = [proc.dict() for proc in payload.processes]
-            db_manager.insert_process_snapshot(
+        # Full upsert only for new agents or when hostname/IP/address changed;
+        # otherwise the ingest queue coalesces last_seen/status into one bulk UPDATE
+        touch = None
+        if ingest_queue and ingest_queue.is_known_agent(
+            payload.agent_id, payload.hostname, payload.public_ip, payload.connection_address
+        ):
+            touch = (payload.last_seen_at, payload.status)
+        else:
+            await _db(
+                db_manager.upsert_agent,
                 agent_id=payload.agent_id,
-                timestamp=payload.last_seen_at,
-                processes=process_data
+                hostname=payload.hostname,
+                status=payload.status,
+                last_seen=payload.last_seen_at,
+                public_ip=payload.public_ip,
+                connection_address=payload.connection_address
             )
+            if ingest_queue:
+                ingest_queue.remember_agent(
+                    payload.agent_id, payload.hostname, payload.public_ip, payload.connection_address
+                )
         
-        # Update system info if provided (sent periodically by agent)
-        if payload.system_info:
-            db_manager.update_agent_system_info(
-                agent_id=payload.agent_id,
-                system_info=payload.system_info.dict()
-            )
+        # Prepare metrics data (defaults come from the MetricPoint field definitions)
+        metrics_data = _METRIC_LIST_ADAPTER.dump_python(payload.metrics)
+        
+        # Hand metrics, process snapshot and system info (sent periodically by agent)
+        # to the ingest queue - the worker batches them across concurrent heartbeats
+        if ingest_queue:
+            await ingest_queue.submit({
+                "agent_id": payload.agent_id,
+                "metrics": metrics_data,
+                "load_avg": payload.load_avg,
+                "processes": _PROCESS_LIST_ADAPTER.dump_json(payload.processes) if payload.processes else None,
+                "processes_digest": process_list_digest(payload.processes) if payload.processes else None,
+                "system_info": payload.system_info.model_dump() if payload.system_info else None,
+                "ts": payload.last_seen_at,
+                "touch": touch
+            })
         
-        response = {
+        return {
             "status": "ok",
             "agent_id": payload.agent_id,
-            "metrics_buffered": buffered_count,
+            "metrics_buffered": len(metrics_data),
             "processes_count": len(payload.processes),
             "message": f"Heartbeat received from {payload.hostname}"
         }
         
-        return response
-        
     except HTTPException:
         raise  # Re-raise HTTP exceptions as-is
     except Exception as e:
@@ -3330,23 +3467,38 @@ async def heartbeat_endpoint(payload: HeartbeatPayload):
 
 
 @app.get("/api/agents")
-async def get_agents(request: Request):
+async def get_agents(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    search: Optional[str] = None,
+    tag: Optional[str] = None
+):
     """
-    Get all registered agents (filtered by user's role and profile).
+    Get registered agents (filtered by user's role and profile).
     - Admin: sees all agents
     - User: sees only agents in their assigned profile's scope
+    
+    Optional query parameters (filtering and paging happen in SQL):
+    - limit / offset: page through agents ordered by last_seen (default: all)
+    - search: match hostname, display name or tags
+    - tag: only agents carrying this tag
     """
     try:
+        filters = {"limit": limit, "offset": offset, "search": search, "tag": tag}
+        
         # Check if user is authenticated
         current_user = await get_current_user(request)
         if current_user:
             # Use RBAC-filtered method
-            agents = db_manager.get_agents_for_user(current_user)
+            agents = await _db(db_manager.get_agents_for_user, current_user, **filters)
         else:
             # Unauthenticated - return all (for backward compatibility with agents)
-            agents = db_manager.get_all_agents()
+            agents = await _db(db_manager.get_all_agents, **filters)
         return {
-            "agents": agents
+            "agents": agents,
+            "limit": limit,
+            "offset": offset
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch agents: {str(e)}")
@@ -3357,14 +3509,13 @@ async def delete_agent(agent_id: str, user: dict = Depends(require_admin)):
     """Delete an agent and all its associated data"""
     try:
         # Send shutdown command to agent if connected
-        if agent_id in connection_manager.agents:
-            try:
-                await connection_manager.agents[agent_id].send_json({"command": "shutdown"})
-            except:
-                pass
+        await connection_manager.try_send(agent_id, {"command": "shutdown"})
         
         # Delete from database
-        db_manager.delete_agent(agent_id)
+        await _db(db_manager.delete_agent, agent_id)
+        await invalidate_tags_cache()
+        if ingest_queue:
+            ingest_queue.forget_agent(agent_id)
         
         # Disconnect from connection manager
         connection_manager.disconnect_agent(agent_id)
@@ -3378,14 +3529,10 @@ async def delete_agent(agent_id: str, user: dict = Depends(require_admin)):
 async def disable_agent(agent_id: str, user: dict = Depends(require_admin)):
     """Disable an agent (mark as offline, stop accepting data)"""
     try:
-        db_manager.disable_agent(agent_id)
+        await _db(db_manager.disable_agent, agent_id)
         
         # Send stop command to agent if connected
-        if agent_id in connection_manager.agents:
-            try:
-                await connection_manager.agents[agent_id].send_json({"command": "disable"})
-            except:
-                pass
+        await connection_manager.try_send(agent_id, {"command": "disable"})
         
         return {"success": True, "message": f"Agent {agent_id} disabled"}
     except Exception as e:
@@ -3396,7 +3543,7 @@ async def disable_agent(agent_id: str, user: dict = Depends(require_admin)):
 async def enable_agent(agent_id: str, user: dict = Depends(require_admin)):
     """Enable a previously disabled agent"""
     try:
-        db_manager.enable_agent(agent_id)
+        await _db(db_manager.enable_agent, agent_id)
         return {"success": True, "message": f"Agent {agent_id} enabled"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to enable agent: {str(e)}")
@@ -3406,12 +3553,9 @@ async def enable_agent(agent_id: str, user: dict = Depends(require_admin)):
 async def restart_agent(agent_id: str, user: dict = Depends(require_admin)):
     """Send restart command to an agent"""
     try:
-        # Check if agent is connected
-        if agent_id not in connection_manager.agents:
+        # Send restart command to the agent (fails fast if not connected or unresponsive)
+        if not await connection_manager.try_send(agent_id, {"command": "restart"}):
             raise HTTPException(status_code=404, detail="Agent not connected")
-        
-        # Send restart command to the agent
-        await connection_manager.agents[agent_id].websocket.send_json({"command": "restart"})
         return {"success": True, "message": f"Restart command sent to agent {agent_id}"}
     except HTTPException:
         raise
@@ -3423,7 +3567,7 @@ async def restart_agent(agent_id: str, user: dict = Depends(require_admin)):
 async def get_agent_uptime(agent_id: str):
     """Get uptime statistics for an agent"""
     try:
-        stats = db_manager.get_agent_uptime_stats(agent_id)
+        stats = await _db(db_manager.get_agent_uptime_stats, agent_id)
         if "error" in stats:
             raise HTTPException(status_code=404, detail=stats["error"])
         return stats
@@ -3437,7 +3581,7 @@ async def get_agent_uptime(agent_id: str):
 async def get_agent_system_info(agent_id: str):
     """Get detailed system information for an agent (hardware, OS, etc.)"""
     try:
-        system_info = db_manager.get_agent_system_info(agent_id)
+        system_info = await _db(db_manager.get_agent_system_info, agent_id)
         if system_info is None:
             return {"system_info": None, "message": "System info not yet received from agent"}
         return {"system_info": system_info}
@@ -3450,7 +3594,7 @@ async def rename_agent(agent_id: str, data: dict, user: dict = Depends(require_a
     """Rename an agent (set display name)"""
     try:
         display_name = data.get("display_name", "").strip()
-        db_manager.update_agent_display_name(agent_id, display_name)
+        await _db(db_manager.update_agent_display_name, agent_id, display_name)
         return {"success": True, "message": f"Agent renamed to '{display_name}'" if display_name else "Agent name reset to hostname"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to rename agent: {str(e)}")
@@ -3461,30 +3605,31 @@ async def update_agent_tags(agent_id: str, data: dict, user: dict = Depends(requ
     """Update tags for an agent (comma-separated string)"""
     try:
         tags = data.get("tags", "").strip()
-        db_manager.update_agent_tags(agent_id, tags)
+        await _db(db_manager.update_agent_tags, agent_id, tags)
+        await invalidate_tags_cache()
         return {"success": True, "tags": tags, "message": f"Tags updated to '{tags}'" if tags else "Tags cleared"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update agent tags: {str(e)}")
 
 
+class UptimeWindowUpdate(BaseModel):
+    uptime_window: Literal['daily', 'weekly', 'monthly', 'quarterly', 'yearly'] = 'monthly'
+    
+    @validator('uptime_window', pre=True)
+    def normalize_uptime_window(cls, v):
+        return v.strip().lower() if isinstance(v, str) else v
+
+
 @app.put("/api/agents/{agent_id}/uptime-window")
-async def update_agent_uptime_window(agent_id: str, data: dict, user: dict = Depends(require_admin)):
+async def update_agent_uptime_window(agent_id: str, data: UptimeWindowUpdate, user: dict = Depends(require_admin)):
     """
     Update the availability window setting for an agent.
     
     Allowed values: 'daily', 'weekly', 'monthly', 'quarterly', 'yearly'
     """
     try:
-        uptime_window = data.get("uptime_window", "monthly").strip().lower()
-        valid_windows = ['daily', 'weekly', 'monthly', 'quarterly', 'yearly']
-        
-        if uptime_window not in valid_windows:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Invalid uptime_window: {uptime_window}. Must be one of {valid_windows}"
-            )
-        
-        success = db_manager.update_agent_uptime_window(agent_id, uptime_window)
+        uptime_window = data.uptime_window
+        success = await _db(db_manager.update_agent_uptime_window, agent_id, uptime_window)
         if success:
             return {
                 "success": True, 
@@ -3499,56 +3644,34 @@ async def update_agent_uptime_window(agent_id: str, data: dict, user: dict = Dep
         raise HTTPException(status_code=500, detail=f"Failed to update uptime window: {str(e)}")
 
 
+# Cache-aside for /api/tags (Redis, when available). Entries are dropped on
+# every agent/bookmark/profile write that can change the tag set.
+TAGS_CACHE_PREFIX = "tags:"
+TAGS_CACHE_TTL_SECONDS = 60
+
+
+async def invalidate_tags_cache():
+    """Drop cached tag lists for all tenants (agent tags are shared across tenants)"""
+    if redis_queue:
+        await redis_queue.cache_delete_prefix(TAGS_CACHE_PREFIX)
+
+
 @app.get("/api/tags")
-async def get_all_tags(x_tenant_id: str = Header(default="default")):
+async def get_all_tags(response: Response, x_tenant_id: str = Header(default="default")):
     """Get all unique tags from agents (scribes), bookmarks, and report profiles"""
     try:
-        tags_set = set()
-        
-        # Get tags from agents
-        agents = db_manager.get_all_agents()
-        for agent in agents:
-            agent_tags = agent.get("tags", "")
-            if agent_tags:
-                for tag in agent_tags.split(","):
-                    tag = tag.strip()
-                    if tag:
-                        tags_set.add(tag)
-        
-        # Get tags from bookmarks
-        bookmarks = db_manager.get_bookmarks(x_tenant_id)
-        for bookmark in bookmarks:
-            bookmark_tags = bookmark.get("tags", "")
-            if bookmark_tags:
-                for tag in bookmark_tags.split(","):
-                    tag = tag.strip()
-                    if tag:
-                        tags_set.add(tag)
-        
-        # Get tags from report profiles
-        try:
-            profiles = db_manager.get_report_profiles(x_tenant_id)
-            for profile in profiles:
-                # monitor_scope_tags and scribe_scope_tags are stored as JSON arrays
-                for field in ["monitor_scope_tags", "scribe_scope_tags"]:
-                    profile_tags = profile.get(field, [])
-                    if profile_tags:
-                        if isinstance(profile_tags, str):
-                            # Handle if stored as JSON string
-                            import json
-                            try:
-                                profile_tags = json.loads(profile_tags)
-                            except:
-                                profile_tags = []
-                        for tag in profile_tags:
-                            if tag and isinstance(tag, str):
-                                tags_set.add(tag.strip())
-        except Exception as e:
-            # Don't fail if report profiles can't be read
-            print(f"Warning: Could not read report profile tags: {e}")
-        
-        # Return sorted list
-        return {"success": True, "data": sorted(list(tags_set))}
+        cache_key = f"{TAGS_CACHE_PREFIX}{x_tenant_id}"
+        if redis_queue:
+            cached = await redis_queue.cache_get(cache_key)
+            if cached is not None:
+                response.headers["X-Cache"] = "HIT"
+                return {"success": True, "data": cached}
+        
+        tags = await _db(db_manager.get_all_tags, x_tenant_id)
+        if redis_queue:
+            await redis_queue.cache_set(cache_key, tags, TAGS_CACHE_TTL_SECONDS)
+        response.headers["X-Cache"] = "MISS"
+        return {"success": True, "data": tags}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get tags: {str(e)}")
 
@@ -3561,71 +3684,15 @@ async def delete_tag(tag_name: str, x_tenant_id: str = Header(default="default")
         if not tag_to_delete:
             raise HTTPException(status_code=400, detail="Tag name cannot be empty")
         
-        removed_from_agents = 0
-        removed_from_bookmarks = 0
-        removed_from_profiles = 0
-        
-        # Remove tag from agents
-        agents = db_manager.get_all_agents()
-        for agent in agents:
-            agent_tags = agent.get("tags", "")
-            if agent_tags:
-                tags_list = [t.strip() for t in agent_tags.split(",") if t.strip()]
-                if tag_to_delete in tags_list:
-                    tags_list.remove(tag_to_delete)
-                    new_tags = ", ".join(tags_list)
-                    db_manager.update_agent_tags(agent["agent_id"], new_tags)
-                    removed_from_agents += 1
-        
-        # Remove tag from bookmarks
-        bookmarks = db_manager.get_bookmarks(x_tenant_id)
-        for bookmark in bookmarks:
-            bookmark_tags = bookmark.get("tags", "")
-            if bookmark_tags:
-                tags_list = [t.strip() for t in bookmark_tags.split(",") if t.strip()]
-                if tag_to_delete in tags_list:
-                    tags_list.remove(tag_to_delete)
-                    new_tags = ", ".join(tags_list)
-                    db_manager.update_bookmark(
-                        x_tenant_id,
-                        bookmark["id"], 
-                        tags=new_tags
-                    )
-                    removed_from_bookmarks += 1
-        
-        # Remove tag from report profiles
-        try:
-            import json
-            profiles = db_manager.get_report_profiles(x_tenant_id)
-            for profile in profiles:
-                updated = False
-                updates = {}
-                
-                for field in ["monitor_scope_tags", "scribe_scope_tags"]:
-                    profile_tags = profile.get(field, [])
-                    if profile_tags:
-                        if isinstance(profile_tags, str):
-                            try:
-                                profile_tags = json.loads(profile_tags)
-                            except:
-                                profile_tags = []
-                        if tag_to_delete in profile_tags:
-                            profile_tags = [t for t in profile_tags if t != tag_to_delete]
-                            updates[field] = profile_tags
-                            updated = True
-                
-                if updated:
-                    db_manager.update_report_profile(x_tenant_id, profile["id"], **updates)
-                    removed_from_profiles += 1
-        except Exception as e:
-            print(f"Warning: Could not remove tag from report profiles: {e}")
+        removed = await _db(db_manager.delete_tag, x_tenant_id, tag_to_delete)
+        await invalidate_tags_cache()
         
         return {
             "success": True, 
             "message": f"Tag '{tag_to_delete}' deleted",
-            "removed_from_agents": removed_from_agents,
-            "removed_from_bookmarks": removed_from_bookmarks,
-            "removed_from_profiles": removed_from_profiles
+            "removed_from_agents": removed["agents"],
+            "removed_from_bookmarks": removed["bookmarks"],
+            "removed_from_profiles": removed["profiles"]
         }
     except HTTPException:
         raise
@@ -3633,6 +3700,69 @@ async def delete_tag(tag_name: str, x_tenant_id: str = Header(default="default")
         raise HTTPException(status_code=500, detail=f"Failed to delete tag: {str(e)}")
 
 
+async def _fetch_metrics(
+    agent_id: str,
+    *,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    limit: Optional[int] = None,
+    max_points: Optional[int] = None,
+    downsample: Optional[str] = None,
+    mode: str = "raw"
+) -> dict:
+    """
+    Shared read path for /metrics and /metrics/smart.
+    
+    mode="smart" uses get_agent_metrics_smart on PostgreSQL (capped at
+    max_points); otherwise get_agent_metrics runs and the resolution/query
+    stats it recorded are read in the same worker thread.
+    
+    Returns {"metrics", "count", "resolution", ...} without agent_id.
+    """
+    def fetch() -> dict:
+        if mode == "smart" and USE_POSTGRES:
+            return db_manager.get_agent_metrics_smart(
+                agent_id=agent_id,
+                start_time=start_time,
+                end_time=end_time,
+                max_points=max_points
+            )
+        
+        metrics = db_manager.get_agent_metrics(
+            agent_id,
+            limit=max_points if mode == "smart" else limit,
+            start_time=start_time,
+            end_time=end_time,
+            downsample=downsample
+        )
+        if mode == "smart":
+            return {
+                "metrics": metrics,
+                "count": len(metrics),
+                "resolution": {
+                    "table": "metrics",
+                    "description": "Raw data (SQLite does not support aggregates)"
+                }
+            }
+        
+        resolution = {"table": "metrics", "description": "Raw data", "auto_selected": False}
+        query_stats = {}
+        if USE_POSTGRES:
+            try:
+                resolution = db_manager.get_last_query_resolution()
+                query_stats = db_manager.get_last_query_stats()
+            except:
+                pass
+        return {
+            "metrics": metrics,
+            "count": len(metrics),
+            "resolution": resolution,
+            "query_stats": query_stats if query_stats else None
+        }
+    
+    return await _db(fetch)
+
+
 @app.get("/api/agents/{agent_id}/metrics")
 async def get_agent_metrics(
     agent_id: str, 
@@ -3655,36 +3785,17 @@ async def get_agent_metrics(
     """
     try:
         # If no time range and no limit specified, default to last 100 points
-        effective_limit = limit
         if not start_time and not end_time and limit is None:
-            effective_limit = 100
-            
-        metrics = db_manager.get_agent_metrics(
-            agent_id, 
-            limit=effective_limit,
+            limit = 100
+        
+        result = await _fetch_metrics(
+            agent_id,
             start_time=start_time,
             end_time=end_time,
+            limit=limit,
             downsample=downsample
         )
-        
-        # Get resolution info for PostgreSQL backend
-        resolution = {"table": "metrics", "description": "Raw data", "auto_selected": False}
-        query_stats = {}
-        
-        if USE_POSTGRES:
-            try:
-                resolution = db_manager.get_last_query_resolution()
-                query_stats = db_manager.get_last_query_stats()
-            except:
-                pass
-        
-        return {
-            "agent_id": agent_id,
-            "metrics": metrics,
-            "count": len(metrics),
-            "resolution": resolution,
-            "query_stats": query_stats if query_stats else None
-        }
+        return {"agent_id": agent_id, **result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch metrics: {str(e)}")
 
@@ -3694,7 +3805,7 @@ async def get_agent_metrics_smart(
     agent_id: str,
     start_time: str = None,
     end_time: str = None,
-    max_points: int = 500
+    max_points: int = Query(500, ge=1, le=5000)
 ):
     """
     Get metrics with automatic resolution selection based on time range.
@@ -3705,42 +3816,26 @@ async def get_agent_metrics_smart(
     - 1-7 days: 15-minute averages
     - > 7 days: Hourly averages
     
+    On SQLite, falls back to raw data capped at max_points.
+    
     Args:
         agent_id: Agent identifier
         start_time: ISO format start time (default: 1 hour ago)
         end_time: ISO format end time (default: now)
-        max_points: Maximum data points to return (default: 500)
+        max_points: Maximum data points to return (1-5000, default: 500)
     
     Returns:
         Metrics with resolution info and min/max values for aggregates
     """
     try:
-        # Only available for PostgreSQL backend
-        if USE_POSTGRES:
-            result = db_manager.get_agent_metrics_smart(  # Now synchronous
-                agent_id=agent_id,
-                start_time=start_time,
-                end_time=end_time,
-                max_points=max_points
-            )
-            return {"agent_id": agent_id, **result}
-        else:
-            # Fallback to regular query for SQLite
-            metrics = db_manager.get_agent_metrics(
-                agent_id,
-                limit=max_points,
-                start_time=start_time,
-                end_time=end_time
-            )
-            return {
-                "agent_id": agent_id,
-                "metrics": metrics,
-                "count": len(metrics),
-                "resolution": {
-                    "table": "metrics",
-                    "description": "Raw data (SQLite does not support aggregates)"
-                }
-            }
+        result = await _fetch_metrics(
+            agent_id,
+            start_time=start_time,
+            end_time=end_time,
+            max_points=max_points,
+            mode="smart"
+        )
+        return {"agent_id": agent_id, **result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch metrics: {str(e)}")
 
@@ -3773,7 +3868,7 @@ async def get_agent_processes(
                     detail="Invalid time format. Use ISO 8601 format (e.g., '2024-12-26T10:00:00')"
                 )
             
-            snapshots = db_manager.get_process_snapshots_range(agent_id, start_dt, end_dt)
+            snapshots = await _db(db_manager.get_process_snapshots_range, agent_id, start_dt, end_dt)
             
             if not snapshots:
                 raise HTTPException(
@@ -3791,7 +3886,7 @@ async def get_agent_processes(
         
         # Default behavior: return latest snapshot
         else:
-            snapshot = db_manager.get_latest_process_snapshot(agent_id)
+            snapshot = await _db(db_manager.get_latest_process_snapshot, agent_id)
             
             if not snapshot:
                 raise HTTPException(status_code=404, detail=f"No process data found for agent {agent_id}")
@@ -3813,8 +3908,8 @@ async def get_logs(
     agent_id: str = None,
     level: str = None,
     search: str = None,
-    limit: int = 50,
-    offset: int = 0
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0)
 ):
     """
     Get logs with filtering and pagination
@@ -3823,21 +3918,14 @@ async def get_logs(
     - agent_id: Filter by agent ID (optional - for future use)
     - level: Filter by log level (error, warning, info, debug)
     - search: Full-text search on log message
-    - limit: Maximum number of results (default: 50)
+    - limit: Maximum number of results (1-500, default: 50)
     - offset: Offset for pagination (default: 0)
     
     Returns paginated logs with metadata
     """
     try:
-        # Validate limit
-        if limit < 1 or limit > 500:
-            raise HTTPException(status_code=400, detail="Limit must be between 1 and 500")
-        
-        # Validate offset
-        if offset < 0:
-            raise HTTPException(status_code=400, detail="Offset must be non-negative")
-        
-        result = db_manager.query_logs(
+        result = await _db(
+            db_manager.query_logs,
             agent_id=agent_id,
             level=level,
             search=search,
@@ -3847,8 +3935,6 @@ async def get_logs(
         
         return result
         
-    except HTTPException:
-        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch logs: {str(e)}")
 
@@ -3870,7 +3956,7 @@ class AlertRulesUpdate(BaseModel):
 async def get_alert_rules(agent_id: str):
     """Get alert rules for a specific agent"""
     try:
-        rules = db_manager.get_alert_rules(agent_id)
+        rules = await _db(db_manager.get_alert_rules, agent_id)
         return rules
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch alert rules: {str(e)}")
@@ -3880,7 +3966,7 @@ async def get_alert_rules(agent_id: str):
 async def update_alert_rules(agent_id: str, rules: AlertRulesUpdate, user: dict = Depends(require_admin)):
     """Update alert rules for a specific agent"""
     try:
-        updated_rules = db_manager.update_alert_rules(agent_id, rules.dict())
+        updated_rules = await _db(db_manager.update_alert_rules, agent_id, rules.dict())
         return updated_rules
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update alert rules: {str(e)}")
@@ -3891,9 +3977,9 @@ async def get_agent_alerts(agent_id: str, include_resolved: bool = False):
     """Get alerts for a specific agent"""
     try:
         if include_resolved:
-            alerts = db_manager.get_alert_history(agent_id, limit=100)
+            alerts = await _db(db_manager.get_alert_history, agent_id, limit=100)
         else:
-            alerts = db_manager.get_active_alerts(agent_id)
+            alerts = await _db(db_manager.get_active_alerts, agent_id)
         return {"agent_id": agent_id, "alerts": alerts}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch alerts: {str(e)}")
@@ -3904,9 +3990,9 @@ async def get_all_alerts(include_resolved: bool = False):
     """Get all alerts across all agents"""
     try:
         if include_resolved:
-            alerts = db_manager.get_alert_history(limit=200)
+            alerts = await _db(db_manager.get_alert_history, limit=200)
         else:
-            alerts = db_manager.get_active_alerts()
+            alerts = await _db(db_manager.get_active_alerts)
         return {"alerts": alerts}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch alerts: {str(e)}")
@@ -3916,7 +4002,7 @@ async def get_all_alerts(include_resolved: bool = False):
 async def resolve_alert(alert_id: int, user: dict = Depends(require_admin)):
     """Manually resolve an alert"""
     try:
-        success = db_manager.resolve_alert_by_id(alert_id)
+        success = await _db(db_manager.resolve_alert_by_id, alert_id)
         if not success:
             raise HTTPException(status_code=404, detail="Alert not found or already resolved")
         return {"success": True, "message": f"Alert {alert_id} resolved"}
@@ -3930,26 +4016,110 @@ async def resolve_alert(alert_id: int, user: dict = Depends(require_admin)):
 # Notification Channel APIs
 # ==============================
 
+# Allowed enum values, checked by pydantic-core. These include values the
+# dashboard does not offer but existing rows may hold (webhook/other channel
+# types inferred by NotificationManager, the legacy "contains" operator), since
+# edits send stored values back.
+ChannelType = Literal["discord", "slack", "email", "telegram", "pushover", "custom", "webhook", "other"]
+AlertScope = Literal["global", "agent", "bookmark", "profile"]
+AlertMetric = Literal[
+    "cpu", "ram", "disk", "disk_free", "cpu_temp", "net_bandwidth", "status",
+    "bookmark_status", "response_time", "ssl_expiry"
+]
+AlertOperator = Literal["gt", "gte", "lt", "lte", "eq", "ne", "contains"]
+OverrideType = Literal["disable", "modify"]
+
+
+# Unknown fields are dropped rather than rejected: the dashboard PUTs whole rule
+# objects back (id, created_at, ...) when toggling them
 class NotificationChannelCreate(BaseModel):
+    model_config = ConfigDict(extra="ignore", populate_by_name=True)
+    
     name: str
-    channel_type: str = "custom"  # discord, slack, email, telegram, pushover, custom
+    channel_type: ChannelType = "custom"
     url: str
-    events: List[str] = ["all"]  # all, agent_offline, cpu_high, ram_high, disk_low, bookmark_down, etc.
+    events: List[str] = Field(default_factory=lambda: ["all"])  # all, agent_offline, cpu_high, ram_high, disk_low, bookmark_down, etc.
 
 class NotificationChannelUpdate(BaseModel):
+    model_config = ConfigDict(extra="ignore", populate_by_name=True)
+    
     name: Optional[str] = None
-    channel_type: Optional[str] = None
+    channel_type: Optional[ChannelType] = None
     url: Optional[str] = None
     events: Optional[List[str]] = None
     enabled: Optional[bool] = None
 
 
+# Read-mostly notification/alert GETs are polled by the UI. Responses are cached
+# per worker and cleared by every channel/rule/override write; ETags let clients
+# revalidate with If-None-Match and get a bodiless 304.
+ALERTS_CACHE_NAMESPACE = "alerts"
+ALERTS_CACHE_TTL_SECONDS = 30
+
+
+async def _cached_alerts_response(request: Request, key: tuple, loader):
+    """Serve loader()'s payload from the alerts cache with ETag / 304 support"""
+    cache = get_response_cache()
+    payload = cache.get(ALERTS_CACHE_NAMESPACE, key)
+    if payload is None:
+        payload = jsonable_encoder(await loader())
+        cache.set(ALERTS_CACHE_NAMESPACE, key, payload, ALERTS_CACHE_TTL_SECONDS)
+    
+    etag = compute_etag(payload)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(payload, headers=headers)
+
+
+def invalidate_alerts_cache():
+    """Drop cached notification channel / alert rule responses"""
+    get_response_cache().clear(ALERTS_CACHE_NAMESPACE)
+
+
+# Idempotency-Key support for non-idempotent POSTs (channel tests, overrides):
+# a repeat of a successful request within the TTL gets the first response back,
+# and a repeat that arrives while the first is still running waits for it.
+IDEMPOTENCY_CACHE_NAMESPACE = "idempotency"
+IDEMPOTENCY_TTL_SECONDS = 60
+_idempotency_pending: Dict[tuple, asyncio.Event] = {}
+
+
+async def _run_idempotent(endpoint: str, idempotency_key: Optional[str], user: dict, handler):
+    """Run handler() once per (endpoint, Idempotency-Key, user) within the TTL"""
+    if not idempotency_key:
+        return await handler()
+    
+    cache = get_response_cache()
+    key = (endpoint, idempotency_key, user.get("user_id"))
+    
+    pending = _idempotency_pending.get(key)
+    if pending is not None:
+        await pending.wait()
+    cached = cache.get(IDEMPOTENCY_CACHE_NAMESPACE, key)
+    if cached is not None:
+        return cached
+    
+    # Not cached (new key, or the first attempt failed): run it
+    event = asyncio.Event()
+    _idempotency_pending[key] = event
+    try:
+        result = await handler()
+        cache.set(IDEMPOTENCY_CACHE_NAMESPACE, key, result, IDEMPOTENCY_TTL_SECONDS)
+        return result
+    finally:
+        if _idempotency_pending.get(key) is event:
+            del _idempotency_pending[key]
+        event.set()
+
+
 @app.get("/api/notifications/channels")
-async def get_notification_channels():
+async def get_notification_channels(request: Request):
     """Get all notification channels"""
     try:
-        channels = db_manager.get_notification_channels()
-        return {"channels": channels}
+        async def load():
+            return {"channels": await _db(db_manager.get_notification_channels)}
+        return await _cached_alerts_response(request, ("channels",), load)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch channels: {str(e)}")
 
@@ -3958,25 +4128,29 @@ async def get_notification_channels():
 async def create_notification_channel(channel: NotificationChannelCreate, user: dict = Depends(require_admin)):
     """Create a new notification channel"""
     try:
-        created = db_manager.create_notification_channel(
+        created = await _db(
+            db_manager.create_notification_channel,
             name=channel.name,
             channel_type=channel.channel_type,
             url=channel.url,
             events=channel.events
         )
+        invalidate_alerts_cache()
         return created
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create channel: {str(e)}")
 
 
 @app.get("/api/notifications/channels/{channel_id}")
-async def get_notification_channel(channel_id: int):
+async def get_notification_channel(channel_id: int, request: Request):
     """Get a specific notification channel"""
     try:
-        channel = db_manager.get_notification_channel_by_id(channel_id)
-        if not channel:
-            raise HTTPException(status_code=404, detail="Channel not found")
-        return channel
+        async def load():
+            channel = await _db(db_manager.get_notification_channel_by_id, channel_id)
+            if not channel:
+                raise HTTPException(status_code=404, detail="Channel not found")
+            return channel
+        return await _cached_alerts_response(request, ("channel", channel_id), load)
     except HTTPException:
         raise
     except Exception as e:
@@ -3988,9 +4162,10 @@ async def update_notification_channel(channel_id: int, updates: NotificationChan
                                       user: dict = Depends(require_admin)):
     """Update a notification channel"""
     try:
-        updated = db_manager.update_notification_channel(channel_id, updates.dict(exclude_unset=True))
+        updated = await _db(db_manager.update_notification_channel, channel_id, updates.model_dump(exclude_unset=True))
         if not updated:
             raise HTTPException(status_code=404, detail="Channel not found")
+        invalidate_alerts_cache()
         return updated
     except HTTPException:
         raise
@@ -4002,9 +4177,10 @@ async def update_notification_channel(channel_id: int, updates: NotificationChan
 async def delete_notification_channel(channel_id: int, user: dict = Depends(require_admin)):
     """Delete a notification channel"""
     try:
-        success = db_manager.delete_notification_channel(channel_id)
+        success = await _db(db_manager.delete_notification_channel, channel_id)
         if not success:
             raise HTTPException(status_code=404, detail="Channel not found")
+        invalidate_alerts_cache()
         return {"success": True, "message": "Channel deleted"}
     except HTTPException:
         raise
@@ -4013,30 +4189,35 @@ async def delete_notification_channel(channel_id: int, user: dict = Depends(requ
 
 
 @app.post("/api/notifications/channels/{channel_id}/test")
-async def test_notification_channel(channel_id: int, user: dict = Depends(require_admin)):
+async def test_notification_channel(channel_id: int, background_tasks: BackgroundTasks,
+                                    user: dict = Depends(require_admin),
+                                    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key")):
     """Send a test notification to a channel"""
+    return await _run_idempotent(
+        f"channel-test:{channel_id}", idempotency_key, user,
+        lambda: _send_channel_test(channel_id, background_tasks)
+    )
+
+
+async def _send_channel_test(channel_id: int, background_tasks: BackgroundTasks) -> dict:
     try:
-        channel = db_manager.get_notification_channel_by_id(channel_id)
+        channel = await _db(db_manager.get_notification_channel_by_id, channel_id)
         if not channel:
             raise HTTPException(status_code=404, detail="Channel not found")
         
-        # Use notification manager to send test
-        from notification_manager import NotificationManager, APPRISE_AVAILABLE
-        
         if not APPRISE_AVAILABLE:
             raise HTTPException(status_code=503, detail="Apprise not installed - notifications unavailable")
         
-        import apprise
-        ap = apprise.Apprise()
-        ap.add(channel["url"])
+        ap = get_apprise_for_url(channel["url"])
+        if ap is None:
+            raise HTTPException(status_code=400, detail="Invalid notification URL")
         
         success = await ap.async_notify(
             title="LogLibrarian Test Notification",
-            body=f"This is a test notification from LogLibrarian.\n\nChannel: {channel['name']}\nTime: {datetime.utcnow().isoformat()}Z"
+            body=f"This is a test notification from LogLibrarian.\n\nChannel: {channel['name']}\nTime: {time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}"
         )
         
-        # Record in history
-        db_manager.add_notification_history(
+        history = dict(
             channel_id=channel_id,
             event_type="test",
             title="Test Notification",
@@ -4045,8 +4226,12 @@ async def test_notification_channel(channel_id: int, user: dict = Depends(requir
         )
         
         if success:
+            # Record in history after the response is sent
+            background_tasks.add_task(_db, db_manager.add_notification_history, **history)
             return {"success": True, "message": "Test notification sent successfully"}
         else:
+            # Error responses drop background tasks, so record this one inline
+            await _db(db_manager.add_notification_history, **history)
             raise HTTPException(status_code=500, detail="Failed to send test notification")
     except HTTPException:
         raise
@@ -4054,41 +4239,125 @@ async def test_notification_channel(channel_id: int, user: dict = Depends(requir
         raise HTTPException(status_code=500, detail=f"Failed to send test: {str(e)}")
 
 
-@app.get("/api/notifications/history")
-async def get_notification_history(limit: int = 100):
-    """Get notification history"""
+class NotificationChannelTestBatch(BaseModel):
+    channel_ids: List[int]
+
+
+@app.post("/api/notifications/channels/test-batch")
+async def test_notification_channels_batch(batch: NotificationChannelTestBatch, background_tasks: BackgroundTasks,
+                                           user: dict = Depends(require_admin)):
+    """Send one test notification to several channels at once"""
     try:
-        history = db_manager.get_notification_history(limit=limit)
-        return {"history": history}
+        if not batch.channel_ids:
+            raise HTTPException(status_code=400, detail="channel_ids must not be empty")
+        
+        if not APPRISE_AVAILABLE:
+            raise HTTPException(status_code=503, detail="Apprise not installed - notifications unavailable")
+        
+        channels = await _db(db_manager.get_notification_channels_by_ids, batch.channel_ids)
+        if not channels:
+            raise HTTPException(status_code=404, detail="No matching channels found")
+        
+        # Channels are tested concurrently, so latency is the slowest channel, not the sum
+        results = await notify_urls(
+            [c["url"] for c in channels],
+            title="LogLibrarian Test Notification",
+            body=f"This is a test notification from LogLibrarian.\n\nTime: {time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}"
+        )
+        
+        sent = [c["id"] for c, result in zip(channels, results) if result is True]
+        failed = {
+            c["id"]: str(result) if isinstance(result, BaseException) else "Failed to send"
+            for c, result in zip(channels, results) if result is not True
+        }
+        
+        background_tasks.add_task(_db, db_manager.bulk_add_notification_history, [
+            (channel["id"], "test", "Test Notification", "Test notification sent",
+             "failed" if channel["id"] in failed else "sent", failed.get(channel["id"]))
+            for channel in channels
+        ])
+        
+        return {
+            "success": not failed,
+            "sent": sent,
+            "failed": failed,
+            "not_found": sorted(set(batch.channel_ids) - {c["id"] for c in channels})
+        }
+    except HTTPException:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch history: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to send test: {str(e)}")
 
 
-# ==============================
+@app.get("/api/notifications/history")
+async def get_notification_history(limit: int = Query(100, ge=1)):
+    """Get notification history (streamed as it is read from the database)"""
+    batches = db_manager.iter_notification_history(limit=limit)
+    try:
+        # Pull the first batch before committing to a 200 so query errors still map to a 500
+        first = await _db(next, batches, None)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch history: {str(e)}")
+    
+    def close_batches(pending):
+        # Runs on DB_EXECUTOR: a generator cannot be closed while a next() is
+        # still executing it, so wait for that first, then release the cursor
+        if pending is not None:
+            wait_futures([pending])
+        batches.close()
+    
+    async def stream():
+        batch = first
+        pending = None  # in-flight next(batches) on DB_EXECUTOR
+        try:
+            yield b'{"history":['
+            separator = b""
+            while batch is not None:
+                yield separator + b",".join(orjson.dumps(row) for row in batch)
+                separator = b","
+                pending = DB_EXECUTOR.submit(next, batches, None)
+                batch = await asyncio.wrap_future(pending)
+                pending = None
+            yield b"]}"
+        finally:
+            # Not awaited, so it still runs if the client disconnects mid-stream.
+            # A next() that has not started yet is cancelled instead of waited for
+            if pending is not None and pending.cancel():
+                pending = None
+            DB_EXECUTOR.submit(close_batches, pending)
+    
+    return StreamingResponse(stream(), media_type="application/json")
+
+
+# ==============================
 # Alert Rules V2 APIs (Global/Agent/Bookmark/Profile)
 # ==============================
 
 class AlertRuleCreate(BaseModel):
+    model_config = ConfigDict(extra="ignore", populate_by_name=True)
+    
     name: str
-    scope: str  # global, agent, bookmark, profile
-    metric: str  # cpu, ram, disk, status, response_time, ssl_expiry
-    operator: str  # gt, lt, eq, ne, contains, gte, lte
+    scope: AlertScope
+    metric: AlertMetric
+    operator: AlertOperator
     threshold: str
     target_id: Optional[str] = None  # Required for agent/bookmark scope
     description: Optional[str] = None
-    channels: List[int] = []  # Channel IDs
+    channels: List[int] = Field(default_factory=list)  # Channel IDs
     cooldown_minutes: int = 5
     profile_id: Optional[str] = None  # Required for profile scope
-    profile_agents: Optional[List[str]] = []  # Agent IDs for profile scope
-    profile_bookmarks: Optional[List[str]] = []  # Bookmark IDs for profile scope
+    profile_agents: Optional[List[str]] = Field(default_factory=list)  # Agent IDs for profile scope
+    profile_bookmarks: Optional[List[str]] = Field(default_factory=list)  # Bookmark IDs for profile scope
 
 class AlertRuleUpdate(BaseModel):
+    model_config = ConfigDict(extra="ignore", populate_by_name=True)
+    
     name: Optional[str] = None
     description: Optional[str] = None
-    scope: Optional[str] = None
+    scope: Optional[AlertScope] = None
     target_id: Optional[str] = None
-    metric: Optional[str] = None
-    operator: Optional[str] = None
+    metric: Optional[AlertMetric] = None
+    operator: Optional[AlertOperator] = None
     threshold: Optional[str] = None
     channels: Optional[List[int]] = None
     cooldown_minutes: Optional[int] = None
@@ -4098,34 +4367,69 @@ class AlertRuleUpdate(BaseModel):
     profile_bookmarks: Optional[List[str]] = None
 
 class AlertRuleOverride(BaseModel):
-    override_type: str  # disable, modify
+    model_config = ConfigDict(extra="ignore", populate_by_name=True)
+    
+    override_type: OverrideType
     modified_threshold: Optional[str] = None
     modified_channels: Optional[List[int]] = None
 
 
 @app.get("/api/alerts/rules")
-async def get_alert_rules_v2(scope: Optional[str] = None):
+async def get_alert_rules_v2(request: Request, scope: Optional[str] = None):
     """Get all alert rules, optionally filtered by scope"""
     try:
-        rules = db_manager.get_alert_rules_v2(scope=scope)
-        return {"rules": rules}
+        async def load():
+            return {"rules": await _db(db_manager.get_alert_rules_v2, scope=scope)}
+        return await _cached_alerts_response(request, ("rules", scope), load)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch rules: {str(e)}")
 
 
 @app.get("/api/alerts/rules/global")
-async def get_global_rules():
+async def get_global_rules(request: Request):
     """Get all global alert rules"""
     try:
-        rules = db_manager.get_global_alert_rules()
-        return {"rules": rules}
+        async def load():
+            return {"rules": await _db(db_manager.get_global_alert_rules)}
+        return await _cached_alerts_response(request, ("rules", "global"), load)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch global rules: {str(e)}")
 
 
-@app.post("/api/alerts/rules")
-async def create_alert_rule_v2(rule: AlertRuleCreate, user: dict = Depends(require_admin)):
+# Rule bodies above this size (profile rules listing thousands of agent /
+# bookmark IDs) are validated on a worker thread instead of the event loop
+LARGE_BODY_PARSE_THRESHOLD = 64 * 1024
+
+
+async def _parse_json_body(request: Request, model):
+    """Validate a JSON request body against model, off the event loop if it is large"""
+    body = await request.body()
+    try:
+        if len(body) > LARGE_BODY_PARSE_THRESHOLD:
+            return await asyncio.to_thread(model.model_validate_json, body)
+        return model.model_validate_json(body)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
+def _json_body_openapi(model) -> dict:
+    """openapi_extra documenting a body that is parsed by hand from Request"""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}}
+        }
+    }
+
+
+@app.post("/api/alerts/rules", openapi_extra=_json_body_openapi(AlertRuleCreate))
+async def create_alert_rule_v2(request: Request, user: dict = Depends(require_admin)):
     """Create a new alert rule"""
+    rule = await _parse_json_body(request, AlertRuleCreate)
+    return await _create_alert_rule_v2(rule, user)
+
+
+async def _create_alert_rule_v2(rule: AlertRuleCreate, user: dict) -> dict:
     try:
         # Validate scope and target_id
         if rule.scope in ["agent", "bookmark"] and not rule.target_id:
@@ -4134,7 +4438,8 @@ async def create_alert_rule_v2(rule: AlertRuleCreate, user: dict = Depends(requi
         if rule.scope == "profile" and not rule.profile_id:
             raise HTTPException(status_code=400, detail="profile_id required for profile scope")
         
-        created = db_manager.create_alert_rule_v2(
+        created = await _db(
+            db_manager.create_alert_rule_v2,
             name=rule.name,
             scope=rule.scope,
             metric=rule.metric,
@@ -4148,6 +4453,7 @@ async def create_alert_rule_v2(rule: AlertRuleCreate, user: dict = Depends(requi
             profile_agents=rule.profile_agents,
             profile_bookmarks=rule.profile_bookmarks
         )
+        invalidate_alerts_cache()
         return created
     except HTTPException:
         raise
@@ -4156,27 +4462,34 @@ async def create_alert_rule_v2(rule: AlertRuleCreate, user: dict = Depends(requi
 
 
 @app.get("/api/alerts/rules/{rule_id}")
-async def get_alert_rule_v2(rule_id: int):
+async def get_alert_rule_v2(rule_id: int, request: Request):
     """Get a specific alert rule"""
     try:
-        rules = db_manager.get_alert_rules_v2()
-        rule = next((r for r in rules if r["id"] == rule_id), None)
-        if not rule:
-            raise HTTPException(status_code=404, detail="Rule not found")
-        return rule
+        async def load():
+            rule = await _db(db_manager.get_alert_rule_v2_by_id, rule_id)
+            if not rule:
+                raise HTTPException(status_code=404, detail="Rule not found")
+            return rule
+        return await _cached_alerts_response(request, ("rule", rule_id), load)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch rule: {str(e)}")
 
 
-@app.put("/api/alerts/rules/{rule_id}")
-async def update_alert_rule_v2(rule_id: int, updates: AlertRuleUpdate, user: dict = Depends(require_admin)):
+@app.put("/api/alerts/rules/{rule_id}", openapi_extra=_json_body_openapi(AlertRuleUpdate))
+async def update_alert_rule_v2(rule_id: int, request: Request, user: dict = Depends(require_admin)):
     """Update an alert rule"""
+    updates = await _parse_json_body(request, AlertRuleUpdate)
+    return await _update_alert_rule_v2(rule_id, updates, user)
+
+
+async def _update_alert_rule_v2(rule_id: int, updates: AlertRuleUpdate, user: dict) -> dict:
     try:
-        updated = db_manager.update_alert_rule_v2(rule_id, updates.dict(exclude_unset=True))
+        updated = await _db(db_manager.update_alert_rule_v2, rule_id, updates.model_dump(exclude_unset=True))
         if not updated:
             raise HTTPException(status_code=404, detail="Rule not found")
+        invalidate_alerts_cache()
         return updated
     except HTTPException:
         raise
@@ -4188,9 +4501,10 @@ async def update_alert_rule_v2(rule_id: int, updates: AlertRuleUpdate, user: dic
 async def delete_alert_rule_v2(rule_id: int, user: dict = Depends(require_admin)):
     """Delete an alert rule"""
     try:
-        success = db_manager.delete_alert_rule_v2(rule_id)
+        success = await _db(db_manager.delete_alert_rule_v2, rule_id)
         if not success:
             raise HTTPException(status_code=404, detail="Rule not found")
+        invalidate_alerts_cache()
         return {"success": True, "message": "Rule deleted"}
     except HTTPException:
         raise
@@ -4200,42 +4514,45 @@ async def delete_alert_rule_v2(rule_id: int, user: dict = Depends(require_admin)
 
 # Effective rules for targets (with overrides applied)
 @app.get("/api/agents/{agent_id}/effective-rules")
-async def get_agent_effective_rules(agent_id: str):
+async def get_agent_effective_rules(agent_id: str, request: Request):
     """Get all effective alert rules for an agent (global + specific, with overrides)"""
     try:
-        rules = db_manager.get_effective_rules_for_target("agent", agent_id)
-        overrides = db_manager.get_rule_overrides_for_target("agent", agent_id)
-        return {"agent_id": agent_id, "rules": rules, "overrides": overrides}
+        async def load():
+            rules, overrides = await _db(db_manager.get_effective_rules_and_overrides, "agent", agent_id)
+            return {"agent_id": agent_id, "rules": rules, "overrides": overrides}
+        return await _cached_alerts_response(request, ("effective", "agent", agent_id), load)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch effective rules: {str(e)}")
 
 
 @app.get("/api/bookmarks/{bookmark_id}/effective-rules")
-async def get_bookmark_effective_rules(bookmark_id: str):
+async def get_bookmark_effective_rules(bookmark_id: str, request: Request):
     """Get all effective alert rules for a bookmark (global + specific, with overrides)"""
     try:
-        rules = db_manager.get_effective_rules_for_target("bookmark", bookmark_id)
-        overrides = db_manager.get_rule_overrides_for_target("bookmark", bookmark_id)
-        return {"bookmark_id": bookmark_id, "rules": rules, "overrides": overrides}
+        async def load():
+            rules, overrides = await _db(db_manager.get_effective_rules_and_overrides, "bookmark", bookmark_id)
+            return {"bookmark_id": bookmark_id, "rules": rules, "overrides": overrides}
+        return await _cached_alerts_response(request, ("effective", "bookmark", bookmark_id), load)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch effective rules: {str(e)}")
 
 
 # Rule overrides
-@app.post("/api/agents/{agent_id}/rule-overrides/{rule_id}")
-async def set_agent_rule_override(agent_id: str, rule_id: int, override: AlertRuleOverride, 
-                                  user: dict = Depends(require_admin)):
-    """Set an override for a global rule on this agent"""
+async def _set_rule_override(target_type: str, target_id: str, rule_id: int,
+                             override: AlertRuleOverride) -> dict:
+    """Set an override for a global rule on an agent or bookmark"""
     try:
-        success = db_manager.set_rule_override(
+        success = await _db(
+            db_manager.set_rule_override,
             rule_id=rule_id,
-            target_type="agent",
-            target_id=agent_id,
+            target_type=target_type,
+            target_id=target_id,
             override_type=override.override_type,
             modified_threshold=override.modified_threshold,
             modified_channels=override.modified_channels
         )
         if success:
+            invalidate_alerts_cache()
             return {"success": True, "message": "Override set"}
         raise HTTPException(status_code=500, detail="Failed to set override")
     except HTTPException:
@@ -4244,12 +4561,12 @@ async def set_agent_rule_override(agent_id: str, rule_id: int, override: AlertRu
         raise HTTPException(status_code=500, detail=f"Failed to set override: {str(e)}")
 
 
-@app.delete("/api/agents/{agent_id}/rule-overrides/{rule_id}")
-async def remove_agent_rule_override(agent_id: str, rule_id: int, user: dict = Depends(require_admin)):
-    """Remove an override for a global rule on this agent"""
+async def _remove_rule_override(target_type: str, target_id: str, rule_id: int) -> dict:
+    """Remove an override for a global rule on an agent or bookmark"""
     try:
-        success = db_manager.remove_rule_override(rule_id, "agent", agent_id)
+        success = await _db(db_manager.remove_rule_override, rule_id, target_type, target_id)
         if success:
+            invalidate_alerts_cache()
             return {"success": True, "message": "Override removed"}
         raise HTTPException(status_code=404, detail="Override not found")
     except HTTPException:
@@ -4258,40 +4575,125 @@ async def remove_agent_rule_override(agent_id: str, rule_id: int, user: dict = D
         raise HTTPException(status_code=500, detail=f"Failed to remove override: {str(e)}")
 
 
+@app.post("/api/agents/{agent_id}/rule-overrides/{rule_id}")
+async def set_agent_rule_override(agent_id: str, rule_id: int, override: AlertRuleOverride,
+                                  user: dict = Depends(require_admin),
+                                  idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key")):
+    """Set an override for a global rule on this agent"""
+    return await _run_idempotent(
+        f"agent-override:{agent_id}:{rule_id}", idempotency_key, user,
+        lambda: _set_rule_override("agent", agent_id, rule_id, override)
+    )
+
+
+@app.delete("/api/agents/{agent_id}/rule-overrides/{rule_id}")
+async def remove_agent_rule_override(agent_id: str, rule_id: int, user: dict = Depends(require_admin)):
+    """Remove an override for a global rule on this agent"""
+    return await _remove_rule_override("agent", agent_id, rule_id)
+
+
 @app.post("/api/bookmarks/{bookmark_id}/rule-overrides/{rule_id}")
 async def set_bookmark_rule_override(bookmark_id: str, rule_id: int, override: AlertRuleOverride,
-                                     user: dict = Depends(require_admin)):
+                                     user: dict = Depends(require_admin),
+                                     idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key")):
     """Set an override for a global rule on this bookmark"""
-    try:
-        success = db_manager.set_rule_override(
-            rule_id=rule_id,
-            target_type="bookmark",
-            target_id=bookmark_id,
-            override_type=override.override_type,
-            modified_threshold=override.modified_threshold,
-            modified_channels=override.modified_channels
-        )
-        if success:
-            return {"success": True, "message": "Override set"}
-        raise HTTPException(status_code=500, detail="Failed to set override")
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to set override: {str(e)}")
+    return await _run_idempotent(
+        f"bookmark-override:{bookmark_id}:{rule_id}", idempotency_key, user,
+        lambda: _set_rule_override("bookmark", bookmark_id, rule_id, override)
+    )
 
 
 @app.delete("/api/bookmarks/{bookmark_id}/rule-overrides/{rule_id}")
 async def remove_bookmark_rule_override(bookmark_id: str, rule_id: int, user: dict = Depends(require_admin)):
     """Remove an override for a global rule on this bookmark"""
-    try:
-        success = db_manager.remove_rule_override(rule_id, "bookmark", bookmark_id)
-        if success:
-            return {"success": True, "message": "Override removed"}
-        raise HTTPException(status_code=404, detail="Override not found")
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to remove override: {str(e)}")
+    return await _remove_rule_override("bookmark", bookmark_id, rule_id)
+
+
+# ==============================
+# Alert / Channel Batch API
+# ==============================
+
+ALERT_BATCH_MAX_ITEMS = 100
+
+
+class AlertBatchItem(BaseModel):
+    id: str  # Client-chosen, echoed back to correlate responses
+    method: Literal["POST", "PUT", "DELETE"]
+    url: str
+    headers: Optional[Dict[str, str]] = None  # Only Idempotency-Key is honoured
+    body: Optional[dict] = None
+
+class AlertBatchRequest(BaseModel):
+    requests: List[AlertBatchItem] = Field(..., max_length=ALERT_BATCH_MAX_ITEMS)
+
+
+# (method, path pattern, handler, body parameter name, body model)
+_ALERT_BATCH_ROUTES = [
+    ("POST", r"/api/notifications/channels", create_notification_channel, "channel", NotificationChannelCreate),
+    ("PUT", r"/api/notifications/channels/(?P<channel_id>\d+)", update_notification_channel, "updates", NotificationChannelUpdate),
+    ("DELETE", r"/api/notifications/channels/(?P<channel_id>\d+)", delete_notification_channel, None, None),
+    ("POST", r"/api/alerts/rules", _create_alert_rule_v2, "rule", AlertRuleCreate),
+    ("PUT", r"/api/alerts/rules/(?P<rule_id>\d+)", _update_alert_rule_v2, "updates", AlertRuleUpdate),
+    ("DELETE", r"/api/alerts/rules/(?P<rule_id>\d+)", delete_alert_rule_v2, None, None),
+    ("POST", r"/api/agents/(?P<agent_id>[^/]+)/rule-overrides/(?P<rule_id>\d+)", set_agent_rule_override, "override", AlertRuleOverride),
+    ("DELETE", r"/api/agents/(?P<agent_id>[^/]+)/rule-overrides/(?P<rule_id>\d+)", remove_agent_rule_override, None, None),
+    ("POST", r"/api/bookmarks/(?P<bookmark_id>[^/]+)/rule-overrides/(?P<rule_id>\d+)", set_bookmark_rule_override, "override", AlertRuleOverride),
+    ("DELETE", r"/api/bookmarks/(?P<bookmark_id>[^/]+)/rule-overrides/(?P<rule_id>\d+)", remove_bookmark_rule_override, None, None),
+]
+_ALERT_BATCH_ROUTES = [
+    (method, re.compile(pattern), handler, body_param, body_model)
+    for method, pattern, handler, body_param, body_model in _ALERT_BATCH_ROUTES
+]
+_ALERT_BATCH_INT_PARAMS = {"channel_id", "rule_id"}
+_ALERT_BATCH_IDEMPOTENT_HANDLERS = {set_agent_rule_override, set_bookmark_rule_override}
+
+
+async def _dispatch_alert_batch_item(item: AlertBatchItem, user: dict) -> dict:
+    """Run one batch item through the matching alert/channel handler"""
+    for method, pattern, handler, body_param, body_model in _ALERT_BATCH_ROUTES:
+        if method != item.method:
+            continue
+        match = pattern.fullmatch(item.url)
+        if not match:
+            continue
+        
+        kwargs = {
+            name: int(value) if name in _ALERT_BATCH_INT_PARAMS else value
+            for name, value in match.groupdict().items()
+        }
+        try:
+            if body_model is not None:
+                kwargs[body_param] = body_model.model_validate(item.body or {})
+            if handler in _ALERT_BATCH_IDEMPOTENT_HANDLERS:
+                headers = {k.lower(): v for k, v in (item.headers or {}).items()}
+                kwargs["idempotency_key"] = headers.get("idempotency-key")
+            result = await handler(**kwargs, user=user)
+            return {"id": item.id, "status": 200, "body": result}
+        except ValidationError as e:
+            return {"id": item.id, "status": 422, "body": {"detail": jsonable_encoder(e.errors())}}
+        except HTTPException as e:
+            return {"id": item.id, "status": e.status_code, "body": {"detail": e.detail}}
+    
+    return {"id": item.id, "status": 404, "body": {"detail": f"No batch route for {item.method} {item.url}"}}
+
+
+@app.post("/api/alerts/batch")
+async def alerts_batch(batch: AlertBatchRequest, user: dict = Depends(require_admin)):
+    """
+    Apply several channel / alert rule / override writes in one request.
+    
+    Each item names a method and URL of an existing endpoint plus its JSON
+    body; items run concurrently and each gets its own status in the
+    response, so one failing item does not abort the others.
+    """
+    ids = [item.id for item in batch.requests]
+    if len(ids) != len(set(ids)):
+        raise HTTPException(status_code=400, detail="Batch item ids must be unique")
+    
+    responses = await asyncio.gather(
+        *(_dispatch_alert_batch_item(item, user) for item in batch.requests)
+    )
+    return {"responses": responses}
 
 
 # =========================
@@ -4340,41 +4742,66 @@ async def update_log_settings(agent_id: str, settings: LogSettingsUpdate, user:
         raise HTTPException(status_code=500, detail=f"Failed to update log settings: {str(e)}")
 
 
+async def _store_queued_raw_logs(agent_id: str, logs: list):
+    """Redis consumer callback: write a queued raw log batch"""
+    await _db(db_manager.ingest_raw_logs, agent_id, logs)
+
+
 @app.post("/api/agents/{agent_id}/logs")
 async def ingest_agent_logs(agent_id: str, request: Request):
     """
     Ingest raw logs from an agent.
-    Accepts GZIP-compressed JSON payloads.
+    Accepts GZIP/zstd-compressed JSON payloads (inflated by RequestDecompressionMiddleware).
+    
+    The logs array is parsed incrementally and handled in chunks of
+    RAW_LOG_INGEST_CHUNK_SIZE entries. With Redis available each chunk is
+    appended to the queue stream and stored by the consumer worker;
+    otherwise it is written directly.
+    
+    Uploads are limited to AGENT_LOG_UPLOADS_PER_MINUTE per agent (429 with
+    Retry-After) and REQUEST_MAX_DECOMPRESSED_BYTES per body (413).
     """
     try:
-        # Check for GZIP encoding
-        content_encoding = request.headers.get("Content-Encoding", "")
-        body = await request.body()
+        if connection_manager:
+            retry_after = connection_manager.check_log_upload_rate(agent_id)
+            if retry_after is not None:
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too many log uploads",
+                    headers={"Retry-After": str(retry_after)}
+                )
         
-        if content_encoding == "gzip":
-            try:
-                body = gzip.decompress(body)
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Failed to decompress GZIP: {str(e)}")
+        # Compressed bodies are capped while inflating (RequestDecompressionMiddleware);
+        # reject oversized plain bodies before reading them
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > REQUEST_MAX_DECOMPRESSED_BYTES:
+            raise HTTPException(status_code=413, detail=f"Request body exceeds {REQUEST_MAX_DECOMPRESSED_BYTES} bytes")
         
-        # Parse JSON
+        body = await request.body()
+        if len(body) > REQUEST_MAX_DECOMPRESSED_BYTES:
+            raise HTTPException(status_code=413, detail=f"Request body exceeds {REQUEST_MAX_DECOMPRESSED_BYTES} bytes")
+        
+        count = queued = inserted = 0
         try:
-            data = json.loads(body)
-        except Exception as e:
+            for chunk in iter_log_chunks(body):
+                if not count and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Ingesting logs for agent %s, sample: %s", agent_id, chunk[0])
+                count += len(chunk)
+                
+                if redis_queue and await redis_queue.publish_logs(agent_id, chunk):
+                    queued += len(chunk)
+                    continue
+                
+                result = await _db(db_manager.ingest_raw_logs, agent_id, chunk)
+                inserted += result.get("inserted", 0)
+        except LogParseError as e:
             raise HTTPException(status_code=400, detail=f"Invalid JSON: {str(e)}")
         
-        # Validate and extract logs
-        logs_data = data.get("logs", [])
-        if not logs_data:
+        if not count:
             return {"success": True, "message": "No logs to ingest", "count": 0}
         
-        print(f"[DEBUG] Ingesting {len(logs_data)} logs for agent {agent_id}")
-        if logs_data:
-            print(f"[DEBUG] Sample log: {logs_data[0]}")
-        
-        result = db_manager.ingest_raw_logs(agent_id, logs_data)
-        print(f"[DEBUG] Ingest result: {result}")
-        return result
+        logger.debug("Ingested %d logs for %s (queued: %d, inserted: %d)", count, agent_id, queued, inserted)
+        return {"success": True, "agent_id": agent_id, "count": count, "queued": queued, "inserted": inserted}
     except HTTPException:
         raise
     except Exception as e:
@@ -4459,7 +4886,7 @@ async def get_agent_log_stats(agent_id: str):
 async def trigger_log_reaper():
     """Manually trigger the log reaper (cleanup old logs)"""
     try:
-        result = db_manager.reap_old_logs()
+        result = await _db(db_manager.reap_old_logs)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to run log reaper: {str(e)}")
@@ -4476,6 +4903,161 @@ async def ask_question(request: AskRequest):
     return AskResponse(answer="AI Not Connected Yet")
 
 
+# Heartbeats received on one agent WebSocket are stored by a per-connection
+# worker task; the receive loop only parses, authenticates and enqueues, so a
+# slow DB write cannot stall reads from the agent's socket. When the queue is
+# full the heartbeat is dropped and the agent gets a backpressure error.
+AGENT_WS_QUEUE_SIZE = int(os.environ.get("AGENT_WS_QUEUE_SIZE", "16"))
+
+
+async def _agent_heartbeat_worker(agent_id: str, heartbeats: asyncio.Queue):
+    """Store and broadcast queued heartbeats until a None sentinel arrives"""
+    while True:
+        payload = await heartbeats.get()
+        if payload is None:
+            return
+        
+        handler_start = time.time()
+        try:
+            await _process_agent_heartbeat(agent_id, payload)
+        except Exception as e:
+            logger.error("Error processing agent data from %s: %s", agent_id, e)
+        
+        # Log slow handlers
+        handler_duration = (time.time() - handler_start) * 1000
+        if handler_duration > SLOW_HANDLER_THRESHOLD_MS:
+            connection_manager.record_slow_handler(agent_id, handler_duration, "agent_handler")
+
+
+async def _process_agent_heartbeat(agent_id: str, payload: HeartbeatPayload):
+    """Buffer metrics, store snapshots/system info, evaluate alerts and notify UI watchers"""
+    # Dump the nested models once (one pydantic-core call per list) and
+    # reuse the dicts for buffering, alert evaluation and the UI frame.
+    # JSON mode formats every metric timestamp to an ISO string inside
+    # pydantic-core instead of a Python isoformat() call per metric
+    metrics_data = _METRIC_LIST_ADAPTER.dump_python(payload.metrics, mode="json")
+    process_data = _PROCESS_LIST_ADAPTER.dump_python(payload.processes)
+    latest_metric = metrics_data[-1] if metrics_data else None
+    
+    # Store in database using buffered insertion
+    try:
+        # Full upsert only for new agents or when hostname/IP/address changed;
+        # otherwise the ingest queue coalesces last_seen/status into one bulk UPDATE
+        touch = None
+        if ingest_queue and ingest_queue.is_known_agent(
+            payload.agent_id, payload.hostname, payload.public_ip, payload.connection_address
+        ):
+            touch = (payload.last_seen_at, payload.status)
+        else:
+            await _db(
+                db_manager.upsert_agent,
+                agent_id=payload.agent_id,
+                hostname=payload.hostname,
+                status=payload.status,
+                last_seen=payload.last_seen_at,
+                public_ip=payload.public_ip,
+                connection_address=payload.connection_address
+            )
+            if ingest_queue:
+                ingest_queue.remember_agent(
+                    payload.agent_id, payload.hostname, payload.public_ip, payload.connection_address
+                )
+        
+        # Route metrics through Redis queue if available, else direct to buffer
+        if metrics_data:
+            if redis_queue and redis_queue.is_connected:
+                # Push to Redis stream for async processing
+                await redis_queue.publish_metrics(
+                    agent_id=payload.agent_id,
+                    metrics=metrics_data,
+                    load_avg=payload.load_avg
+                )
+            elif metrics_buffer:
+                # Direct to metrics buffer if Redis unavailable
+                await metrics_buffer.add_metrics(
+                    agent_id=payload.agent_id,
+                    metrics=metrics_data,
+                    load_avg=payload.load_avg
+                )
+        
+        # Process snapshot and system info (sent periodically by agent) go through
+        # the ingest queue, which skips writes when neither has changed
+        system_info = None
+        if payload.system_info:
+            logger.debug("Received system_info for %s: OS=%s, CPU=%s",
+                         payload.agent_id, payload.system_info.os, payload.system_info.cpu_model)
+            # JSON mode serializes collected_at to an ISO string for storage
+            system_info = payload.system_info.model_dump(mode="json")
+        
+        if ingest_queue:
+            await ingest_queue.submit({
+                "agent_id": payload.agent_id,
+                "processes": process_data or None,
+                "processes_digest": process_list_digest(process_data) if process_data else None,
+                "system_info": system_info,
+                "ts": payload.last_seen_at,
+                "touch": touch
+            })
+        else:
+            if process_data:
+                await _db(
+                    db_manager.insert_process_snapshot,
+                    agent_id=payload.agent_id,
+                    timestamp=payload.last_seen_at,
+                    processes=process_data
+                )
+            if system_info:
+                await _db(
+                    db_manager.update_agent_system_info,
+                    agent_id=payload.agent_id,
+                    system_info=system_info
+                )
+        
+        # Evaluate metrics against alert rules (use latest metric)
+        if latest_metric:
+            try:
+                await _db(
+                    db_manager.evaluate_metrics,
+                    agent_id=payload.agent_id,
+                    metrics={
+                        "cpu_percent": latest_metric["cpu_percent"],
+                        "ram_percent": latest_metric["ram_percent"],
+                        "net_up": latest_metric["net_sent_bps"],
+                        "net_down": latest_metric["net_recv_bps"],
+                        "cpu_temp": latest_metric["cpu_temp"],
+                        "disks": latest_metric["disks"]
+                    }
+                )
+            except Exception as alert_err:
+                logger.error("Alert evaluation error for %s: %s", payload.agent_id, alert_err)
+    except Exception as e:
+        logger.error("Error storing WebSocket data for %s: %s", agent_id, e)
+    
+    # Broadcast latest metric to watching UI clients (flatten structure);
+    # skip building the frame entirely when nobody is watching
+    if latest_metric and connection_manager.has_clients(agent_id):
+        ui_message = {
+            "timestamp": latest_metric["timestamp"],
+            "cpu_percent": latest_metric["cpu_percent"],
+            "ram_percent": latest_metric["ram_percent"],
+            "net_up": latest_metric["net_sent_bps"],
+            "net_down": latest_metric["net_recv_bps"],
+            "disk_read": latest_metric["disk_read_bps"],
+            "disk_write": latest_metric["disk_write_bps"],
+            "ping": latest_metric["ping_latency_ms"],
+            "cpu_temp": latest_metric["cpu_temp"],
+            "cpu_name": latest_metric["cpu_name"],
+            "gpu_percent": latest_metric["gpu_percent"],
+            "gpu_temp": latest_metric["gpu_temp"],
+            "gpu_name": latest_metric["gpu_name"],
+            "is_vm": latest_metric["is_vm"],
+            "disks": latest_metric["disks"],
+            "load_avg": payload.load_avg,
+            "processes": process_data
+        }
+        await connection_manager.broadcast_to_clients(agent_id, ui_message)
+
+
 @app.websocket("/ws/agent/{agent_id}")
 @app.websocket("/api/ws/agent/{agent_id}")
 async def websocket_agent_endpoint(websocket: WebSocket, agent_id: str):
@@ -4495,7 +5077,6 @@ async def websocket_agent_endpoint(websocket: WebSocket, agent_id: str):
     - New/legacy agents receive token in response
     - Invalid tokens cause connection termination
     """
-    import time as time_module
     
     # Check connection limits and accept/reject
     success, reason, retry_after = await connection_manager.connect_agent(agent_id, websocket)
@@ -4518,29 +5099,49 @@ async def websocket_agent_endpoint(websocket: WebSocket, agent_id: str):
     # Track if we've authenticated this connection
     ws_authenticated = False
     
+    heartbeats: asyncio.Queue = asyncio.Queue(maxsize=AGENT_WS_QUEUE_SIZE)
+    worker = asyncio.create_task(_agent_heartbeat_worker(agent_id, heartbeats))
+    
     try:
         while True:
             # Receive data from agent
-            handler_start = time_module.time()
-            data = await websocket.receive_text()
-            data_size = len(data.encode())
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            # Binary frames are parsed as-is. Text frames arrive already decoded
+            # by the ASGI server; their length in characters equals the byte size
+            # for the ASCII JSON agents send, so skip re-encoding just to measure
+            data = frame.get("bytes")
+            if data is None:
+                data = frame.get("text", "")
+            data_size = len(data)
             
             # Record message for statistics
             connection_manager.record_message(agent_id, data_size)
             connection_manager.update_heartbeat(agent_id)
             
             try:
-                message = json.loads(data)
+                # Fast path: heartbeats are parsed and validated in one pydantic-core
+                # pass (no intermediate dict); anything else is decoded normally
+                try:
+                    payload = HeartbeatPayload.model_validate_json(data)
+                    message = None
+                except ValidationError:
+                    payload = None
+                    message = orjson.loads(data)
                 
                 # Check if it's a heartbeat payload
-                if "metrics" in message and "status" in message:
+                if payload is not None or ("metrics" in message and "status" in message):
                     # Validate instance API key on first message
                     if not ws_authenticated:
-                        provided_key = message.get('auth_token') or message.get('api_key')
+                        if payload is not None:
+                            provided_key = payload.auth_token
+                        else:
+                            provided_key = message.get('auth_token') or message.get('api_key')
                         is_valid, auth_reason = validate_scribe_api_key(provided_key)
                         
                         if not is_valid:
-                            print(f"🔒 WebSocket auth failed for agent {agent_id}: {auth_reason}")
+                            logger.warning("WebSocket auth failed for agent %s: %s", agent_id, auth_reason)
                             await websocket.send_json({
                                 "error": "auth_failed",
                                 "reason": auth_reason,
@@ -4550,158 +5151,46 @@ async def websocket_agent_endpoint(websocket: WebSocket, agent_id: str):
                             return
                         
                         ws_authenticated = True
-                        print(f"✅ WebSocket: Authenticated agent {agent_id}")
+                        logger.info("WebSocket: Authenticated agent %s", agent_id)
                     
-                    # Debug: Check raw system_info before parsing
-                    if "system_info" in message:
-                        print(f"DEBUG: Raw system_info present in message: {type(message['system_info'])}, keys={list(message['system_info'].keys()) if message['system_info'] else 'None'}")
-                    else:
-                        print(f"DEBUG: No system_info key in raw message")
+                    # Malformed heartbeat: raises the validation error (logged below)
+                    if payload is None:
+                        payload = HeartbeatPayload(**message)
                     
-                    # Parse into HeartbeatPayload
-                    payload = HeartbeatPayload(**message)
-                    
-                    # Debug: log connection_address from payload
-                    conn_addr = getattr(payload, 'connection_address', '')
-                    if conn_addr:
-                        print(f"Agent {payload.agent_id} connection_address: {conn_addr}")
-                    
-                    # Store in database using buffered insertion
+                    # Hand off to the worker; never queue unboundedly behind a slow DB
                     try:
-                        # Upsert agent information with public IP and connection address
-                        db_manager.upsert_agent(
-                            agent_id=payload.agent_id,
-                            hostname=payload.hostname,
-                            status=payload.status,
-                            last_seen=payload.last_seen_at,
-                            public_ip=payload.public_ip,
-                            connection_address=getattr(payload, 'connection_address', '')
-                        )
-                        
-                        # Prepare metrics data for buffered insertion
-                        metrics_data = [
-                            {
-                                "timestamp": metric.timestamp.isoformat() if hasattr(metric.timestamp, 'isoformat') else str(metric.timestamp),
-                                "cpu_percent": metric.cpu_percent,
-                                "ram_percent": metric.ram_percent,
-                                "net_sent_bps": metric.net_sent_bps,
-                                "net_recv_bps": metric.net_recv_bps,
-                                "disk_read_bps": metric.disk_read_bps,
-                                "disk_write_bps": metric.disk_write_bps,
-                                "ping_latency_ms": metric.ping_latency_ms,
-                                "cpu_temp": metric.cpu_temp,
-                                "cpu_name": metric.cpu_name,
-                                "gpu_percent": metric.gpu_percent,
-                                "gpu_temp": metric.gpu_temp,
-                                "gpu_name": metric.gpu_name,
-                                "is_vm": metric.is_vm,
-                                "disks": [disk.dict() for disk in metric.disks]
-                            }
-                            for metric in payload.metrics
-                        ]
-                        
-                        # Route metrics through Redis queue if available, else direct to buffer
-                        if metrics_data:
-                            if redis_queue and redis_queue.is_connected:
-                                # Push to Redis stream for async processing
-                                await redis_queue.publish_metrics(
-                                    agent_id=payload.agent_id,
-                                    metrics=metrics_data,
-                                    load_avg=payload.load_avg
-                                )
-                            elif metrics_buffer:
-                                # Direct to metrics buffer if Redis unavailable
-                                await metrics_buffer.add_metrics(
-                                    agent_id=payload.agent_id,
-                                    metrics=metrics_data,
-                                    load_avg=payload.load_avg
-                                )
-                        
-                        # Insert process snapshot if processes are provided
-                        if payload.processes:
-                            process_data = [proc.dict() for proc in payload.processes]
-                            db_manager.insert_process_snapshot(
-                                agent_id=payload.agent_id,
-                                timestamp=payload.last_seen_at,
-                                processes=process_data
-                            )
-                        
-                        # Update system info if provided (sent periodically by agent)
-                        if payload.system_info:
-                            print(f"DEBUG: Received system_info for {payload.agent_id}: OS={payload.system_info.os}, CPU={payload.system_info.cpu_model}")
-                            # Convert system_info to dict and handle datetime serialization
-                            system_info_dict = payload.system_info.dict()
-                            # Convert datetime objects to ISO strings for JSON storage
-                            if 'collected_at' in system_info_dict and system_info_dict['collected_at']:
-                                system_info_dict['collected_at'] = system_info_dict['collected_at'].isoformat()
-                            db_manager.update_agent_system_info(
-                                agent_id=payload.agent_id,
-                                system_info=system_info_dict
-                            )
-                        else:
-                            print(f"DEBUG: No system_info in payload for {payload.agent_id}")
-                        
-                        # Evaluate metrics against alert rules (use latest metric)
-                        if payload.metrics:
-                            latest_metric = payload.metrics[-1]
-                            try:
-                                db_manager.evaluate_metrics(
-                                    agent_id=payload.agent_id,
-                                    metrics={
-                                        "cpu_percent": latest_metric.cpu_percent,
-                                        "ram_percent": latest_metric.ram_percent,
-                                        "net_up": latest_metric.net_sent_bps,
-                                        "net_down": latest_metric.net_recv_bps,
-                                        "cpu_temp": latest_metric.cpu_temp,
-                                        "disks": [disk.dict() for disk in latest_metric.disks]
-                                    }
-                                )
-                            except Exception as alert_err:
-                                print(f"Alert evaluation error: {alert_err}")
-                    except Exception as e:
-                        print(f"Error storing WebSocket data: {e}")
-                    
-                    # Broadcast latest metric to watching UI clients (flatten structure)
-                    if payload.metrics:
-                        latest_metric = payload.metrics[-1]  # Get most recent metric
-                        ui_message = {
-                            "timestamp": latest_metric.timestamp.isoformat(),
-                            "cpu_percent": latest_metric.cpu_percent,
-                            "ram_percent": latest_metric.ram_percent,
-                            "net_up": latest_metric.net_sent_bps,
-                            "net_down": latest_metric.net_recv_bps,
-                            "disk_read": latest_metric.disk_read_bps,
-                            "disk_write": latest_metric.disk_write_bps,
-                            "ping": latest_metric.ping_latency_ms,
-                            "cpu_temp": latest_metric.cpu_temp,
-                            "cpu_name": latest_metric.cpu_name,
-                            "gpu_percent": latest_metric.gpu_percent,
-                            "gpu_temp": latest_metric.gpu_temp,
-                            "gpu_name": latest_metric.gpu_name,
-                            "is_vm": latest_metric.is_vm,
-                            "disks": [disk.dict() for disk in latest_metric.disks] if latest_metric.disks else [],
-                            "load_avg": payload.load_avg,
-                            "processes": [proc.dict() for proc in payload.processes] if payload.processes else []
-                        }
-                        await connection_manager.broadcast_to_clients(agent_id, ui_message)
+                        heartbeats.put_nowait(payload)
+                    except asyncio.QueueFull:
+                        logger.warning("Dropping heartbeat from agent %s: %d heartbeats already queued",
+                                       agent_id, heartbeats.qsize())
+                        await connection_manager.try_send(agent_id, {
+                            "error": "backpressure",
+                            "message": "Server is busy storing earlier heartbeats; this one was dropped."
+                        })
                 else:
-                    print(f"Received non-heartbeat message from agent {agent_id}: {message}")
+                    logger.debug("Received non-heartbeat message from agent %s: %s", agent_id, message)
                 
-            except json.JSONDecodeError:
-                print(f"Invalid JSON from agent {agent_id}")
+            except orjson.JSONDecodeError:
+                logger.warning("Invalid JSON from agent %s", agent_id)
             except Exception as e:
-                print(f"Error processing agent data: {e}")
-            
-            # Log slow handlers
-            handler_duration = (time_module.time() - handler_start) * 1000
-            if handler_duration > SLOW_HANDLER_THRESHOLD_MS:
-                connection_manager.record_slow_handler(agent_id, handler_duration, "agent_handler")
+                logger.error("Error processing agent data from %s: %s", agent_id, e)
     
     except WebSocketDisconnect:
         connection_manager.disconnect_agent(agent_id)
     except Exception as e:
-        print(f"WebSocket error for agent {agent_id}: {e}")
+        logger.error("WebSocket error for agent %s: %s", agent_id, e)
         connection_manager.disconnect_agent(agent_id)
+    finally:
+        # Let the worker store what is already queued, then wait for it to exit
+        try:
+            if not worker.done():
+                await heartbeats.put(None)
+            await worker
+        except asyncio.CancelledError:
+            worker.cancel()
+            raise
+        except Exception as e:
+            logger.error("Heartbeat worker for agent %s failed: %s", agent_id, e)
 
 
 @app.websocket("/api/ws/ui/{agent_id}")
@@ -4738,24 +5227,23 @@ async def websocket_ui_endpoint(websocket: WebSocket, agent_id: str):
             data = await websocket.receive_text()
             
             try:
-                message = json.loads(data)
+                message = orjson.loads(data)
                 
                 # Handle UI commands (e.g., refresh, change interval, etc.)
                 if "command" in message:
                     command = message["command"]
-                    print(f"UI command for agent {agent_id}: {command}")
+                    logger.debug("UI command for agent %s: %s", agent_id, command)
                     
                     # Forward commands to agent if needed
-                    if agent_id in connection_manager.agents:
-                        await connection_manager.agents[agent_id].websocket.send_json(message)
+                    await connection_manager.try_send(agent_id, message)
             
-            except json.JSONDecodeError:
-                print(f"Invalid JSON from UI client for agent {agent_id}")
+            except orjson.JSONDecodeError:
+                logger.warning("Invalid JSON from UI client for agent %s", agent_id)
     
     except WebSocketDisconnect:
         connection_manager.disconnect_client(agent_id, websocket)
     except Exception as e:
-        print(f"WebSocket error for UI client watching {agent_id}: {e}")
+        logger.error("WebSocket error for UI client watching %s: %s", agent_id, e)
         connection_manager.disconnect_client(agent_id, websocket)
 
 
@@ -4800,6 +5288,9 @@ class BookmarkCreate(BaseModel):
     description: Optional[str] = None
 
 class BookmarkUpdate(BaseModel):
+    # Partial update: update_bookmark applies only the fields that were sent
+    model_config = ConfigDict(extra="ignore")
+    
     group_id: Optional[str] = None
     name: Optional[str] = None
     type: Optional[str] = None
@@ -4817,6 +5308,25 @@ class BookmarkUpdate(BaseModel):
     description: Optional[str] = None
 
 
+# The bookmark tree and status summary are polled by every open dashboard but
+# only change on bookmark/group writes or a monitor status flip, all of which
+# clear the namespace. Keys include the user's identity and scope (RBAC).
+BOOKMARKS_CACHE_TTL_SECONDS = 10
+
+
+def _bookmarks_cache_key(kind: str, tenant_id: str, user: Optional[dict]) -> tuple:
+    if not user:
+        return (kind, tenant_id, None)
+    return (kind, tenant_id, user.get("user_id"), user.get("role"),
+            bool(user.get("is_admin")), user.get("assigned_profile_id"))
+
+
+def invalidate_bookmarks_cache():
+    """Drop cached bookmark tree / summary responses (and reports built from them)"""
+    get_response_cache().clear(BOOKMARKS_CACHE_NAMESPACE)
+    invalidate_executive_summary_cache()
+
+
 @app.get("/api/bookmarks/tree")
 async def get_bookmarks_tree(
     request: Request,
@@ -4830,12 +5340,26 @@ async def get_bookmarks_tree(
     try:
         # Check if user is authenticated and filter accordingly
         current_user = await get_current_user(request)
-        if current_user:
-            tree = db_manager.get_bookmarks_tree_for_user(current_user)
-        else:
-            # Unauthenticated - use tenant-based filtering (backward compatibility)
-            tree = db_manager.get_bookmarks_tree(x_tenant_id)
-        return {"success": True, "data": tree}
+        cache = get_response_cache()
+        key = _bookmarks_cache_key("tree", x_tenant_id, current_user)
+        cached = cache.get(BOOKMARKS_CACHE_NAMESPACE, key)
+        if cached is None:
+            if current_user:
+                tree = await _db(db_manager.get_bookmarks_tree_for_user, current_user)
+            else:
+                # Unauthenticated - use tenant-based filtering (backward compatibility)
+                tree = await _db(db_manager.get_bookmarks_tree, x_tenant_id)
+            # Encode and tag once per cache fill; polls that still hold this
+            # version get a bodiless 304
+            payload = jsonable_encoder({"success": True, "data": tree})
+            cached = (payload, compute_etag(payload))
+            cache.set(BOOKMARKS_CACHE_NAMESPACE, key, cached, BOOKMARKS_CACHE_TTL_SECONDS)
+        
+        payload, etag = cached
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return ORJSONResponse(payload, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -4859,6 +5383,7 @@ async def create_monitor_group(
     """Create a new monitor group"""
     try:
         new_group = db_manager.create_monitor_group(x_tenant_id, group.name, group.weight)
+        invalidate_bookmarks_cache()
         return {"success": True, "id": new_group["id"], "group": new_group}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -4873,11 +5398,15 @@ async def update_monitor_group(
 ):
     """Update a monitor group"""
     try:
-        updates = {k: v for k, v in group.dict().items() if v is not None}
+        # Only fields that were sent with a value (name/weight can't be cleared)
+        updates = group.model_dump(exclude_unset=True, exclude_none=True)
         if not updates:
             raise HTTPException(status_code=400, detail="No fields to update")
         db_manager.update_monitor_group(x_tenant_id, group_id, **updates)
+        invalidate_bookmarks_cache()
         return {"success": True}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -4893,6 +5422,7 @@ async def delete_monitor_group(
     Otherwise, monitors are moved to ungrouped."""
     try:
         db_manager.delete_monitor_group(x_tenant_id, group_id, delete_monitors=delete_monitors)
+        invalidate_bookmarks_cache()
         return {"success": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -4912,11 +5442,8 @@ async def get_bookmarks(
         # Check if user is authenticated
         current_user = await get_current_user(request)
         if current_user:
-            # Use RBAC-filtered method
-            bookmarks = db_manager.get_bookmarks_for_user(current_user)
-            # Apply group filter if specified
-            if group_id:
-                bookmarks = [b for b in bookmarks if b.get("group_id") == group_id]
+            # Use RBAC-filtered method (group filter applied in SQL)
+            bookmarks = db_manager.get_bookmarks_for_user(current_user, group_id=group_id)
         else:
             # Unauthenticated - use tenant-based filtering (backward compatibility)
             bookmarks = db_manager.get_bookmarks(x_tenant_id, group_id)
@@ -4950,16 +5477,16 @@ async def create_bookmark(
 ):
     """Create a new bookmark"""
     try:
-        # Parse raw body for debugging
-        raw_body = await request.json()
-        print(f"📥 Create bookmark request: {raw_body}")
+        raw_body = await request.body()
+        logger.debug("Create bookmark request: %s", raw_body)
         
-        # Manually validate with Pydantic
+        # Parse and validate in one pass (pydantic-core JSON parser)
         try:
-            bookmark = BookmarkCreate(**raw_body)
-        except Exception as validation_error:
-            print(f"❌ Validation error: {validation_error}")
-            raise HTTPException(status_code=422, detail=str(validation_error))
+            bookmark = BookmarkCreate.model_validate_json(raw_body)
+        except ValidationError as validation_error:
+            # Malformed JSON is a 400; well-formed bodies with bad fields stay 422
+            malformed = any(err["type"] == "json_invalid" for err in validation_error.errors())
+            raise HTTPException(status_code=400 if malformed else 422, detail=str(validation_error))
         
         # Validate type
         if bookmark.type not in ("http", "icmp", "tcp-port"):
@@ -4986,10 +5513,13 @@ async def create_bookmark(
             tags=bookmark.tags,
             description=bookmark.description
         )
+        invalidate_bookmarks_cache()
+        if bookmark.tags:
+            await invalidate_tags_cache()
         
-        # Notify monitor to pick up the new bookmark
+        # Notify monitor to pick up the new bookmark (in the background)
         if bookmark_monitor and bookmark.active:
-            await bookmark_monitor.sync_bookmarks()
+            bookmark_monitor.request_sync()
         
         return {"success": True, "id": new_bookmark["id"], "bookmark": new_bookmark}
     except HTTPException:
@@ -5006,19 +5536,18 @@ async def update_bookmark(
 ):
     """Update a bookmark"""
     try:
-        # Get raw JSON to see what was actually sent
-        raw_json = await request.json()
-        print(f"📝 Update bookmark {bookmark_id}: {raw_json}")
+        raw_body = await request.body()
+        logger.debug("Update bookmark %s: %s", bookmark_id, raw_body)
         
-        # Only include fields that were explicitly sent
-        updates = {}
-        allowed_fields = ['group_id', 'name', 'type', 'target', 'port', 'interval_seconds', 
-                          'timeout_seconds', 'max_retries', 'retry_interval', 'resend_notification',
-                          'upside_down', 'method', 'active', 'tags', 'description']
+        try:
+            bookmark = BookmarkUpdate.model_validate_json(raw_body)
+        except ValidationError as validation_error:
+            # Malformed JSON is a 400; well-formed bodies with bad fields stay 422
+            malformed = any(err["type"] == "json_invalid" for err in validation_error.errors())
+            raise HTTPException(status_code=400 if malformed else 422, detail=str(validation_error))
         
-        for field in allowed_fields:
-            if field in raw_json:
-                updates[field] = raw_json[field]
+        # Only include fields that were explicitly sent (unknown keys are ignored)
+        updates = bookmark.model_dump(exclude_unset=True)
         
         if not updates:
             raise HTTPException(status_code=400, detail="No fields to update")
@@ -5028,10 +5557,13 @@ async def update_bookmark(
             raise HTTPException(status_code=400, detail="Invalid type. Must be 'http', 'icmp', or 'tcp-port'")
         
         db_manager.update_bookmark(x_tenant_id, bookmark_id, **updates)
+        invalidate_bookmarks_cache()
+        if "tags" in updates:
+            await invalidate_tags_cache()
         
-        # Notify monitor to sync changes
+        # Notify monitor to sync changes (in the background)
         if bookmark_monitor:
-            await bookmark_monitor.sync_bookmarks()
+            bookmark_monitor.request_sync()
         
         return {"success": True}
     except HTTPException:
@@ -5049,10 +5581,12 @@ async def delete_bookmark(
     """Delete a bookmark and its check history"""
     try:
         db_manager.delete_bookmark(x_tenant_id, bookmark_id)
+        invalidate_bookmarks_cache()
+        await invalidate_tags_cache()
         
-        # Notify monitor to remove the bookmark
+        # Notify monitor to remove the bookmark (in the background)
         if bookmark_monitor:
-            await bookmark_monitor.sync_bookmarks()
+            bookmark_monitor.request_sync()
         
         return {"success": True}
     except Exception as e:
@@ -5084,6 +5618,7 @@ async def trigger_bookmark_check(
             latency_ms=result.latency_ms,
             message=result.message
         )
+        invalidate_bookmarks_cache()
         
         return {
             "success": True,
@@ -5107,24 +5642,18 @@ async def get_bookmark_history(
 ):
     """Get check history for a bookmark within time range"""
     try:
-        checks = db_manager.get_bookmark_checks_range(x_tenant_id, bookmark_id, hours)
-        
-        # Calculate uptime percentage
-        if checks:
-            up_count = sum(1 for c in checks if c["status"] == 1)
-            uptime_percent = round((up_count / len(checks)) * 100, 2)
-            avg_latency = round(sum(c["latency_ms"] for c in checks if c["status"] == 1) / max(up_count, 1), 2)
-        else:
-            uptime_percent = None
-            avg_latency = None
+        # Uptime and average latency are aggregated in the same query
+        checks, stats = await _db(
+            db_manager.get_bookmark_checks_range_with_stats, x_tenant_id, bookmark_id, hours
+        )
         
         return {
             "success": True,
             "data": {
                 "checks": checks,
-                "total_checks": len(checks),
-                "uptime_percent": uptime_percent,
-                "avg_latency_ms": avg_latency
+                "total_checks": stats["total_checks"],
+                "uptime_percent": stats["uptime_percent"],
+                "avg_latency_ms": stats["avg_latency_ms"]
             }
         }
     except Exception as e:
@@ -5135,33 +5664,16 @@ async def get_bookmark_history(
 async def get_bookmarks_summary(x_tenant_id: str = Header(default="default")):
     """Get a summary of all bookmarks status"""
     try:
-        bookmarks = db_manager.get_bookmarks(x_tenant_id)
-        
-        total = len(bookmarks)
-        up = 0
-        down = 0
-        unknown = 0
-        
-        for b in bookmarks:
-            if not b.get("active"):
-                continue
-            latest = b.get("latest_check")
-            if latest is None:
-                unknown += 1
-            elif latest.get("status") == 1:
-                up += 1
-            else:
-                down += 1
-        
-        return {
-            "success": True,
-            "data": {
-                "total": total,
-                "up": up,
-                "down": down,
-                "unknown": unknown
-            }
-        }
+        cache = get_response_cache()
+        key = _bookmarks_cache_key("summary", x_tenant_id, None)
+        summary = cache.get(BOOKMARKS_CACHE_NAMESPACE, key)
+        if summary is not None:
+            return {"success": True, "data": summary}
+        
+        # Counted in SQL - only four integers come back
+        summary = await _db(db_manager.get_bookmarks_status_counts, x_tenant_id)
+        cache.set(BOOKMARKS_CACHE_NAMESPACE, key, summary, BOOKMARKS_CACHE_TTL_SECONDS)
+        return {"success": True, "data": summary}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -5216,6 +5728,8 @@ async def create_report_profile(
             scribe_scope_tags=profile.scribe_scope_tags,
             scribe_scope_ids=profile.scribe_scope_ids
         )
+        await invalidate_tags_cache()
+        invalidate_executive_summary_cache()
         return {"success": True, "id": new_profile["id"], "data": new_profile}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -5259,6 +5773,8 @@ async def update_report_profile(
         updated_profile = db_manager.update_report_profile(x_tenant_id, profile_id, **updates)
         if not updated_profile:
             raise HTTPException(status_code=404, detail="Report profile not found")
+        await invalidate_tags_cache()
+        invalidate_executive_summary_cache()
         
         return {"success": True, "data": updated_profile}
     except HTTPException:
@@ -5278,6 +5794,8 @@ async def delete_report_profile(
         deleted = db_manager.delete_report_profile(x_tenant_id, profile_id)
         if not deleted:
             raise HTTPException(status_code=404, detail="Report profile not found")
+        await invalidate_tags_cache()
+        invalidate_executive_summary_cache()
         return {"success": True, "message": "Profile and all stored reports deleted"}
     except HTTPException:
         raise
@@ -5292,12 +5810,11 @@ async def get_profile_stored_reports(
 ):
     """Get all stored reports for a profile from file storage"""
     try:
-        # Verify profile belongs to tenant
-        profile = db_manager.get_report_profile(x_tenant_id, profile_id)
-        if not profile:
+        # Ownership is checked by the same lookup (None = not this tenant's profile)
+        reports = await _db(db_manager.get_profile_reports_if_owned, x_tenant_id, profile_id)
+        if reports is None:
             raise HTTPException(status_code=404, detail="Report profile not found")
         
-        reports = db_manager.get_profile_reports(profile_id)
         return {"success": True, "reports": reports, "count": len(reports)}
     except HTTPException:
         raise
@@ -5313,20 +5830,21 @@ async def get_profile_report_pdf(
 ):
     """Download PDF for a specific report"""
     try:
-        # Verify profile belongs to tenant
-        profile = db_manager.get_report_profile(x_tenant_id, profile_id)
-        if not profile:
+        # Ownership is checked by the same lookup (None = not this tenant's profile)
+        owned = await _db(db_manager.get_profile_report_pdf_if_owned, x_tenant_id, profile_id, report_id)
+        if owned is None:
             raise HTTPException(status_code=404, detail="Report profile not found")
         
-        pdf_content = db_manager.get_profile_report_pdf(profile_id, report_id)
-        if not pdf_content:
+        profile_name, pdf_path = owned
+        if not pdf_path:
             raise HTTPException(status_code=404, detail="PDF not found for this report")
         
-        return Response(
-            content=pdf_content,
+        # Streamed from disk in chunks, never buffered whole in memory
+        return FileResponse(
+            pdf_path,
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename={profile['name']}_{report_id}.pdf"
+                "Content-Disposition": f"attachment; filename={profile_name}_{report_id}.pdf"
             }
         )
     except HTTPException:
@@ -5348,6 +5866,29 @@ async def trigger_profile_reports(user: dict = Depends(require_admin)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Severity spellings agents send (lowercased), folded into the report buckets
+LOG_SEVERITY_CLASSES = {
+    "critical": "critical", "crit": "critical", "emerg": "critical",
+    "emergency": "critical", "alert": "critical",
+    "error": "error", "err": "error",
+    "warning": "warning", "warn": "warning",
+    "info": "info", "information": "info", "notice": "info", "debug": "info"
+}
+
+# Report-friendly names for bookmark check types
+BOOKMARK_TYPE_DISPLAY = {
+    "http": "Web Service",
+    "icmp": "Network Connectivity",
+    "tcp-port": "Service Port"
+}
+
+# Report-friendly names for a bookmark's latest check status (1 = up, 0 = down)
+BOOKMARK_STATUS_DISPLAY = {
+    1: "Service Available",
+    0: "Service Unavailable"
+}
+
+
 @app.post("/api/report-profiles/{profile_id}/generate-stats")
 async def generate_stat_report(
     profile_id: str,
@@ -5378,46 +5919,19 @@ async def generate_stat_report(
         start_date = end_date - timedelta(days=days)
         sla_target = profile.get("sla_target", 99.9)
         
-        # Get scoped bookmarks
-        all_bookmarks = db_manager.get_bookmarks(x_tenant_id)
-        active_bookmarks = [b for b in all_bookmarks if b.get("active", True)]
-        
+        # Get scoped bookmarks and scribes (scope matching runs in SQL; an
+        # empty match falls back to everything, as before)
         scope_ids = profile.get("monitor_scope_ids") or []
         scope_tags = profile.get("monitor_scope_tags") or []
+        active_bookmarks = db_manager.get_bookmarks_in_scope(x_tenant_id, scope_ids, scope_tags)
+        if not active_bookmarks and (scope_ids or scope_tags):
+            active_bookmarks = db_manager.get_bookmarks_in_scope(x_tenant_id)
         
-        if scope_ids or scope_tags:
-            filtered_bookmarks = []
-            for b in active_bookmarks:
-                if b.get("id") in scope_ids:
-                    filtered_bookmarks.append(b)
-                    continue
-                bookmark_tags = b.get("tags") or []
-                if isinstance(bookmark_tags, str):
-                    bookmark_tags = [t.strip() for t in bookmark_tags.split(",") if t.strip()]
-                if any(t in scope_tags for t in bookmark_tags):
-                    filtered_bookmarks.append(b)
-            active_bookmarks = filtered_bookmarks if filtered_bookmarks else active_bookmarks
-        
-        # Get scoped scribes
-        all_agents = db_manager.get_all_agents()
         scribe_scope_ids = profile.get("scribe_scope_ids") or []
         scribe_scope_tags = profile.get("scribe_scope_tags") or []
-        
-        if scribe_scope_ids or scribe_scope_tags:
-            filtered_scribes = []
-            for agent in all_agents:
-                agent_id = agent.get("agent_id")
-                if agent_id in scribe_scope_ids:
-                    filtered_scribes.append(agent)
-                    continue
-                agent_tags = agent.get("tags") or []
-                if isinstance(agent_tags, str):
-                    agent_tags = [t.strip() for t in agent_tags.split(",") if t.strip()]
-                if any(t in scribe_scope_tags for t in agent_tags):
-                    filtered_scribes.append(agent)
-            active_scribes = filtered_scribes if filtered_scribes else all_agents
-        else:
-            active_scribes = all_agents
+        active_scribes = db_manager.get_all_agents(scope_ids=scribe_scope_ids, scope_tags=scribe_scope_tags)
+        if not active_scribes and (scribe_scope_ids or scribe_scope_tags):
+            active_scribes = db_manager.get_all_agents()
         
         # Calculate bookmark stats
         monitors_summary = []
@@ -5425,20 +5939,19 @@ async def generate_stat_report(
         total_monitors_with_data = 0
         total_incidents = 0
         
+        # One grouped query for every bookmark's uptime instead of one per bookmark
+        bookmark_uptimes = db_manager.calculate_bookmarks_uptime_bulk(
+            [b["id"] for b in active_bookmarks], start_date, end_date
+        )
+        
         for bookmark in active_bookmarks:
             bookmark_id = bookmark["id"]
-            uptime_data = db_manager.calculate_bookmark_uptime(bookmark_id, start_date, end_date)
+            uptime_data = bookmark_uptimes.get(bookmark_id) or {"status": "no_data"}
             
-            type_display = {
-                "http": "Web Service",
-                "icmp": "Network Connectivity", 
-                "tcp-port": "Service Port"
-            }.get(bookmark.get("type", "http"), "Service")
+            type_display = BOOKMARK_TYPE_DISPLAY.get(bookmark.get("type", "http"), "Service")
             
             current_status = bookmark.get("last_status")
-            status_display = "Service Available" if current_status == 1 else (
-                "Service Unavailable" if current_status == 0 else "Pending"
-            )
+            status_display = BOOKMARK_STATUS_DISPLAY.get(current_status, "Pending")
             
             uptime_pct = uptime_data.get("uptime_percentage")
             if uptime_pct is not None:
@@ -5461,19 +5974,48 @@ async def generate_stat_report(
         # Calculate scribe stats with log counts
         scribes_summary = []
         
-        # Get log counts per agent for the period
+        # Per-agent log counts and the severity totals come from one scan of
+        # raw_logs for the period, scoped to the report's scribes. With no
+        # scribes (nothing registered) the scan is skipped and the stats stay zero.
+        scoped_agent_ids = [a.get('agent_id') for a in active_scribes if a.get('agent_id')]
         agent_log_counts = {}
+        log_stats = {
+            "total_logs": 0,
+            "critical_events": 0,
+            "error_events": 0,
+            "warning_events": 0,
+            "info_events": 0
+        }
         try:
-            log_counts_result = db_manager.pool.fetchall("""
-                SELECT agent_id, COUNT(*) as log_count
-                FROM raw_logs
-                WHERE created_at >= %s AND created_at <= %s
-                GROUP BY agent_id
-            """, (start_date, end_date))
-            for row in log_counts_result:
-                agent_log_counts[row['agent_id']] = int(row['log_count'])
+            log_count_rows = []
+            if scoped_agent_ids:
+                log_count_rows = db_manager.pool.fetchall("""
+                    SELECT agent_id, lower(severity) as severity, COUNT(*) as total
+                    FROM raw_logs
+                    WHERE created_at >= %s AND created_at <= %s
+                      AND agent_id = ANY(%s)
+                    GROUP BY agent_id, lower(severity)
+                """, (start_date, end_date, scoped_agent_ids))
+            for row in log_count_rows:
+                count = int(row['total'] or 0)
+                agent_log_counts[row['agent_id']] = agent_log_counts.get(row['agent_id'], 0) + count
+                log_stats["total_logs"] += count
+                severity_class = LOG_SEVERITY_CLASSES.get(row['severity'] or "")
+                if severity_class:
+                    log_stats[f"{severity_class}_events"] += count
         except Exception as e:
-            print(f"[DEBUG] Error getting per-agent log counts: {e}")
+            logger.warning("Stat report: error getting log stats: %s", e)
+        
+        try:
+            agent_uptimes = db_manager.calculate_agents_uptime_bulk(
+                [agent.get("agent_id") for agent in active_scribes],
+                start_date=start_date,
+                end_date=end_date,
+                heartbeat_ttl_seconds=120
+            )
+        except Exception as e:
+            logger.warning("Stat report: error calculating scribe uptimes: %s", e)
+            agent_uptimes = {}
         
         for agent in active_scribes:
             agent_id = agent.get("agent_id")
@@ -5488,17 +6030,7 @@ async def generate_stat_report(
             if not agent_os:
                 agent_os = "Unknown"
             
-            try:
-                uptime_data = db_manager.calculate_agent_uptime(
-                    agent_id=agent_id,
-                    start_date=start_date,
-                    end_date=end_date,
-                    heartbeat_ttl_seconds=120
-                )
-                uptime_pct = uptime_data.get("uptime_percentage")
-            except Exception as e:
-                print(f"[DEBUG] Error calculating uptime for {agent_id}: {e}")
-                uptime_pct = None
+            uptime_pct = agent_uptimes.get(agent_id, {}).get("uptime_percentage")
             
             # Determine health status based on online status and uptime
             current_status = agent.get("status", "unknown")
@@ -5532,59 +6064,6 @@ async def generate_stat_report(
             "AT_RISK" if global_uptime and global_uptime >= sla_target - 1 else "BELOW"
         ) if global_uptime else "NO_DATA"
         
-        # Get log statistics (if using postgres with raw_logs table)
-        # Filter by scoped scribes if there are any
-        scoped_agent_ids = [a.get('agent_id') for a in active_scribes if a.get('agent_id')]
-        
-        log_stats = {
-            "total_logs": 0,
-            "critical_events": 0,
-            "error_events": 0,
-            "warning_events": 0,
-            "info_events": 0
-        }
-        try:
-            print(f"[DEBUG] Log query date range: {start_date} to {end_date}")
-            print(f"[DEBUG] Scoped agent_ids: {scoped_agent_ids}")
-            
-            if scoped_agent_ids:
-                # Query logs only for scoped scribes
-                placeholders = ','.join(['%s'] * len(scoped_agent_ids))
-                log_counts = db_manager.pool.fetchone(f"""
-                    SELECT 
-                        COUNT(*) as total,
-                        SUM(CASE WHEN severity IN ('critical', 'crit', 'emerg', 'emergency', 'alert', 'CRITICAL') THEN 1 ELSE 0 END) as critical,
-                        SUM(CASE WHEN severity IN ('error', 'err', 'ERROR') THEN 1 ELSE 0 END) as errors,
-                        SUM(CASE WHEN severity IN ('warning', 'warn', 'WARNING') THEN 1 ELSE 0 END) as warnings,
-                        SUM(CASE WHEN severity IN ('info', 'information', 'INFO', 'notice', 'NOTICE', 'debug', 'DEBUG') THEN 1 ELSE 0 END) as infos
-                    FROM raw_logs
-                    WHERE created_at >= %s AND created_at <= %s
-                    AND agent_id IN ({placeholders})
-                """, (start_date, end_date, *scoped_agent_ids))
-            else:
-                # No scribe scope - count all logs
-                log_counts = db_manager.pool.fetchone("""
-                    SELECT 
-                        COUNT(*) as total,
-                        SUM(CASE WHEN severity IN ('critical', 'crit', 'emerg', 'emergency', 'alert', 'CRITICAL') THEN 1 ELSE 0 END) as critical,
-                        SUM(CASE WHEN severity IN ('error', 'err', 'ERROR') THEN 1 ELSE 0 END) as errors,
-                        SUM(CASE WHEN severity IN ('warning', 'warn', 'WARNING') THEN 1 ELSE 0 END) as warnings,
-                        SUM(CASE WHEN severity IN ('info', 'information', 'INFO', 'notice', 'NOTICE', 'debug', 'DEBUG') THEN 1 ELSE 0 END) as infos
-                    FROM raw_logs
-                    WHERE created_at >= %s AND created_at <= %s
-                """, (start_date, end_date))
-                
-            print(f"[DEBUG] Log counts result: {log_counts}")
-            if log_counts:
-                log_stats["total_logs"] = int(log_counts['total'] or 0)
-                log_stats["critical_events"] = int(log_counts['critical'] or 0)
-                log_stats["error_events"] = int(log_counts['errors'] or 0)
-                log_stats["warning_events"] = int(log_counts['warnings'] or 0)
-                log_stats["info_events"] = int(log_counts['infos'] or 0)
-            print(f"[DEBUG] Final log_stats: {log_stats}")
-        except Exception as e:
-            print(f"[DEBUG] Error getting log stats: {e}")
-        
         # Build report data
         report_data = {
             "profile_id": profile_id,
@@ -5631,6 +6110,21 @@ async def generate_stat_report(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# The executive summary is rebuilt from every check and log in the period, so
+# dashboard polls are served from a short-lived per-worker cache. Profile and
+# bookmark writes clear it; the TTL bounds staleness from new checks/logs.
+EXECUTIVE_SUMMARY_CACHE_NAMESPACE = "executive_summary"
+EXECUTIVE_SUMMARY_CACHE_TTL_SECONDS = 30
+# Bookmark checks and raw logs are read straight from the SQLite database,
+# through the shared WAL-mode connection pool
+EXECUTIVE_SUMMARY_SQLITE_PATH = "./loglibrarian.db"
+
+
+def invalidate_executive_summary_cache():
+    """Drop cached executive summary reports"""
+    get_response_cache().clear(EXECUTIVE_SUMMARY_CACHE_NAMESPACE)
+
+
 @app.get("/api/reports/executive-summary")
 async def get_executive_summary(
     days: int = 30,
@@ -5643,6 +6137,24 @@ async def get_executive_summary(
     Focuses on high-level availability metrics and proof of value.
     Optionally scope to a specific report profile.
     """
+    cache = get_response_cache()
+    key = (x_tenant_id, profile_id, days, sla_target)
+    summary = cache.get(EXECUTIVE_SUMMARY_CACHE_NAMESPACE, key)
+    if summary is None:
+        summary = await build_executive_summary(
+            days=days, sla_target=sla_target, profile_id=profile_id, x_tenant_id=x_tenant_id
+        )
+        cache.set(EXECUTIVE_SUMMARY_CACHE_NAMESPACE, key, summary, EXECUTIVE_SUMMARY_CACHE_TTL_SECONDS)
+    return summary
+
+
+async def build_executive_summary(
+    days: int = 30,
+    sla_target: float = 99.9,
+    profile_id: str = None,
+    x_tenant_id: str = "default"
+) -> dict:
+    """Build the Executive Summary response (uncached)"""
     try:
         from datetime import timedelta
         import sqlite3
@@ -5662,19 +6174,21 @@ async def get_executive_summary(
                 # Use profile's SLA target if set
                 if profile.get("sla_target") is not None:
                     sla_target = profile.get("sla_target")
-                print(f"[DEBUG] Exec summary GET - profile: {profile_name}, sla_target: {sla_target}, scope_tags: {profile.get('monitor_scope_tags')}, scope_ids: {profile.get('monitor_scope_ids')}")
+                logger.debug("Exec summary - profile: %s, sla_target: %s, scope_tags: %s, scope_ids: %s",
+                             profile_name, sla_target, profile.get('monitor_scope_tags'), profile.get('monitor_scope_ids'))
         
         # Get all active bookmarks
         bookmarks = db_manager.get_bookmarks(x_tenant_id)
         active_bookmarks = [b for b in bookmarks if b.get("active", True)]
-        print(f"[DEBUG] Exec summary GET - total bookmarks: {len(bookmarks)}, active: {len(active_bookmarks)}")
-        for b in active_bookmarks[:5]:
-            print(f"[DEBUG]   Bookmark: {b.get('name')}, tags: {b.get('tags')}")
+        logger.debug("Exec summary - total bookmarks: %d, active: %d", len(bookmarks), len(active_bookmarks))
+        if logger.isEnabledFor(logging.DEBUG):
+            for b in active_bookmarks[:5]:
+                logger.debug("  Bookmark: %s, tags: %s", b.get('name'), b.get('tags'))
         
         # Filter by profile scope if specified
         if profile:
-            scope_ids = profile.get("monitor_scope_ids") or []
-            scope_tags = profile.get("monitor_scope_tags") or []
+            scope_ids = frozenset(profile.get("monitor_scope_ids") or ())
+            scope_tags = frozenset(profile.get("monitor_scope_tags") or ())
             
             if scope_ids or scope_tags:
                 filtered_bookmarks = []
@@ -5682,17 +6196,17 @@ async def get_executive_summary(
                     # Check if bookmark ID is in scope
                     if b.get("id") in scope_ids:
                         filtered_bookmarks.append(b)
-                        print(f"[DEBUG]   Matched by ID: {b.get('name')}")
+                        logger.debug("  Matched by ID: %s", b.get('name'))
                         continue
                     # Check if any bookmark tag matches scope tags
                     bookmark_tags = b.get("tags") or []
                     if isinstance(bookmark_tags, str):
                         bookmark_tags = [t.strip() for t in bookmark_tags.split(",") if t.strip()]
-                    if any(t in scope_tags for t in bookmark_tags):
+                    if not scope_tags.isdisjoint(bookmark_tags):
                         filtered_bookmarks.append(b)
-                        print(f"[DEBUG]   Matched by tag: {b.get('name')} has {bookmark_tags}")
+                        logger.debug("  Matched by tag: %s has %s", b.get('name'), bookmark_tags)
                 
-                print(f"[DEBUG] Exec summary GET - filtered: {len(filtered_bookmarks)} bookmarks")
+                logger.debug("Exec summary - filtered: %d bookmarks", len(filtered_bookmarks))
                 active_bookmarks = filtered_bookmarks if filtered_bookmarks else active_bookmarks
         
         # Get and filter scribes (agents) based on profile scope
@@ -5700,10 +6214,10 @@ async def get_executive_summary(
         active_scribes = []
         
         if profile:
-            scribe_scope_ids = profile.get("scribe_scope_ids") or []
-            scribe_scope_tags = profile.get("scribe_scope_tags") or []
+            scribe_scope_ids = frozenset(profile.get("scribe_scope_ids") or ())
+            scribe_scope_tags = frozenset(profile.get("scribe_scope_tags") or ())
             
-            print(f"[DEBUG] Exec summary GET - scribe_scope_tags: {scribe_scope_tags}, scribe_scope_ids: {scribe_scope_ids}")
+            logger.debug("Exec summary - scribe_scope_tags: %s, scribe_scope_ids: %s", scribe_scope_tags, scribe_scope_ids)
             
             if scribe_scope_ids or scribe_scope_tags:
                 for agent in all_agents:
@@ -5711,20 +6225,20 @@ async def get_executive_summary(
                     # Check if agent ID is in scope
                     if agent_id in scribe_scope_ids:
                         active_scribes.append(agent)
-                        print(f"[DEBUG]   Scribe matched by ID: {agent.get('display_name') or agent.get('hostname')}")
+                        logger.debug("  Scribe matched by ID: %s", agent.get('display_name') or agent.get('hostname'))
                         continue
                     # Check if any agent tag matches scope tags
                     agent_tags = agent.get("tags") or []
                     if isinstance(agent_tags, str):
                         agent_tags = [t.strip() for t in agent_tags.split(",") if t.strip()]
-                    if any(t in scribe_scope_tags for t in agent_tags):
+                    if not scribe_scope_tags.isdisjoint(agent_tags):
                         active_scribes.append(agent)
-                        print(f"[DEBUG]   Scribe matched by tag: {agent.get('display_name') or agent.get('hostname')} has {agent_tags}")
+                        logger.debug("  Scribe matched by tag: %s has %s", agent.get('display_name') or agent.get('hostname'), agent_tags)
             else:
                 # No scope specified, include all agents
                 active_scribes = all_agents
             
-            print(f"[DEBUG] Exec summary GET - filtered: {len(active_scribes)} scribes")
+            logger.debug("Exec summary - filtered: %d scribes", len(active_scribes))
         else:
             # No profile, include all agents
             active_scribes = all_agents
@@ -5732,7 +6246,7 @@ async def get_executive_summary(
         # Query critical events per agent from raw_logs
         scribe_critical_events = {}
         try:
-            conn_logs = sqlite3.connect("./loglibrarian.db")
+            conn_logs = get_sqlite_pool(EXECUTIVE_SUMMARY_SQLITE_PATH).acquire()
             conn_logs.row_factory = sqlite3.Row
             cursor_logs = conn_logs.cursor()
             
@@ -5749,7 +6263,20 @@ async def get_executive_summary(
             
             conn_logs.close()
         except Exception as e:
-            print(f"[DEBUG] Error querying scribe critical events: {e}")
+            logger.warning("Exec summary: error querying scribe critical events: %s", e)
+        
+        # Calculate historical uptime based on heartbeat records (Smart Start logic),
+        # for all scribes in one bulk call
+        try:
+            agent_uptimes = db_manager.calculate_agents_uptime_bulk(
+                [agent.get("agent_id") for agent in active_scribes],
+                start_date=start_date,
+                end_date=end_date,
+                heartbeat_ttl_seconds=120  # 2x the 60s heartbeat interval
+            )
+        except Exception as e:
+            logger.warning("Exec summary: error calculating scribe uptimes: %s", e)
+            agent_uptimes = {}
         
         # Build scribes summary with historical uptime
         scribes_summary = []
@@ -5759,14 +6286,8 @@ async def get_executive_summary(
             status = agent.get("status", "unknown")
             last_seen = agent.get("last_seen")
             
-            # Calculate historical uptime based on heartbeat records (Smart Start logic)
-            try:
-                uptime_data = db_manager.calculate_agent_uptime(
-                    agent_id=agent_id,
-                    start_date=start_date,
-                    end_date=end_date,
-                    heartbeat_ttl_seconds=120  # 2x the 60s heartbeat interval
-                )
+            uptime_data = agent_uptimes.get(agent_id)
+            if uptime_data is not None:
                 uptime_pct = uptime_data.get("uptime_percentage")
                 uptime_status = uptime_data.get("status", "unknown")
                 
@@ -5774,8 +6295,7 @@ async def get_executive_summary(
                 if uptime_pct is None:
                     uptime_pct = None  # Will display as "N/A" in frontend
                     uptime_status = "not_applicable"
-            except Exception as e:
-                print(f"[DEBUG] Error calculating uptime for {agent_id}: {e}")
+            else:
                 # Fallback to live status-based uptime
                 uptime_pct = 100.0 if status == "online" else 0.0
                 uptime_status = "fallback"
@@ -5796,7 +6316,7 @@ async def get_executive_summary(
                 "critical_events": scribe_critical_events.get(agent_id, 0)
             })
         
-        print(f"[DEBUG] Exec summary GET - scribes_summary count: {len(scribes_summary)}")
+        logger.debug("Exec summary - scribes_summary count: %d", len(scribes_summary))
         
         if not active_bookmarks and not active_scribes:
             return {
@@ -5823,7 +6343,7 @@ async def get_executive_summary(
             }
         
         # Calculate uptime metrics from bookmark checks
-        conn = sqlite3.connect("./loglibrarian.db")
+        conn = get_sqlite_pool(EXECUTIVE_SUMMARY_SQLITE_PATH).acquire()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -5845,8 +6365,10 @@ async def get_executive_summary(
         
         try:
             if table_exists:
+                # Each monitor's period starts at the report start, or at its
+                # creation if it was created later
+                bookmark_starts = []
                 for bookmark in active_bookmarks:
-                    bookmark_id = bookmark["id"]
                     bookmark_created = bookmark.get("created_at")
                     
                     # Parse bookmark creation date
@@ -5862,33 +6384,62 @@ async def get_executive_summary(
                                 bookmark_start = bc_dt
                         except:
                             pass
+                    bookmark_starts.append([bookmark["id"], bookmark_start.isoformat()])
+                
+                # Checks in every monitor's period (strictly within date range).
+                # The (id, start) pairs are bound as one JSON parameter
+                checks_in_period_sql = """
+                    FROM bookmark_checks bc
+                    JOIN json_each(?) j
+                      ON bc.bookmark_id = json_extract(j.value, '$[0]')
+                     AND bc.created_at >= json_extract(j.value, '$[1]')
+                    WHERE bc.created_at <= ?
+                """
+                checks_in_period_params = (json.dumps(bookmark_starts), end_date.isoformat())
+                
+                # Per-monitor, per-day counts and successful latencies
+                cursor.execute(f"""
+                    SELECT bc.bookmark_id,
+                           CAST(julianday(bc.created_at) - julianday(?) AS INTEGER) as day_idx,
+                           COUNT(*) as total,
+                           SUM(CASE WHEN bc.status = 1 THEN 1 ELSE 0 END) as up_count,
+                           SUM(CASE WHEN bc.status = 1 THEN COALESCE(bc.latency_ms, 0) ELSE 0 END) as up_latency_sum,
+                           SUM(CASE WHEN bc.status = 1 AND bc.latency_ms THEN bc.latency_ms END) as day_latency_sum,
+                           COUNT(CASE WHEN bc.status = 1 AND bc.latency_ms THEN 1 END) as day_latency_count
+                    {checks_in_period_sql}
+                    GROUP BY bc.bookmark_id, day_idx
+                """, (start_date.isoformat(), *checks_in_period_params))
+                day_stats_by_bookmark = defaultdict(list)
+                for row in cursor.fetchall():
+                    day_stats_by_bookmark[row["bookmark_id"]].append(row)
+                
+                # Status changes only (LAG in SQLite): incidents and MTTR need the
+                # first check and every up/down transition, not every check
+                cursor.execute(f"""
+                    SELECT bookmark_id, status, created_at FROM (
+                        SELECT bc.bookmark_id, bc.status, bc.created_at,
+                               LAG(bc.status) OVER (PARTITION BY bc.bookmark_id ORDER BY bc.created_at) as prev_status
+                        {checks_in_period_sql}
+                    )
+                    WHERE prev_status IS NULL OR status != prev_status
+                    ORDER BY bookmark_id, created_at ASC
+                """, checks_in_period_params)
+                transitions_by_bookmark = {
+                    bookmark_id: list(group)
+                    for bookmark_id, group in itertools.groupby(cursor.fetchall(), key=lambda c: c["bookmark_id"])
+                }
+                
+                for bookmark in active_bookmarks:
+                    bookmark_id = bookmark["id"]
+                    day_stats = day_stats_by_bookmark.get(bookmark_id)
                     
-                    # Get all checks in the period (strictly within date range)
-                    cursor.execute("""
-                        SELECT status, created_at, latency_ms, message
-                        FROM bookmark_checks 
-                        WHERE bookmark_id = ? AND created_at >= ? AND created_at <= ?
-                        ORDER BY created_at ASC
-                    """, (bookmark_id, bookmark_start.isoformat(), end_date.isoformat()))
-                    
-                    checks = cursor.fetchall()
-                    
-                    if not checks:
+                    if not day_stats:
                         # No check data yet - new monitors start at 100% uptime
                         # A new deployment with no data is considered "up"
-                        type_display = {
-                            "http": "Web Service",
-                            "icmp": "Network Connectivity", 
-                            "tcp-port": "Service Port"
-                        }.get(bookmark.get("type", "http"), "Service")
+                        type_display = BOOKMARK_TYPE_DISPLAY.get(bookmark.get("type", "http"), "Service")
                         
                         current_status = bookmark.get("last_status")
-                        if current_status == 1:
-                            status_display = "Service Available"
-                        elif current_status == 0:
-                            status_display = "Service Unavailable"
-                        else:
-                            status_display = "Pending Verification"
+                        status_display = BOOKMARK_STATUS_DISPLAY.get(current_status, "Pending Verification")
                         
                         check_interval = bookmark.get("check_interval", 60)  # default 60 seconds
                         
@@ -5907,10 +6458,10 @@ async def get_executive_summary(
                         })
                         continue
                     
-                    monitor_total = len(checks)
-                    monitor_up = sum(1 for c in checks if c["status"] == 1)
+                    monitor_total = sum(d["total"] for d in day_stats)
+                    monitor_up = sum(d["up_count"] for d in day_stats)
                     monitor_uptime = (monitor_up / monitor_total * 100) if monitor_total > 0 else 0
-                    avg_latency = sum(c["latency_ms"] or 0 for c in checks if c["status"] == 1) / max(monitor_up, 1)
+                    avg_latency = sum(d["up_latency_sum"] for d in day_stats) / max(monitor_up, 1)
                     
                     total_checks += monitor_total
                     total_up_checks += monitor_up
@@ -5919,7 +6470,7 @@ async def get_executive_summary(
                     prev_status = 1
                     monitor_incidents = 0
                     incident_start_time = None
-                    for check in checks:
+                    for check in transitions_by_bookmark.get(bookmark_id, ()):
                         check_time_str = check["created_at"]
                         try:
                             if 'T' in str(check_time_str):
@@ -5943,36 +6494,19 @@ async def get_executive_summary(
                     
                     incident_count += monitor_incidents
                     
-                    # Build latency history for sparkline (daily averages)
-                    latency_history = []
-                    for day_offset in range(days):
-                        day_start = start_date + timedelta(days=day_offset)
-                        day_end = day_start + timedelta(days=1)
-                        day_checks = [c for c in checks if day_start.isoformat() <= c["created_at"] < day_end.isoformat()]
-                        if day_checks:
-                            day_latencies = [c["latency_ms"] for c in day_checks if c["status"] == 1 and c["latency_ms"]]
-                            if day_latencies:
-                                latency_history.append(round(sum(day_latencies) / len(day_latencies), 1))
-                            else:
-                                latency_history.append(None)  # No successful checks
-                        else:
-                            latency_history.append(None)  # No checks this day
+                    # Build latency history for sparkline (daily averages, None = no successful checks)
+                    day_latency = {
+                        d["day_idx"]: round(d["day_latency_sum"] / d["day_latency_count"], 1)
+                        for d in day_stats if d["day_latency_count"]
+                    }
+                    latency_history = [day_latency.get(day_offset) for day_offset in range(days)]
                     
                     # Executive-friendly type names
-                    type_display = {
-                        "http": "Web Service",
-                        "icmp": "Network Connectivity", 
-                        "tcp-port": "Service Port"
-                    }.get(bookmark.get("type", "http"), "Service")
+                    type_display = BOOKMARK_TYPE_DISPLAY.get(bookmark.get("type", "http"), "Service")
                     
                     # Executive-friendly status
                     current_status = bookmark.get("last_status")
-                    if current_status == 1:
-                        status_display = "Service Available"
-                    elif current_status == 0:
-                        status_display = "Service Unavailable"
-                    else:
-                        status_display = "Pending Verification"
+                    status_display = BOOKMARK_STATUS_DISPLAY.get(current_status, "Pending Verification")
                     
                     check_interval = bookmark.get("check_interval", 60)  # default 60 seconds
                     monitors_summary.append({
@@ -5990,19 +6524,10 @@ async def get_executive_summary(
             else:
                 # No check history yet - build report from current bookmark status
                 for bookmark in active_bookmarks:
-                    type_display = {
-                        "http": "Web Service",
-                        "icmp": "Network Connectivity", 
-                        "tcp-port": "Service Port"
-                    }.get(bookmark.get("type", "http"), "Service")
+                    type_display = BOOKMARK_TYPE_DISPLAY.get(bookmark.get("type", "http"), "Service")
                     
                     current_status = bookmark.get("last_status")
-                    if current_status == 1:
-                        status_display = "Service Available"
-                    elif current_status == 0:
-                        status_display = "Service Unavailable"
-                    else:
-                        status_display = "Pending Verification"
+                    status_display = BOOKMARK_STATUS_DISPLAY.get(current_status, "Pending Verification")
                     
                     check_interval = bookmark.get("check_interval", 60)  # default 60 seconds
                     monitors_summary.append({
@@ -6018,38 +6543,41 @@ async def get_executive_summary(
                         "latency_history": []  # No history yet
                     })
             
-            # Build uptime segments for visualization (daily buckets)
+            # Build uptime segments for visualization (daily buckets, read from
+            # the bookmark_daily_stats rollup by calendar day). The last segment
+            # is today, so checks recorded since midnight UTC are included.
+            first_segment_day = end_date.date() - timedelta(days=days - 1)
             if table_exists:
+                cursor.execute("""
+                    SELECT day, SUM(total) as total, SUM(up_count) as up_count
+                    FROM bookmark_daily_stats
+                    WHERE day >= ? AND day <= ?
+                    GROUP BY day
+                """, (first_segment_day.isoformat(), end_date.date().isoformat()))
+                day_counts = {row["day"]: row for row in cursor.fetchall()}
+                
                 for day_offset in range(days):
-                    day_start = start_date + timedelta(days=day_offset)
-                    day_end = day_start + timedelta(days=1)
-                    
-                    cursor.execute("""
-                        SELECT COUNT(*) as total, SUM(CASE WHEN status = 1 THEN 1 ELSE 0 END) as up_count
-                        FROM bookmark_checks
-                        WHERE created_at >= ? AND created_at < ?
-                    """, (day_start.isoformat(), day_end.isoformat()))
+                    day = (first_segment_day + timedelta(days=day_offset)).isoformat()
                     
-                    row = cursor.fetchone()
+                    row = day_counts.get(day)
                     if row and row["total"] > 0:
                         day_uptime = (row["up_count"] / row["total"]) * 100
                         uptime_segments.append({
-                            "date": day_start.strftime("%Y-%m-%d"),
+                            "date": day,
                             "uptime_percent": round(day_uptime, 1),
                             "status": "up" if day_uptime >= 99 else ("degraded" if day_uptime >= 90 else "down")
                         })
                     else:
                         uptime_segments.append({
-                            "date": day_start.strftime("%Y-%m-%d"),
+                            "date": day,
                             "uptime_percent": 100,
                             "status": "no_data"
                         })
             else:
                 # No history - generate placeholder segments
                 for day_offset in range(days):
-                    day_start = start_date + timedelta(days=day_offset)
                     uptime_segments.append({
-                        "date": day_start.strftime("%Y-%m-%d"),
+                        "date": (first_segment_day + timedelta(days=day_offset)).isoformat(),
                         "uptime_percent": 100,
                         "status": "no_data"
                     })
@@ -6066,13 +6594,26 @@ async def get_executive_summary(
             }
             
             try:
-                # Total log count
+                # Total count, top sources and severity breakdown from one scan
                 cursor.execute("""
-                    SELECT COUNT(*) as count FROM raw_logs
+                    SELECT lower(severity) as severity, source, COUNT(*) as count 
+                    FROM raw_logs
                     WHERE created_at >= ?
+                    GROUP BY lower(severity), source
                 """, (start_date.isoformat(),))
-                log_count_row = cursor.fetchone()
-                logs_analyzed = log_count_row["count"] if log_count_row else 0
+                source_counts = Counter()
+                for row in cursor.fetchall():
+                    logs_analyzed += row["count"]
+                    source_counts[row["source"] or "Unknown"] += row["count"]
+                    severity_class = LOG_SEVERITY_CLASSES.get(row["severity"] or "")
+                    if severity_class in ("critical", "error", "warning"):
+                        log_analysis[f"{severity_class}_events"] += row["count"]
+                
+                # Top log sources (by agent/source)
+                log_analysis["top_sources"] = [
+                    {"name": source, "count": count}
+                    for source, count in source_counts.most_common(5)
+                ]
                 
                 # Estimate total volume (assuming ~500 bytes per log entry average)
                 estimated_bytes = logs_analyzed * 500
@@ -6085,37 +6626,6 @@ async def get_executive_summary(
                 else:
                     log_analysis["total_volume_display"] = f"{estimated_bytes} bytes"
                 log_analysis["total_volume_bytes"] = estimated_bytes
-                
-                # Top log sources (by agent/source)
-                cursor.execute("""
-                    SELECT source, COUNT(*) as count 
-                    FROM raw_logs
-                    WHERE created_at >= ?
-                    GROUP BY source
-                    ORDER BY count DESC
-                    LIMIT 5
-                """, (start_date.isoformat(),))
-                top_sources = cursor.fetchall()
-                log_analysis["top_sources"] = [
-                    {"name": row["source"] or "Unknown", "count": row["count"]} 
-                    for row in top_sources
-                ]
-                
-                # Severity breakdown
-                cursor.execute("""
-                    SELECT severity, COUNT(*) as count 
-                    FROM raw_logs
-                    WHERE created_at >= ?
-                    GROUP BY severity
-                """, (start_date.isoformat(),))
-                for row in cursor.fetchall():
-                    sev = (row["severity"] or "").lower()
-                    if sev in ("critical", "crit", "emerg", "emergency", "alert"):
-                        log_analysis["critical_events"] += row["count"]
-                    elif sev in ("error", "err"):
-                        log_analysis["error_events"] += row["count"]
-                    elif sev in ("warning", "warn"):
-                        log_analysis["warning_events"] += row["count"]
             except:
                 pass
             
@@ -6131,23 +6641,18 @@ async def get_executive_summary(
         
         # Calculate global uptime - COMBINED from both Bookmarks AND Scribes
         # This provides a true "Global Availability" score across all monitored assets
-        all_uptime_values = []
-        
-        # Add bookmark uptime values (exclude N/A)
-        for monitor in monitors_summary:
-            uptime = monitor.get("uptime_percent")
+        # Single pass over both lists (N/A uptimes are None and skipped)
+        uptime_sum = 0.0
+        uptime_count = 0
+        for entry in itertools.chain(monitors_summary, scribes_summary):
+            uptime = entry.get("uptime_percent")
             if uptime is not None:
-                all_uptime_values.append(uptime)
-        
-        # Add scribe uptime values (exclude N/A - None values)
-        for scribe in scribes_summary:
-            uptime = scribe.get("uptime_percent")
-            if uptime is not None:
-                all_uptime_values.append(uptime)
+                uptime_sum += uptime
+                uptime_count += 1
         
         # Calculate global uptime as average of ALL valid uptime values
-        if all_uptime_values:
-            global_uptime = sum(all_uptime_values) / len(all_uptime_values)
+        if uptime_count:
+            global_uptime = uptime_sum / uptime_count
         elif total_checks > 0:
             # Fallback to bookmark-only calculation if no individual uptimes available
             global_uptime = (total_up_checks / total_checks * 100)
@@ -6216,39 +6721,41 @@ async def get_executive_summary(
             
             # Get previous period uptime for bookmarks
             prev_uptime_values = []
-            conn_prev = sqlite3.connect("./loglibrarian.db")
+            conn_prev = get_sqlite_pool(EXECUTIVE_SUMMARY_SQLITE_PATH).acquire()
             conn_prev.row_factory = sqlite3.Row
             cursor_prev = conn_prev.cursor()
             
             if table_exists:
-                for bookmark in active_bookmarks:
-                    bookmark_id = bookmark["id"]
-                    cursor_prev.execute("""
-                        SELECT status FROM bookmark_checks 
-                        WHERE bookmark_id = ? AND created_at >= ? AND created_at < ?
-                    """, (bookmark_id, prev_start_date.isoformat(), prev_end_date.isoformat()))
-                    prev_checks = cursor_prev.fetchall()
-                    if prev_checks:
-                        prev_up = sum(1 for c in prev_checks if c["status"] == 1)
-                        prev_uptime = (prev_up / len(prev_checks)) * 100
-                        prev_uptime_values.append(prev_uptime)
+                # Whole days from the daily rollup, one grouped query for all monitors:
+                # the `days` calendar days before the current period's first segment day
+                prev_end_day = end_date.date() - timedelta(days=days - 1)
+                prev_start_day = prev_end_day - timedelta(days=days)
+                cursor_prev.execute("""
+                    SELECT bookmark_id, SUM(total) as total, SUM(up_count) as up_count
+                    FROM bookmark_daily_stats
+                    WHERE bookmark_id IN (SELECT value FROM json_each(?))
+                      AND day >= ? AND day < ?
+                    GROUP BY bookmark_id
+                """, (json.dumps([b["id"] for b in active_bookmarks]),
+                      prev_start_day.isoformat(), prev_end_day.isoformat()))
+                for row in cursor_prev.fetchall():
+                    if row["total"]:
+                        prev_uptime_values.append((row["up_count"] / row["total"]) * 100)
             
             # Get previous period uptime for scribes
-            for scribe in scribes_summary:
-                agent_id = scribe.get("agent_id")
-                if agent_id:
-                    try:
-                        prev_uptime_data = db_manager.calculate_agent_uptime(
-                            agent_id=agent_id,
-                            start_date=prev_start_date,
-                            end_date=prev_end_date,
-                            heartbeat_ttl_seconds=120
-                        )
-                        prev_uptime_pct = prev_uptime_data.get("uptime_percentage")
-                        if prev_uptime_pct is not None:
-                            prev_uptime_values.append(prev_uptime_pct)
-                    except:
-                        pass
+            try:
+                prev_agent_uptimes = db_manager.calculate_agents_uptime_bulk(
+                    [scribe["agent_id"] for scribe in scribes_summary if scribe.get("agent_id")],
+                    start_date=prev_start_date,
+                    end_date=prev_end_date,
+                    heartbeat_ttl_seconds=120
+                )
+                for prev_uptime_data in prev_agent_uptimes.values():
+                    prev_uptime_pct = prev_uptime_data.get("uptime_percentage")
+                    if prev_uptime_pct is not None:
+                        prev_uptime_values.append(prev_uptime_pct)
+            except:
+                pass
             
             conn_prev.close()
             
@@ -6256,7 +6763,7 @@ async def get_executive_summary(
                 prev_global_uptime = sum(prev_uptime_values) / len(prev_uptime_values)
                 trend = round(global_uptime - prev_global_uptime, 2)
         except Exception as e:
-            print(f"[DEBUG] Error calculating trend: {e}")
+            logger.warning("Exec summary: error calculating trend: %s", e)
         
         # Strategic recommendations
         strategic_recommendations = []
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from typing import Any, List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -227,8 +227,19 @@ class HeartbeatPayload(BaseModel):
     system_info: Optional[SystemInfo] = Field(default=None, description="Comprehensive system hardware info")
     auth_token: Optional[str] = Field(default=None, description="Authentication token for agent verification")
 
-    class Config:
-        json_schema_extra = {
+    @model_validator(mode="before")
+    @classmethod
+    def _canonicalize_api_key(cls, data: Any) -> Any:
+        """Older scribes send the instance key as `api_key`; accept it as `auth_token`"""
+        if isinstance(data, dict) and not data.get("auth_token") and data.get("api_key"):
+            data = {**data, "auth_token": data["api_key"]}
+        return data
+
+    model_config = ConfigDict(
+        extra="ignore",
+        frozen=True,
+        populate_by_name=True,
+        json_schema_extra={
             "example": {
                 "agent_id": "web-server-01-1234567890",
                 "hostname": "web-server-01",
@@ -248,4 +259,5 @@ class HeartbeatPayload(BaseModel):
                 "last_seen_at": "2025-12-25T10:00:10Z"
             }
         }
+    )
 
@@ -2,6 +2,8 @@ import asyncio
 import json
 import logging
 import datetime
+import os
+from collections import OrderedDict
 from typing import List, Dict, Optional, Any
 
 # Try to import apprise, but don't fail if not installed (fallback gracefully)
@@ -17,6 +19,49 @@ from db_factory import get_database
 
 logger = logging.getLogger("librarian.notifications")
 
+# Apprise objects are reused per URL: add() parses the URL and loads its plugin
+APPRISE_CACHE_SIZE = int(os.getenv("APPRISE_CACHE_SIZE", "64"))
+# Max notifications in flight at once when fanning out to several channels
+NOTIFY_CONCURRENCY = int(os.getenv("NOTIFY_CONCURRENCY", "16"))
+_apprise_by_url: "OrderedDict[str, Any]" = OrderedDict()
+
+
+def get_apprise_for_url(url: str):
+    """Get a cached Apprise instance targeting a single URL (None if unavailable or invalid)"""
+    if not APPRISE_AVAILABLE:
+        return None
+    
+    ap = _apprise_by_url.get(url)
+    if ap is not None:
+        _apprise_by_url.move_to_end(url)
+        return ap
+    
+    ap = apprise.Apprise()
+    if not ap.add(url):
+        return None
+    _apprise_by_url[url] = ap
+    if len(_apprise_by_url) > APPRISE_CACHE_SIZE:
+        _apprise_by_url.popitem(last=False)
+    return ap
+
+
+async def notify_urls(urls: List[str], title: str, body: str,
+                      concurrency: int = NOTIFY_CONCURRENCY) -> List[Any]:
+    """
+    Send one notification to each URL concurrently.
+    
+    Returns one result per URL, in order: True/False from async_notify, or
+    the exception raised. Invalid URLs yield False.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def send(url: str) -> bool:
+        async with semaphore:
+            ap = get_apprise_for_url(url)
+            return ap is not None and await ap.async_notify(title=title, body=body)
+    
+    return await asyncio.gather(*(send(url) for url in urls), return_exceptions=True)
+
 
 class NotificationManager:
     """
@@ -0,0 +1,74 @@
+"""
+Raw Log Batch Parser
+
+Splits an agent's raw log upload (`{"logs": [...]}`) into fixed-size
+chunks so the ingest endpoint can queue or store each chunk as it is
+parsed, instead of materializing every log entry of a large batch at once.
+
+Features:
+- Incremental parsing via the optional `ijson` package (yajl2_c backend
+  when available); only one chunk of log dicts is alive at a time
+- Falls back to a single orjson parse when ijson is not installed
+- Parse errors surface as LogParseError before the first chunk is yielded:
+  with ijson the whole body is syntax-checked in one event-only pass first
+  (no Python objects built), so a malformed upload stores nothing and can
+  be retried safely
+
+Configuration:
+- RAW_LOG_INGEST_CHUNK_SIZE: Log entries per chunk (default: 500)
+"""
+
+import io
+import itertools
+import os
+from typing import Iterator, List
+
+import orjson
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+    _STREAM_ERRORS = (ijson.JSONError,)
+except ImportError:
+    IJSON_AVAILABLE = False
+    _STREAM_ERRORS = ()
+
+
+# Configuration
+RAW_LOG_INGEST_CHUNK_SIZE = int(os.getenv("RAW_LOG_INGEST_CHUNK_SIZE", "500"))
+
+
+class LogParseError(ValueError):
+    """Raised when a raw log upload is not valid JSON"""
+
+
+def iter_log_chunks(body: bytes, chunk_size: int = RAW_LOG_INGEST_CHUNK_SIZE) -> Iterator[List[dict]]:
+    """
+    Yield the entries of body's top-level "logs" array in lists of up to chunk_size.
+
+    Raises:
+        LogParseError: if the body is not valid JSON
+    """
+    if IJSON_AVAILABLE:
+        try:
+            for _ in ijson.basic_parse(io.BytesIO(body)):
+                pass
+        except _STREAM_ERRORS as e:
+            raise LogParseError(str(e)) from e
+        # use_float: plain floats like json.loads, not Decimal
+        entries = ijson.items(io.BytesIO(body), "logs.item", use_float=True)
+    else:
+        try:
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError as e:
+            raise LogParseError(str(e)) from e
+        entries = iter((data.get("logs") or []) if isinstance(data, dict) else [])
+
+    while True:
+        try:
+            chunk = list(itertools.islice(entries, chunk_size))
+        except _STREAM_ERRORS as e:
+            raise LogParseError(str(e)) from e
+        if not chunk:
+            return
+        yield chunk
@@ -1,13 +1,16 @@
 """
 Redis Queue Manager Module
 
-Provides Redis-based message queue for buffering agent metrics between
-WebSocket ingestion and database storage. Enables handling burst reconnections
-and decouples ingestion from storage.
+Provides Redis-based message queue for buffering agent metrics (and raw
+log batches, on a separate stream) between ingestion and database storage. Enables handling burst
+reconnections and decouples ingestion from storage.
 
 Features:
 - Optional Redis dependency (graceful fallback to direct writes)
-- Publish metrics to Redis stream
+- Publish metrics and raw log batches to Redis streams
+- Raw log batches get their own stream and consumer, never trimmed by MAXLEN
+  (consumed entries are deleted instead); when its backlog is full, publish_logs
+  declines so the caller writes the batch directly
 - Background consumer workers for batch database writes
 - Queue depth and consumer lag metrics
 - Health check support
@@ -20,6 +23,12 @@ Configuration:
 - REDIS_CONSUMER_GROUP: Consumer group name (default: librarian_consumers)
 - REDIS_CONSUMER_BATCH_SIZE: Batch size for consuming (default: 100)
 - REDIS_MAX_STREAM_LENGTH: Max stream length before trimming (default: 100000)
+- REDIS_PUBLISH_FLUSH_MS: Metric publishes are collected for up to this long
+  and sent as one pipelined round trip; 0 publishes each one immediately (default: 100)
+- REDIS_PUBLISH_BATCH_SIZE: Pending metric publishes that trigger an early flush (default: 500)
+- REDIS_LOG_STREAM_NAME: Name of the raw log batch stream (default: raw_logs_stream)
+- REDIS_LOG_STREAM_MAX_BACKLOG: Unconsumed log batches above which new batches
+  are written directly instead of queued (default: 1000)
 """
 
 import asyncio
@@ -30,6 +39,9 @@ from typing import Optional, Dict, Any, List, Callable
 from dataclasses import dataclass, field
 from datetime import datetime
 import traceback
+from collections import deque
+
+import orjson
 
 # Configuration from environment
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
@@ -40,6 +52,32 @@ REDIS_CONSUMER_NAME = os.getenv("REDIS_CONSUMER_NAME", f"consumer_{os.getpid()}"
 REDIS_CONSUMER_BATCH_SIZE = int(os.getenv("REDIS_CONSUMER_BATCH_SIZE", "100"))
 REDIS_MAX_STREAM_LENGTH = int(os.getenv("REDIS_MAX_STREAM_LENGTH", "100000"))
 REDIS_CONSUMER_TIMEOUT_MS = int(os.getenv("REDIS_CONSUMER_TIMEOUT_MS", "1000"))
+REDIS_PUBLISH_FLUSH_MS = int(os.getenv("REDIS_PUBLISH_FLUSH_MS", "100"))
+REDIS_PUBLISH_BATCH_SIZE = int(os.getenv("REDIS_PUBLISH_BATCH_SIZE", "500"))
+REDIS_LOG_STREAM_NAME = os.getenv("REDIS_LOG_STREAM_NAME", "raw_logs_stream")
+REDIS_LOG_STREAM_MAX_BACKLOG = int(os.getenv("REDIS_LOG_STREAM_MAX_BACKLOG", "1000"))
+
+
+def pack_metrics(metrics: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Column-oriented encoding of a metric batch: field names once, then one
+    list of values per field, instead of repeating every key per metric.
+    Returns None if the metrics don't all share the same fields.
+    """
+    columns = metrics[0].keys()
+    if any(metric.keys() != columns for metric in metrics):
+        return None
+    return orjson.dumps({
+        "columns": list(columns),
+        "values": [[metric[column] for metric in metrics] for column in columns]
+    }).decode()
+
+
+def unpack_metrics(packed: str) -> List[Dict[str, Any]]:
+    """Inverse of pack_metrics"""
+    batch = orjson.loads(packed)
+    columns = batch["columns"]
+    return [dict(zip(columns, row)) for row in zip(*batch["values"])]
 
 
 @dataclass
@@ -135,7 +173,9 @@ class RedisQueueManager:
         batch_size: int = REDIS_CONSUMER_BATCH_SIZE,
         max_stream_length: int = REDIS_MAX_STREAM_LENGTH,
         metrics_buffer_callback: Callable = None,
-        fallback_callback: Callable = None
+        fallback_callback: Callable = None,
+        logs_callback: Callable = None,
+        log_stream_name: str = REDIS_LOG_STREAM_NAME
     ):
         """
         Initialize the Redis queue manager.
@@ -149,6 +189,8 @@ class RedisQueueManager:
             max_stream_length: Max stream length before auto-trimming
             metrics_buffer_callback: Async callback for batch database writes
             fallback_callback: Callback for direct writes when Redis unavailable
+            logs_callback: Async callback that stores a consumed raw log batch
+            log_stream_name: Name of the Redis stream for raw log batches
         """
         self.redis_url = redis_url
         self.stream_name = stream_name
@@ -158,6 +200,8 @@ class RedisQueueManager:
         self.max_stream_length = max_stream_length
         self.metrics_buffer_callback = metrics_buffer_callback
         self.fallback_callback = fallback_callback
+        self.logs_callback = logs_callback
+        self.log_stream_name = log_stream_name
         
         # Redis connection
         self._redis: Optional[Any] = None
@@ -167,6 +211,13 @@ class RedisQueueManager:
         # Control flags
         self._running = False
         self._consumer_task: Optional[asyncio.Task] = None
+        self._log_consumer_task: Optional[asyncio.Task] = None
+        self._publisher_task: Optional[asyncio.Task] = None
+        
+        # Metric publishes waiting for the next pipelined flush:
+        # (agent_id, metrics, load_avg, stream message)
+        self._pending_publishes: deque = deque()
+        self._flush_event = asyncio.Event()
         
         # Statistics
         self.stats = RedisQueueStats()
@@ -213,19 +264,20 @@ class RedisQueueManager:
             # Test connection
             await self._redis.ping()
             
-            # Create consumer group if it doesn't exist
-            try:
-                await self._redis.xgroup_create(
-                    self.stream_name,
-                    self.consumer_group,
-                    id="0",
-                    mkstream=True
-                )
-                print(f"✓ Created Redis consumer group: {self.consumer_group}")
-            except Exception as e:
-                # Group may already exist, which is fine
-                if "BUSYGROUP" not in str(e):
-                    raise
+            # Create consumer groups if they don't exist
+            for stream_name in (self.stream_name, self.log_stream_name):
+                try:
+                    await self._redis.xgroup_create(
+                        stream_name,
+                        self.consumer_group,
+                        id="0",
+                        mkstream=True
+                    )
+                    print(f"✓ Created Redis consumer group: {self.consumer_group} ({stream_name})")
+                except Exception as e:
+                    # Group may already exist, which is fine
+                    if "BUSYGROUP" not in str(e):
+                        raise
             
             self._connected = True
             self._enabled = True
@@ -253,19 +305,35 @@ class RedisQueueManager:
         
         self._running = True
         self._consumer_task = asyncio.create_task(self._consumer_worker())
+        if self.logs_callback:
+            self._log_consumer_task = asyncio.create_task(self._log_consumer_worker())
         print(f"✓ Redis consumer worker started: {self.consumer_name}")
+        if REDIS_PUBLISH_FLUSH_MS > 0:
+            self._publisher_task = asyncio.create_task(self._publisher_worker())
     
     async def stop(self):
         """Stop the consumer worker and close Redis connection"""
         self._running = False
         
-        # Wait for consumer task to finish
-        if self._consumer_task:
+        # Wake the publisher so it exits after a final flush (cancelled only if
+        # that takes too long), then send anything queued after it stopped
+        if self._publisher_task:
+            self._flush_event.set()
             try:
-                self._consumer_task.cancel()
-                await asyncio.wait_for(self._consumer_task, timeout=5.0)
+                await asyncio.wait_for(self._publisher_task, timeout=5.0)
             except (asyncio.CancelledError, asyncio.TimeoutError):
                 pass
+            self._publisher_task = None
+            await self._flush_publishes()
+        
+        # Wait for consumer tasks to finish
+        for task in (self._consumer_task, self._log_consumer_task):
+            if task:
+                try:
+                    task.cancel()
+                    await asyncio.wait_for(task, timeout=5.0)
+                except (asyncio.CancelledError, asyncio.TimeoutError):
+                    pass
         
         # Close Redis connection
         if self._redis:
@@ -299,8 +367,13 @@ class RedisQueueManager:
             public_ip: Agent public IP
             processes: Process snapshot data
         
+        With the publisher running the message is only appended to the
+        pending batch here; the next flush sends it (or falls back to a
+        direct write if that flush fails).
+        
         Returns:
-            True if published to Redis, False if fallback used
+            True if published (or queued for publishing) to Redis,
+            False if fallback used
         """
         start_time = time.time()
         
@@ -309,13 +382,17 @@ class RedisQueueManager:
             return await self._fallback_write(agent_id, metrics, load_avg)
         
         try:
-            # Prepare message payload
+            # Prepare message payload (columnar metrics when the batch is uniform)
             message = {
                 "agent_id": agent_id,
                 "timestamp": datetime.now().isoformat(),
-                "metrics": json.dumps(metrics),
                 "load_avg": str(load_avg),
             }
+            packed = pack_metrics(metrics) if metrics else None
+            if packed is not None:
+                message["metrics_columns"] = packed
+            else:
+                message["metrics"] = json.dumps(metrics)
             
             # Add optional fields
             if hostname:
@@ -327,6 +404,12 @@ class RedisQueueManager:
             if processes:
                 message["processes"] = json.dumps(processes)
             
+            if self._publisher_task:
+                self._pending_publishes.append((agent_id, metrics, load_avg, message))
+                if len(self._pending_publishes) >= REDIS_PUBLISH_BATCH_SIZE:
+                    self._flush_event.set()
+                return True
+            
             # Add to stream with auto-trimming
             await self._redis.xadd(
                 self.stream_name,
@@ -351,6 +434,88 @@ class RedisQueueManager:
             # Fallback to direct write
             return await self._fallback_write(agent_id, metrics, load_avg)
     
+    async def _publisher_worker(self):
+        """Background worker that flushes pending metric publishes in one pipeline"""
+        interval = REDIS_PUBLISH_FLUSH_MS / 1000
+        while self._running:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self._flush_publishes()
+        await self._flush_publishes()
+    
+    async def _flush_publishes(self):
+        """XADD every pending metric message in a single round trip"""
+        if not self._pending_publishes:
+            return
+        batch = list(self._pending_publishes)
+        self._pending_publishes.clear()
+        
+        start_time = time.time()
+        try:
+            if not self.is_connected:
+                raise ConnectionError("Redis not connected")
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for _, _, _, message in batch:
+                    pipe.xadd(
+                        self.stream_name,
+                        message,
+                        maxlen=self.max_stream_length,
+                        approximate=True
+                    )
+                await pipe.execute()
+            
+            latency_ms = (time.time() - start_time) * 1000
+            for _ in batch:
+                self.stats.record_publish(latency_ms)
+        except asyncio.CancelledError:
+            # Put the batch back so stop() can still send or fall back with it
+            self._pending_publishes.extendleft(reversed(batch))
+            raise
+        except Exception as e:
+            self.stats.publish_errors += 1
+            print(f"⚠️ Redis publish error ({len(batch)} pending batches): {e}")
+            await self._check_connection()
+            
+            # Fallback to direct writes
+            for agent_id, metrics, load_avg, _ in batch:
+                await self._fallback_write(agent_id, metrics, load_avg)
+    
+    async def publish_logs(self, agent_id: str, logs: List[Dict[str, Any]]) -> bool:
+        """
+        Publish a raw log batch to the log stream.
+        
+        Unlike publish_metrics there is no fallback here: returns False when
+        Redis is unavailable, nothing consumes logs or the log stream backlog
+        is full, so the caller can write the batch directly. The log stream
+        has no MAXLEN, so a queued batch is never trimmed before it is stored.
+        """
+        if not self.is_connected or not self.logs_callback:
+            return False
+        
+        start_time = time.time()
+        try:
+            # Consumed batches are deleted, so XLEN is the unconsumed backlog
+            if await self._redis.xlen(self.log_stream_name) >= REDIS_LOG_STREAM_MAX_BACKLOG:
+                return False
+            await self._redis.xadd(
+                self.log_stream_name,
+                {
+                    "agent_id": agent_id,
+                    "timestamp": datetime.now().isoformat(),
+                    "logs": json.dumps(logs),
+                }
+            )
+            self.stats.record_publish((time.time() - start_time) * 1000)
+            return True
+        except Exception as e:
+            self.stats.publish_errors += 1
+            print(f"⚠️ Redis log publish error: {e}")
+            await self._check_connection()
+            return False
+    
     async def _fallback_write(
         self,
         agent_id: str,
@@ -434,15 +599,83 @@ class RedisQueueManager:
         
         print(f"🛑 Consumer worker stopped: {self.consumer_name}")
     
+    async def _log_consumer_worker(self):
+        """
+        Background worker that stores raw log batches from the log stream.
+        
+        Runs separately from the metrics consumer so large log batches don't
+        delay metric writes. Stored batches are acked and deleted, keeping
+        the stream length equal to the unconsumed backlog.
+        """
+        while self._running:
+            try:
+                if not self.is_connected:
+                    await asyncio.sleep(1)
+                    continue
+                
+                messages = await self._redis.xreadgroup(
+                    groupname=self.consumer_group,
+                    consumername=self.consumer_name,
+                    streams={self.log_stream_name: ">"},
+                    count=self.batch_size,
+                    block=REDIS_CONSUMER_TIMEOUT_MS
+                )
+                
+                if not messages:
+                    continue
+                
+                start_time = time.time()
+                processed_ids = []
+                for _, stream_messages in messages:
+                    for message_id, data in stream_messages:
+                        try:
+                            await self._process_log_message(data)
+                            processed_ids.append(message_id)
+                        except Exception as e:
+                            print(f"⚠️ Error processing log batch {message_id}: {e}")
+                            self.stats.consume_errors += 1
+                
+                if processed_ids:
+                    async with self._redis.pipeline(transaction=False) as pipe:
+                        pipe.xack(self.log_stream_name, self.consumer_group, *processed_ids)
+                        pipe.xdel(self.log_stream_name, *processed_ids)
+                        await pipe.execute()
+                    
+                    latency_ms = (time.time() - start_time) * 1000
+                    self.stats.record_consume(len(processed_ids), latency_ms)
+                
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f"⚠️ Log consumer worker error: {e}")
+                self.stats.consume_errors += 1
+                await asyncio.sleep(1)
+    
+    async def _process_log_message(self, data: Dict[str, str]):
+        """Store one raw log batch"""
+        agent_id = data.get("agent_id")
+        if agent_id and self.logs_callback:
+            await self.logs_callback(
+                agent_id=agent_id,
+                logs=json.loads(data.get("logs", "[]"))
+            )
+    
     async def _process_message(self, data: Dict[str, str]):
         """Process a single message from the stream"""
         agent_id = data.get("agent_id")
         if not agent_id:
             return
         
-        # Parse metrics
-        metrics_json = data.get("metrics", "[]")
-        metrics = json.loads(metrics_json)
+        # Raw log batches queued on the metrics stream by older workers
+        if data.get("kind") == "logs":
+            await self._process_log_message(data)
+            return
+        
+        # Parse metrics (row-form messages may still be queued from older workers)
+        if "metrics_columns" in data:
+            metrics = unpack_metrics(data["metrics_columns"])
+        else:
+            metrics = json.loads(data.get("metrics", "[]"))
         load_avg = float(data.get("load_avg", 0.0))
         
         # Call the metrics buffer callback
@@ -545,6 +778,10 @@ class RedisQueueManager:
                     health["last_entry"] = info.get("last-entry", [None])[0] if info.get("last-entry") else None
                 except Exception:
                     health["stream_length"] = 0
+                try:
+                    health["log_stream_length"] = await self._redis.xlen(self.log_stream_name)
+                except Exception:
+                    health["log_stream_length"] = 0
                 
                 health["ping_latency_ms"] = round(latency_ms, 2)
                 health["status"] = "healthy"
@@ -560,6 +797,45 @@ class RedisQueueManager:
     def get_stats(self) -> Dict[str, Any]:
         """Get queue statistics"""
         return self.stats.to_dict()
+    
+    # ==================== Response Cache ====================
+    # Small cache-aside helpers sharing the queue's connection. All of them
+    # are no-ops (cache miss) when Redis is not connected.
+    
+    async def cache_get(self, key: str) -> Optional[Any]:
+        """Get a JSON value from the cache, or None on miss/unavailable"""
+        if not self.is_connected:
+            return None
+        try:
+            cached = await self._redis.get(key)
+            return json.loads(cached) if cached is not None else None
+        except Exception as e:
+            print(f"⚠️ Redis cache get error for {key}: {e}")
+            return None
+    
+    async def cache_set(self, key: str, value: Any, ttl_seconds: int = 60) -> bool:
+        """Store a JSON-serializable value with a TTL"""
+        if not self.is_connected:
+            return False
+        try:
+            await self._redis.setex(key, ttl_seconds, json.dumps(value))
+            return True
+        except Exception as e:
+            print(f"⚠️ Redis cache set error for {key}: {e}")
+            return False
+    
+    async def cache_delete_prefix(self, prefix: str) -> int:
+        """Delete all cached keys starting with prefix"""
+        if not self.is_connected:
+            return 0
+        try:
+            keys = [key async for key in self._redis.scan_iter(match=f"{prefix}*")]
+            if keys:
+                await self._redis.delete(*keys)
+            return len(keys)
+        except Exception as e:
+            print(f"⚠️ Redis cache invalidation error for {prefix}*: {e}")
+            return 0
 
 
 # Global Redis queue manager instance
@@ -568,7 +844,8 @@ _redis_queue: Optional[RedisQueueManager] = None
 
 def init_redis_queue(
     metrics_buffer_callback: Callable = None,
-    fallback_callback: Callable = None
+    fallback_callback: Callable = None,
+    logs_callback: Callable = None
 ) -> RedisQueueManager:
     """
     Initialize the global Redis queue manager.
@@ -576,6 +853,7 @@ def init_redis_queue(
     Args:
         metrics_buffer_callback: Callback for batch database writes
         fallback_callback: Callback for direct writes when Redis unavailable
+        logs_callback: Callback that stores consumed raw log batches
     
     Returns:
         RedisQueueManager instance
@@ -583,7 +861,8 @@ def init_redis_queue(
     global _redis_queue
     _redis_queue = RedisQueueManager(
         metrics_buffer_callback=metrics_buffer_callback,
-        fallback_callback=fallback_callback
+        fallback_callback=fallback_callback,
+        logs_callback=logs_callback
     )
     return _redis_queue
 
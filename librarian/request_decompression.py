@@ -0,0 +1,249 @@
+"""
+Request Decompression Middleware
+
+Transparently decompresses request bodies sent with
+`Content-Encoding: gzip` or `Content-Encoding: zstd` before they reach
+route handlers, so handlers (and Pydantic's JSON parser) always see the
+raw JSON bytes.
+
+Features:
+- Pure ASGI middleware (no BaseHTTPMiddleware body re-buffering)
+- gzip via ISA-L (optional `isal` package, SIMD inflate) or stdlib zlib,
+  zstd via the optional `zstandard` package
+- Optional trained zstd dictionary for agent log batches (frames are matched
+  to it by the dictionary ID in their header; plain zstd frames still work)
+- Larger bodies are inflated on a dedicated thread pool, off the event loop
+  (both inflaters release the GIL)
+- Decompressed size capped to guard against compression bombs: inflation
+  stops as soon as the cap is crossed and the request gets a 413
+- Content-Encoding / Content-Length headers rewritten for downstream code
+
+Configuration:
+- REQUEST_MAX_DECOMPRESSED_BYTES: Max decompressed body size (default: 64MB)
+- REQUEST_DECOMPRESS_INLINE_BYTES: Compressed bodies up to this size are
+  inflated inline on the event loop (default: 16KB)
+- REQUEST_DECOMPRESS_WORKERS: Decompression thread pool size (default: CPU count)
+- REQUEST_ZSTD_DICT_PATH: zstd dictionary file (`zstd --train` output) used
+  for frames compressed with it (default: unset)
+"""
+
+import asyncio
+import io
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from starlette.responses import JSONResponse
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    from isal import isal_zlib
+    ISAL_AVAILABLE = True
+except ImportError:
+    ISAL_AVAILABLE = False
+
+
+# Configuration
+REQUEST_MAX_DECOMPRESSED_BYTES = int(os.getenv("REQUEST_MAX_DECOMPRESSED_BYTES", str(64 * 1024 * 1024)))
+REQUEST_DECOMPRESS_INLINE_BYTES = int(os.getenv("REQUEST_DECOMPRESS_INLINE_BYTES", str(16 * 1024)))
+REQUEST_DECOMPRESS_WORKERS = int(os.getenv("REQUEST_DECOMPRESS_WORKERS", str(os.cpu_count() or 4)))
+REQUEST_ZSTD_DICT_PATH = os.getenv("REQUEST_ZSTD_DICT_PATH", "")
+
+# Bounded pool so a burst of large agent uploads cannot starve the DB executor
+DECOMPRESS_EXECUTOR = ThreadPoolExecutor(
+    max_workers=REQUEST_DECOMPRESS_WORKERS,
+    thread_name_prefix="decompress"
+)
+
+SUPPORTED_ENCODINGS = ("gzip", "zstd") if ZSTD_AVAILABLE else ("gzip",)
+
+
+def _load_zstd_dictionary():
+    """Load the trained zstd dictionary, if one is configured"""
+    if not (ZSTD_AVAILABLE and REQUEST_ZSTD_DICT_PATH):
+        return None
+    try:
+        with open(REQUEST_ZSTD_DICT_PATH, "rb") as f:
+            dictionary = zstandard.ZstdCompressionDict(f.read())
+        print(f"✓ Loaded zstd dictionary {dictionary.dict_id()} from {REQUEST_ZSTD_DICT_PATH}")
+        return dictionary
+    except Exception as e:
+        print(f"⚠ Could not load zstd dictionary {REQUEST_ZSTD_DICT_PATH}: {e}")
+        return None
+
+
+ZSTD_DICTIONARY = _load_zstd_dictionary()
+
+
+class DecompressionError(ValueError):
+    """Raised when a request body cannot be decompressed"""
+
+
+class DecompressedBodyTooLarge(DecompressionError):
+    """Raised when a request body inflates past the size cap"""
+
+
+def decompress_body(body: bytes, encoding: str, max_size: int = REQUEST_MAX_DECOMPRESSED_BYTES) -> bytes:
+    """
+    Decompress a request body.
+
+    Raises:
+        DecompressedBodyTooLarge: if the payload inflates past max_size
+        DecompressionError: if the payload is corrupt
+    """
+    try:
+        if encoding == "gzip":
+            data = _inflate(body, max_size)
+        elif encoding == "zstd":
+            # read_across_frames: agents may append several zstd frames to one body
+            with _zstd_decompressor(body).stream_reader(io.BytesIO(body), read_across_frames=True) as reader:
+                data = reader.read(max_size + 1)
+        else:
+            raise DecompressionError(f"Unsupported Content-Encoding: {encoding}")
+    except DecompressionError:
+        raise
+    except Exception as e:
+        raise DecompressionError(f"Failed to decompress {encoding} body: {e}") from e
+
+    if len(data) > max_size:
+        raise DecompressedBodyTooLarge(f"Decompressed body exceeds {max_size} bytes")
+    return data
+
+
+def _zstd_decompressor(body: bytes):
+    """Decompressor for a zstd body, with the trained dictionary if its frame uses one"""
+    dict_id = zstandard.get_frame_parameters(body).dict_id
+    if not dict_id:
+        return zstandard.ZstdDecompressor()
+    if ZSTD_DICTIONARY is None or dict_id != ZSTD_DICTIONARY.dict_id():
+        raise DecompressionError(f"Unknown zstd dictionary: {dict_id}")
+    return zstandard.ZstdDecompressor(dict_data=ZSTD_DICTIONARY)
+
+
+def _decompressobj(data: bytes):
+    """New inflater for one gzip (or zlib-wrapped) stream, ISA-L when installed"""
+    if ISAL_AVAILABLE:
+        # ISA-L has no header auto-detect, so pick the wrapper explicitly
+        return isal_zlib.decompressobj(wbits=31 if data[:2] == b"\x1f\x8b" else 15)
+    # wbits=47 auto-detects gzip or zlib headers
+    return zlib.decompressobj(wbits=47)
+
+
+def _inflate(body: bytes, max_size: int) -> bytes:
+    """
+    Inflate a gzip body, including multi-member streams.
+
+    A single decompressobj stops at the end of the first gzip member and
+    leaves the rest in unused_data (gzip.decompress-style single-shot
+    inflaters silently drop it), so a fresh inflater is started for each
+    following member. NUL padding between/after members is ignored.
+    """
+    parts = []
+    total = 0
+    data = body
+    while data:
+        remaining = max_size + 1 - total
+        if remaining <= 0:
+            raise DecompressedBodyTooLarge(f"Decompressed body exceeds {max_size} bytes")
+
+        decompressor = _decompressobj(data)
+        part = decompressor.decompress(data, remaining)
+        if decompressor.unconsumed_tail:
+            raise DecompressedBodyTooLarge(f"Decompressed body exceeds {max_size} bytes")
+        if not decompressor.eof:
+            raise DecompressionError("Compressed body is truncated")
+
+        parts.append(part)
+        total += len(part)
+        data = decompressor.unused_data.lstrip(b"\x00")
+
+    return b"".join(parts)
+
+
+class RequestDecompressionMiddleware:
+    """ASGI middleware that inflates gzip/zstd request bodies in place"""
+
+    def __init__(self, app, max_size: int = REQUEST_MAX_DECOMPRESSED_BYTES):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._content_encoding(scope)
+        if encoding is None or encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+
+        if encoding not in SUPPORTED_ENCODINGS:
+            response = JSONResponse(
+                {"detail": f"Unsupported Content-Encoding: {encoding}"},
+                status_code=415
+            )
+            await response(scope, receive, send)
+            return
+
+        # Buffer the compressed body (it can never be larger than the inflated cap)
+        chunks = []
+        received = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunk = message.get("body", b"")
+            received += len(chunk)
+            if received > self.max_size:
+                await JSONResponse(
+                    {"detail": f"Request body exceeds {self.max_size} bytes"},
+                    status_code=413
+                )(scope, receive, send)
+                return
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+
+        compressed = b"".join(chunks)
+        try:
+            if len(compressed) <= REQUEST_DECOMPRESS_INLINE_BYTES:
+                body = decompress_body(compressed, encoding, self.max_size)
+            else:
+                body = await asyncio.get_running_loop().run_in_executor(
+                    DECOMPRESS_EXECUTOR, decompress_body, compressed, encoding, self.max_size
+                )
+        except DecompressionError as e:
+            status_code = 413 if isinstance(e, DecompressedBodyTooLarge) else 400
+            await JSONResponse({"detail": str(e)}, status_code=status_code)(scope, receive, send)
+            return
+
+        headers = [
+            (name, value) for name, value in scope["headers"]
+            if name not in (b"content-encoding", b"content-length")
+        ]
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        scope = dict(scope, headers=headers)
+
+        body_sent = False
+
+        async def receive_decompressed():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, receive_decompressed, send)
+
+    @staticmethod
+    def _content_encoding(scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == b"content-encoding":
+                return value.decode("latin-1").strip().lower()
+        return None
@@ -0,0 +1,112 @@
+"""
+Response Cache Module
+
+In-process TTL cache for read-mostly API responses, grouped into
+namespaces that write endpoints clear explicitly, plus ETag helpers so
+polling clients can revalidate with If-None-Match and get a 304.
+
+Entries live in this worker's memory only (nothing is written to Redis),
+so cached payloads may safely contain secrets such as notification URLs.
+With several workers, a write clears only its own worker's cache; the
+TTL bounds how stale the others can be.
+
+Usage:
+    cache = get_response_cache()
+    payload = cache.get("alerts", key)
+    if payload is None:
+        payload = jsonable_encoder(await load())
+        cache.set("alerts", key, payload, ttl_seconds=30)
+    ...
+    cache.clear("alerts")   # after any write
+
+Configuration:
+- RESPONSE_CACHE_MAX_ENTRIES: Max entries per namespace (default: 1024)
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import orjson
+
+
+# Configuration
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+
+
+def compute_etag(payload: Any) -> str:
+    """Strong ETag for a JSON-serializable payload (stable across key order)"""
+    digest = hashlib.blake2b(
+        orjson.dumps(payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS),
+        digest_size=8
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value matches etag (handles lists, W/ and *)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """Namespaced TTL cache (thread-safe; values are returned as stored)"""
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._namespaces: Dict[str, Dict[Hashable, Tuple[float, Any]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Any]:
+        """Get a cached value, or None if missing/expired"""
+        with self._lock:
+            entry = self._namespaces.get(namespace, {}).get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def set(self, namespace: str, key: Hashable, value: Any, ttl_seconds: float) -> None:
+        """Store a value for ttl_seconds"""
+        now = time.monotonic()
+        with self._lock:
+            entries = self._namespaces.setdefault(namespace, {})
+            if len(entries) >= self.max_entries:
+                for stale in [k for k, (expires, _) in entries.items() if expires <= now]:
+                    del entries[stale]
+                if len(entries) >= self.max_entries:
+                    entries.clear()
+            entries[key] = (now + ttl_seconds, value)
+
+    def clear(self, namespace: str) -> None:
+        """Drop every entry in a namespace"""
+        with self._lock:
+            self._namespaces.pop(namespace, None)
+
+    def get_stats(self) -> dict:
+        """Cache statistics"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "namespaces": {name: len(entries) for name, entries in self._namespaces.items()}
+            }
+
+
+# Global cache instance
+_response_cache = ResponseCache()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the global response cache"""
+    return _response_cache
@@ -0,0 +1,182 @@
+"""
+SQLite Connection Pool
+
+Keeps a small set of open sqlite3 connections so repeated db_manager calls
+reuse a warm connection (and its page cache / prepared statement cache)
+instead of paying connect + schema load on every call.
+
+Pooled connections are drop-in replacements for `sqlite3.connect(...)`
+results: callers keep the usual `conn.cursor()` / `conn.commit()` /
+`conn.close()` pattern, and `close()` hands the connection back to the
+pool (rolling back anything left uncommitted) rather than closing it.
+
+Each new connection is tuned once when opened: WAL journaling (readers no
+longer block behind a writer's commit), synchronous=NORMAL (safe with WAL,
+fsyncs only at checkpoints), in-memory temp tables, a larger page cache and
+memory-mapped reads.
+
+Configuration:
+- SQLITE_POOL_SIZE: Max idle connections kept open (default: 8)
+- SQLITE_JOURNAL_MODE: journal_mode pragma (default: WAL)
+- SQLITE_SYNCHRONOUS: synchronous pragma (default: NORMAL)
+- SQLITE_CACHE_SIZE_KB: Page cache per connection in KiB (default: 65536)
+- SQLITE_MMAP_SIZE: mmap_size pragma in bytes, 0 disables (default: 268435456)
+- SQLITE_STATEMENT_CACHE_SIZE: Prepared statements cached per connection (default: 256)
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from typing import Optional
+
+
+# Configuration
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "8"))
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_STATEMENT_CACHE_SIZE = int(os.getenv("SQLITE_STATEMENT_CACHE_SIZE", "256"))
+
+
+class PooledSQLiteConnection:
+    """Proxy around a sqlite3.Connection whose close() returns it to the pool"""
+
+    __slots__ = ("_conn", "_pool")
+
+    def __init__(self, conn: sqlite3.Connection, pool: "SQLiteConnectionPool"):
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_pool", pool)
+
+    def __getattr__(self, name):
+        conn = object.__getattribute__(self, "_conn")
+        if conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(conn, name)
+
+    def __setattr__(self, name, value):
+        # e.g. conn.row_factory = sqlite3.Row
+        setattr(self._conn, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """Return the underlying connection to the pool (idempotent)"""
+        conn = object.__getattribute__(self, "_conn")
+        if conn is not None:
+            object.__setattr__(self, "_conn", None)
+            self._pool.release(conn)
+
+
+class SQLiteConnectionPool:
+    """
+    Thread-safe pool of sqlite3 connections to one database file.
+
+    Connections are opened with check_same_thread=False so they can be used
+    from any worker thread, but each is only ever held by one caller at a
+    time. acquire() never blocks: if no idle connection is available a new
+    one is opened, and surplus connections are closed on release.
+    """
+
+    def __init__(self, db_path: str, max_idle: int = SQLITE_POOL_SIZE):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        # LIFO so the most recently used (warmest) connection is reused first
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.total_created = 0
+        self.total_reused = 0
+
+    def _create(self) -> sqlite3.Connection:
+        # sqlite3 caches prepared statements per connection keyed by SQL text, so
+        # pooled connections skip sqlite3_prepare for repeated constant queries
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=SQLITE_STATEMENT_CACHE_SIZE
+        )
+        self._configure(conn)
+        with self._lock:
+            self.total_created += 1
+        return conn
+
+    @staticmethod
+    def _configure(conn: sqlite3.Connection) -> None:
+        """Apply per-connection pragmas (journal_mode=WAL persists in the file)"""
+        try:
+            conn.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        except sqlite3.OperationalError as e:
+            # e.g. the database is locked by another process during startup
+            print(f"SQLite pool: could not set journal_mode={SQLITE_JOURNAL_MODE}: {e}")
+        conn.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA cache_size={-SQLITE_CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    
+    def acquire(self) -> PooledSQLiteConnection:
+        """Get a connection (reused if one is idle)"""
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self.total_reused += 1
+        except queue.Empty:
+            conn = self._create()
+        return PooledSQLiteConnection(conn, self)
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Reset a connection and keep it for reuse (or close it if the pool is full)"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+        except sqlite3.Error:
+            conn.close()
+            return
+
+        if self._closed or self._idle.qsize() >= self.max_idle:
+            conn.close()
+            return
+        self._idle.put_nowait(conn)
+
+    def close_all(self) -> None:
+        """Close every idle connection and stop pooling"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def get_stats(self) -> dict:
+        """Pool statistics for monitoring"""
+        return {
+            "db_path": self.db_path,
+            "idle": self._idle.qsize(),
+            "max_idle": self.max_idle,
+            "total_created": self.total_created,
+            "total_reused": self.total_reused
+        }
+
+
+# Global pool instances, one per database file
+_pools: dict = {}
+_pools_lock = threading.Lock()
+
+
+def get_sqlite_pool(db_path: str) -> SQLiteConnectionPool:
+    """Get (or create) the shared pool for a SQLite database file"""
+    pool: Optional[SQLiteConnectionPool] = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(db_path)
+            if pool is None:
+                pool = SQLiteConnectionPool(db_path)
+                _pools[db_path] = pool
+    return pool